@@ -0,0 +1,136 @@
+import numpy as np
+
+import generate_data
+import simulation
+
+def mser5_truncation(values):
+    """
+    MSER-5 warm-up detection. Averages `values` in batches of 5 and returns
+    the number of leading observations to discard: the truncation point d
+    (searched over the first half) minimising Var(remaining) / (m - d).
+    """
+    m = len(values) // 5
+    if m < 2:
+        return 0
+    return _mser_truncation(np.asarray(values[:m * 5], dtype=float).reshape(m, 5).mean(axis=1)) * 5
+
+def _mser_truncation(batch_means):
+    """
+    MSER on already-batched means: the number of leading batches to discard.
+    """
+    m = len(batch_means)
+    if m < 2:
+        return 0
+    # Suffix sums give every candidate's squared deviation sum in one pass
+    suffix_sum = np.cumsum(batch_means[::-1])[::-1]
+    suffix_sq = np.cumsum((batch_means ** 2)[::-1])[::-1]
+    d = np.arange(m // 2 + 1)
+    remaining = m - d
+    sq_dev = suffix_sq[d] - suffix_sum[d] ** 2 / remaining
+    mser = sq_dev / remaining ** 2
+    return int(np.argmin(mser))
+
+def batch_means_ci(values, num_batches=30, confidence=0.95):
+    """
+    Non-overlapping batch means. Returns (mean, half_width) of the confidence
+    interval for the mean of a (correlated) output sequence.
+    """
+    from scipy.stats import t
+
+    batch_size = len(values) // num_batches
+    if batch_size == 0:
+        return float(np.mean(values)), np.inf
+    batches = np.asarray(values[:batch_size * num_batches], dtype=float)
+    batch_means = batches.reshape(num_batches, batch_size).mean(axis=1)
+    half_width = t.ppf(0.5 + confidence / 2, num_batches - 1) * batch_means.std(ddof=1) / np.sqrt(num_batches)
+    return float(batch_means.mean()), float(half_width)
+
+def _blocks(mean_inter_arrival, mean_service_time, seed, block_size):
+    """
+    The customers generate_data(seed=seed) would produce, in blocks of at most
+    `block_size`, without knowing the run length in advance.
+    """
+    stream = generate_data.customer_chunks(mean_inter_arrival, mean_service_time, seed=seed)
+    try:
+        for chunk in stream:
+            for start in range(0, len(chunk), block_size):
+                yield chunk.iloc[start:start + block_size]
+    finally:
+        stream.close()
+
+def run_adaptive(num_servers=3, mean_inter_arrival=1.0, mean_service_time=2.5,
+                 relative_precision=0.05, confidence=0.95, num_batches=30,
+                 block_size=1000, min_customers=2000, max_customers=10_000_000, seed=42):
+    """
+    Simulates until the mean-wait estimate is precise enough, instead of a fixed run length.
+
+    Customers are drawn from the same streams as generate_data (the first n
+    simulated are exactly generate_data(n, seed=seed)) in blocks of
+    `block_size` and scheduled on the fast FCFS engine. Only the means of
+    consecutive groups of 5 waits are kept, which is the series MSER-5 works
+    on and is rebatched for the batch-means interval. After each block the
+    warm-up is re-detected and the run stops once the batch-means confidence
+    interval of the post-warm-up mean wait has a half-width within
+    `relative_precision` of the mean.
+
+    Parameters:
+    - relative_precision: Target half-width / mean (e.g. 0.05 = +/-5%)
+    - confidence: Confidence level of the interval
+    - num_batches: Number of batches for the batch-means interval
+    - min_customers / max_customers: Bounds on the run length
+    - seed: Seed of the generate_data streams, an int or a numpy.random.SeedSequence
+
+    Returns a summary dict with the estimate, its interval and the warm-up length.
+    """
+    engine = simulation.new_fast_engine(num_servers)
+    blocks = _blocks(mean_inter_arrival, mean_service_time, seed, block_size)
+
+    means_of_5 = []
+    leftover = np.empty(0)
+    num_customers = 0
+    next_check = min_customers
+    mean_wait, half_width, warmup = np.nan, np.inf, 0
+    converged = False
+
+    try:
+        while num_customers < max_customers:
+            customers = next(blocks)
+            customers = customers.iloc[:max_customers - num_customers]
+            records = simulation.schedule_records(engine, customers)
+            waits = np.concatenate([leftover, records['Wait Time'].to_numpy()])
+            whole = len(waits) // 5 * 5
+            means_of_5.append(waits[:whole].reshape(-1, 5).mean(axis=1))
+            leftover = waits[whole:]
+            num_customers += len(customers)
+
+            # Re-test on a geometric schedule so the checks stay O(n) overall
+            if num_customers < next_check and num_customers < max_customers:
+                continue
+            next_check = int(num_customers * 1.1)
+            series = np.concatenate(means_of_5)
+            means_of_5 = [series]
+            warmup_batches = _mser_truncation(series)
+            warmup = warmup_batches * 5
+            mean_wait, half_width = batch_means_ci(series[warmup_batches:], num_batches, confidence)
+            # An empty queue (all waits zero) is estimated exactly
+            if half_width <= relative_precision * mean_wait or (mean_wait == 0 and half_width == 0):
+                converged = True
+                break
+    finally:
+        blocks.close()
+
+    return {
+        'Mean Wait': mean_wait,
+        'CI Lower': mean_wait - half_width,
+        'CI Upper': mean_wait + half_width,
+        'Relative Half Width': half_width / mean_wait if mean_wait else 0.0,
+        'Warm-up Customers': warmup,
+        'Customers Simulated': num_customers,
+        'Converged': converged
+    }
+
+if __name__ == "__main__":
+    summary = run_adaptive()
+    print("🎯 Adaptive run-length summary:")
+    for key, value in summary.items():
+        print(f"   {key}: {value}")
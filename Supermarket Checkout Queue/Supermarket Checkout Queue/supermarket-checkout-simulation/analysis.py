@@ -1,9 +1,24 @@
+import os
+import json
+import hashlib
 import pandas as pd
 import numpy as np
 
-def analyze_results(results_file='simulation_results.csv'):
-    df = pd.read_csv(results_file)
-    
+from results_io import load_results, results_format, read_npy_header
+from online_stats import SimulationSummary
+from event_index import QueueStateIndex
+
+# Rows folded into the summary at a time when catching up on appended results
+ANALYSIS_BLOCK_SIZE = 1_000_000
+
+# Leading bytes of the already-analysed data that identify the file
+FINGERPRINT_BYTES = 64 * 1024
+
+def compute_metrics(df):
+    """
+    Computes the headline performance metrics from a simulation results table.
+    Returns a dict of scalars plus the per-server statistics tables.
+    """
     # --- 1. Average Waiting Time ---
     avg_waiting_time = df['Wait Time'].mean()
     
@@ -33,10 +48,179 @@ def analyze_results(results_file='simulation_results.csv'):
     # --- 6. Total Time in System ---
     avg_time_in_system = df['Time in System'].mean()
     
+    # --- 7. Time-Weighted Queue Length, Busy Counters and Little's Law ---
+    index = QueueStateIndex.from_results(df)
+    littles_law = index.littles_law(start_time, end_time, avg_waiting_time, avg_time_in_system)
+    
+    return {
+        'total_customers': total_customers,
+        'total_duration_minutes': total_duration_minutes,
+        'throughput_per_hour': throughput_per_hour,
+        'avg_waiting_time': avg_waiting_time,
+        'avg_time_in_system': avg_time_in_system,
+        'wait_time_p95': wait_time_p95,
+        'avg_service_time': df['Service Time'].mean(),
+        'workload_std': workload_std,
+        'avg_queue_length': littles_law['L_queue'],
+        'avg_busy_servers': index.mean_busy_lanes(start_time, end_time),
+        'littles_law': littles_law,
+        'server_stats': server_stats,
+        'customers_per_server': customers_per_server
+    }
+
+def metrics_to_dict(metrics):
+    """
+    JSON-ready copy of compute_metrics() output: plain floats and ints, and the
+    per-server tables as lists of rows. Undefined values (NaN or infinite, e.g.
+    workload_std with a single lane) become None, since JSON has no NaN.
+    """
+    def plain(value):
+        if isinstance(value, pd.DataFrame):
+            return [{k: plain(v) for k, v in row.items()} for row in value.to_dict('records')]
+        if isinstance(value, dict):
+            return {k: plain(v) for k, v in value.items()}
+        if isinstance(value, (np.integer, int)):
+            return int(value)
+        value = float(value)
+        return value if np.isfinite(value) else None
+    return plain(metrics)
+
+def _data_offset(results_file):
+    # Where the rows start: after the .npy header (its length can change when a
+    # file is widened for appending), or at byte 0 for .csv
+    if results_format(results_file) != '.npy':
+        return 0
+    with open(results_file, 'rb') as f:
+        return read_npy_header(f)[1]
+
+def _fingerprint(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(min(length, FINGERPRINT_BYTES))).hexdigest()
+
+def _read_new_rows(results_file, state):
+    """
+    Yields the rows appended since `state` in blocks, updating its offsets.
+    .npy is memory-mapped and sliced; .csv is read from the stored byte offset;
+    .parquet cannot be appended to in place, so it is re-read and sliced.
+    """
+    ext = results_format(results_file)
+    if ext == '.npy':
+        records = np.load(results_file, mmap_mode='r')
+        for start in range(state['rows'], len(records), ANALYSIS_BLOCK_SIZE):
+            block = records[start:start + ANALYSIS_BLOCK_SIZE]
+            state['rows'] += len(block)
+            yield pd.DataFrame({name: block[name] for name in records.dtype.names})
+        state['data_bytes'] = state['rows'] * records.dtype.itemsize
+    elif ext == '.csv':
+        size = os.path.getsize(results_file)
+        if size <= state['data_bytes']:
+            return
+        with open(results_file, 'rb') as f:
+            f.seek(state['data_bytes'])
+            header = dict(header=0) if state['data_bytes'] == 0 else dict(header=None, names=state['columns'])
+            for block in pd.read_csv(f, chunksize=ANALYSIS_BLOCK_SIZE, **header):
+                state['columns'] = list(block.columns)
+                state['rows'] += len(block)
+                yield block
+        state['data_bytes'] = size
+    else:
+        df = load_results(results_file)
+        for start in range(state['rows'], len(df), ANALYSIS_BLOCK_SIZE):
+            block = df.iloc[start:start + ANALYSIS_BLOCK_SIZE]
+            state['rows'] += len(block)
+            yield block
+        # Parquet is rewritten rather than appended: identify the whole file
+        state['data_bytes'] = os.path.getsize(results_file)
+
+def update_summary(results_file='simulation_results.npy', state_file=None):
+    """
+    Incremental analysis state for a results file that grows by appending.
+
+    The state (`<results_file>.analysis.json` by default) keeps one mergeable
+    partial aggregate per analysed chunk of rows: counts, Welford moments,
+    per-server busy time and served counts, and a quantile sketch of waits.
+    Each call reads only the rows appended since the last one, adds them as a
+    new chunk and returns (summary merged over all chunks, new row count).
+    If the file no longer starts with the analysed data (e.g. it was
+    overwritten by a new run) the state is rebuilt from scratch.
+    """
+    state_file = state_file or f'{results_file}.analysis.json'
+    state = None
+    if os.path.exists(state_file):
+        with open(state_file) as f:
+            state = json.load(f)
+        data_offset = _data_offset(results_file)
+        unchanged = (
+            state['format'] == results_format(results_file)
+            and os.path.getsize(results_file) >= data_offset + state['data_bytes']
+            and _fingerprint(results_file, data_offset, state['data_bytes']) == state['fingerprint']
+        )
+        if not unchanged:
+            print(f"ℹ️ '{results_file}' changed since it was last analysed; rebuilding the analysis state.")
+            state = None
+    if state is None:
+        state = {'format': results_format(results_file), 'rows': 0, 'data_bytes': 0,
+                 'columns': None, 'fingerprint': None, 'chunks': []}
+
+    first_row = state['rows']
+    chunk = None
+    for block in _read_new_rows(results_file, state):
+        if chunk is None:
+            chunk = SimulationSummary(int(block['Server ID'].max()))
+        chunk.update_batch(block)
+    if chunk is not None:
+        state['chunks'].append({'rows': [first_row, state['rows']], 'summary': chunk.to_dict()})
+    state['fingerprint'] = _fingerprint(results_file, _data_offset(results_file), state['data_bytes'])
+
+    tmp_path = f'{state_file}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_file)
+
+    summary = SimulationSummary(0)
+    for part in state['chunks']:
+        summary.merge(SimulationSummary.from_dict(part['summary']))
+    return summary, state['rows'] - first_row
+
+def analyze_results(results_file='simulation_results.npy', incremental=False, state_file=None,
+                    metrics_json=None):
+    """
+    `results_file` is the results DataFrame itself (in-memory handoff from
+    main.py), a .npy / .parquet / .csv results file, or the SimulationSummary
+    returned by a metrics_only run.
+
+    With incremental=True a results file is analysed through update_summary():
+    only rows appended since the previous analysis are read and merged into
+    the persisted partial aggregates (`state_file`), so the cost follows the
+    new rows rather than the history. The 95th percentile then comes from the
+    quantile sketch (within 1%).
+
+    `metrics_json` also writes the metrics as JSON for batch jobs.
+    """
+    if isinstance(results_file, SimulationSummary):
+        metrics = results_file.to_metrics()
+    elif incremental and not isinstance(results_file, pd.DataFrame):
+        summary, new_rows = update_summary(results_file, state_file)
+        print(f"🔁 Incremental analysis: {new_rows} new rows merged ({len(summary)} total)")
+        metrics = summary.to_metrics()
+    else:
+        metrics = compute_metrics(load_results(results_file))
+    
+    total_customers = metrics['total_customers']
+    total_duration_minutes = metrics['total_duration_minutes']
+    throughput_per_hour = metrics['throughput_per_hour']
+    avg_waiting_time = metrics['avg_waiting_time']
+    avg_time_in_system = metrics['avg_time_in_system']
+    wait_time_p95 = metrics['wait_time_p95']
+    workload_std = metrics['workload_std']
+    server_stats = metrics['server_stats']
+    customers_per_server = metrics['customers_per_server']
+    
     # --- Identification of Bottlenecks ---
     # Heuristic: If queueing delay is significant compared to service time
     # Or utilization is very high (> 85%)
-    avg_service_time = df['Service Time'].mean()
+    avg_service_time = metrics['avg_service_time']
     utilization_mean = server_stats['Utilization (%)'].mean()
     
     bottleneck_msg = []
@@ -62,6 +246,8 @@ def analyze_results(results_file='simulation_results.csv'):
     Average Waiting Time  : {avg_waiting_time:.2f} minutes
     Average Time in System: {avg_time_in_system:.2f} minutes
     95th % Waiting Time   : {wait_time_p95:.2f} minutes
+    Avg Queue Length      : {metrics['avg_queue_length']:.2f} customers (time-weighted)
+    Avg Busy Counters     : {metrics['avg_busy_servers']:.2f} (time-weighted)
     
     🖥️ COUNTER METRICS
     ------------------
@@ -76,7 +262,19 @@ def analyze_results(results_file='simulation_results.csv'):
     report += f"""
     Workload Imbalance (StdDev of counts): {workload_std:.2f}
     
-    🚨 BOTTLENECK ANALYSIS
+"""
+    
+    if 'littles_law' in metrics:
+        check = metrics['littles_law']
+        report += f"""    ⚖️ LITTLE'S LAW CHECK (L = λW)
+    ------------------------------
+    In System: L  = {check['L_system']:.3f} vs λW  = {check['lambda_W_system']:.3f}
+    In Queue : Lq = {check['L_queue']:.3f} vs λWq = {check['lambda_W_queue']:.3f}
+    Relative Error: {check['relative_error']:.2e}
+    
+"""
+    
+    report += f"""    🚨 BOTTLENECK ANALYSIS
     ----------------------
     {chr(10).join(bottleneck_msg)}
     ==================================================
@@ -87,6 +285,11 @@ def analyze_results(results_file='simulation_results.csv'):
     # Save simple metrics to text file
     with open('analysis_report.txt', 'w') as f:
         f.write(report)
+    
+    if metrics_json:
+        with open(metrics_json, 'w') as f:
+            json.dump(metrics_to_dict(metrics), f, indent=2, allow_nan=False)
+        print(f"📄 Metrics written to {metrics_json}")
         
     return server_stats
 
@@ -0,0 +1,162 @@
+import os
+import json
+import argparse
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+import generate_data
+import simulation
+from results_io import npy_header, npy_header_length
+
+# Typed layout of the multi-store arrival log (the customers.csv columns)
+ARRIVAL_DTYPE = np.dtype([
+    ('Customer ID', '<i8'),
+    ('Arrival Time', '<f8'),
+    ('Service Time', '<f8')
+])
+
+# Customers a worker schedules at a time; bounds each worker's memory
+BATCH_BLOCK_SIZE = 1_000_000
+
+def index_path(log_path):
+    return f'{log_path}.index.json'
+
+def write_arrival_log(stores, log_path='arrivals.npy'):
+    """
+    Packs many stores' customers into one memory-mappable arrival log.
+
+    `stores` is an iterable of (store name, customers) pairs, customers being
+    a DataFrame or a customers CSV path. Stores are read and written one at a
+    time, each as a contiguous run of rows sorted by Arrival Time (as
+    run_simulation sorts its input), then Customer ID, and `<log_path>.index.json` records
+    every store's row offset and count.
+    Returns the index (list of dicts).
+    """
+    header_length = npy_header_length(ARRIVAL_DTYPE)
+    index = []
+    num_rows = 0
+    with open(log_path, 'wb') as f:
+        f.write(b'\0' * header_length)
+        for store, customers in stores:
+            df = customers if isinstance(customers, pd.DataFrame) else pd.read_csv(customers)
+            # Workers schedule the slice as stored, so it must be in arrival order
+            # (ties by Customer ID: arrival times are rounded and can coincide)
+            if not df['Arrival Time'].is_monotonic_increasing:
+                df = df.sort_values(['Arrival Time', 'Customer ID'])
+            records = np.empty(len(df), dtype=ARRIVAL_DTYPE)
+            for name in ARRIVAL_DTYPE.names:
+                records[name] = df[name].to_numpy()
+            f.write(records.tobytes())
+            index.append({'store': str(store), 'offset': num_rows, 'count': len(records)})
+            num_rows += len(records)
+        f.seek(0)
+        f.write(npy_header(num_rows, header_length, ARRIVAL_DTYPE))
+
+    with open(index_path(log_path), 'w') as f:
+        json.dump({'stores': index}, f, indent=1)
+    print(f"✅ Arrival log '{log_path}': {len(index)} stores, {num_rows} customers")
+    return index
+
+def generate_store_log(num_stores=100, num_customers=5000, mean_inter_arrival=1.0, mean_service_time=2.5,
+                       seed=42, log_path='arrivals.npy'):
+    """
+    Synthetic arrival log: store k draws from the k-th SeedSequence child of
+    `seed`. mean_inter_arrival may be one value or one per store.
+    """
+    inter_arrivals = np.broadcast_to(np.asarray(mean_inter_arrival, dtype=float), (num_stores,))
+    seeds = np.random.SeedSequence(seed).spawn(num_stores)
+    stores = ((f'store-{k + 1:04d}',
+               generate_data.generate_data(num_customers, inter_arrivals[k], mean_service_time,
+                                           seed=seeds[k], output_path=None))
+              for k in range(num_stores))
+    return write_arrival_log(stores, log_path)
+
+def load_index(log_path):
+    with open(index_path(log_path)) as f:
+        return json.load(f)['stores']
+
+def _store_blocks(log_path, offset, count):
+    # Mapped views of the store's slice: pages are read on demand, nothing is copied up front
+    log = np.load(log_path, mmap_mode='r')
+    for start in range(offset, offset + count, BATCH_BLOCK_SIZE):
+        block = log[start:min(start + BATCH_BLOCK_SIZE, offset + count)]
+        yield pd.DataFrame({name: block[name] for name in ARRIVAL_DTYPE.names}, copy=False)
+
+def _simulate_store(task):
+    """
+    Runs one store in metrics-only mode and returns its metrics row.
+    """
+    log_path, entry, num_servers, engine = task
+    summary, _ = simulation.summarize_chunks(_store_blocks(log_path, entry['offset'], entry['count']),
+                                             num_servers, engine)
+    metrics = summary.to_metrics()
+    utilization = np.zeros(num_servers)
+    server_stats = metrics['server_stats']
+    utilization[server_stats['Server ID'].to_numpy() - 1] = server_stats['Utilization (%)'].to_numpy()
+    return {
+        'Store': entry['store'],
+        'Lanes': num_servers,
+        'Customers': metrics['total_customers'],
+        'Mean Wait': metrics['avg_waiting_time'],
+        'P95 Wait': metrics['wait_time_p95'],
+        'Throughput (/hr)': metrics['throughput_per_hour'],
+        'Avg Queue Length': metrics['avg_queue_length'],
+        'Mean Utilization (%)': float(utilization.mean()),
+        'Max Utilization (%)': float(utilization.max())
+    }
+
+def run_batch(log_path='arrivals.npy', num_servers=3, engine='fast', stores=None, max_workers=None):
+    """
+    Simulates every store of an arrival log and gathers one metrics table.
+
+    Workers receive only (store, offset, count): each maps the shared log and
+    schedules its slice block by block into a SimulationSummary, so no
+    per-customer records are kept and peak memory grows with the number of
+    workers (one block each), not with the number of stores.
+
+    Parameters:
+    - log_path: Arrival log written by write_arrival_log / generate_store_log
+    - num_servers: Lanes per store, one count for all or a dict of store -> lanes
+    - engine: 'fast' or 'simpy', as in run_simulation
+    - stores: Names of the stores to run (default: all in the index)
+    - max_workers: Process pool size (defaults to all cores)
+    """
+    index = load_index(log_path)
+    if stores is not None:
+        wanted = set(stores)
+        index = [entry for entry in index if entry['store'] in wanted]
+    lanes = (lambda store: num_servers[store]) if isinstance(num_servers, dict) else (lambda store: num_servers)
+    tasks = [(log_path, entry, lanes(entry['store']), engine) for entry in index]
+
+    max_workers = max_workers or os.cpu_count()
+    print(f"🏬 Batch: {len(tasks)} stores on {max_workers} workers")
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        rows = list(pool.map(_simulate_store, tasks, chunksize=max(1, len(tasks) // (4 * max_workers))))
+    return pd.DataFrame(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate many stores from one memory-mapped arrival log.')
+    parser.add_argument('--log', default='arrivals.npy')
+    parser.add_argument('--generate', type=int, metavar='STORES', default=None,
+                        help='First write a synthetic log with this many stores')
+    parser.add_argument('--customers', type=int, default=5000, help='Customers per generated store')
+    parser.add_argument('--inter-arrival', type=float, default=1.0)
+    parser.add_argument('--service', type=float, default=2.5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--servers', type=int, default=3)
+    parser.add_argument('--engine', choices=simulation.ENGINES, default='fast')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='batch_metrics.csv')
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate_store_log(args.generate, args.customers, args.inter_arrival, args.service, args.seed, args.log)
+    table = run_batch(args.log, args.servers, args.engine, max_workers=args.workers)
+    print(table.to_string(index=False, max_rows=20))
+    table.to_csv(args.output, index=False)
+    print(f"✅ Batch metrics saved to {args.output}")
+    return table
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import multiprocessing as mp
+from queue import Empty
+import numpy as np
+
+from instrumentation import peak_rss_mb
+
+STAGES = ('generate', 'simulate', 'analyze', 'visualize')
+
+# How often a waiting benchmark checks that its case process is still alive
+POLL_SECONDS = 1.0
+
+def _run_stage(stage, num_customers, num_servers, engine, output_dir, queue):
+    """
+    Runs in a fresh process so peak RSS belongs to this one case.
+    Inputs the stage depends on are prepared untimed first; peak RSS is
+    reported as the growth over the peak reached by that preparation, and
+    worker processes (visualize's pool) are reported separately.
+    """
+    import generate_data
+    import simulation
+    import analysis
+
+    os.chdir(output_dir)
+    seed = np.random.SeedSequence(42)
+
+    def generate():
+        return generate_data.generate_data(num_customers, seed=seed, output_path=None)
+
+    def simulate(customers):
+        return simulation.run_simulation(customers, num_servers, engine=engine, output_file=None)[0]
+
+    events = 0
+    if stage == 'generate':
+        baseline_rss = peak_rss_mb()
+        started = time.perf_counter()
+        generate()
+    elif stage == 'simulate':
+        customers = generate()
+        baseline_rss = peak_rss_mb()
+        started = time.perf_counter()
+        simulate(customers)
+        # The same count the instrumented engines report as events_processed
+        events = simulation.EVENTS_PER_CUSTOMER * num_customers
+    elif stage == 'analyze':
+        results = simulate(generate())
+        baseline_rss = peak_rss_mb()
+        started = time.perf_counter()
+        analysis.compute_metrics(results)
+    else:
+        import visualizations
+        results = simulate(generate())
+        baseline_rss = peak_rss_mb()
+        started = time.perf_counter()
+        visualizations.generate_visualizations(results)
+    wall = time.perf_counter() - started
+
+    queue.put({
+        'wall_seconds': wall,
+        'peak_rss_mb': peak_rss_mb() - baseline_rss,
+        'worker_peak_rss_mb': peak_rss_mb(children=True) or None,
+        'events_per_second': events / wall if events else None
+    })
+
+def run_case(stage, num_customers, num_servers, engine, output_dir, timeout=None):
+    """
+    Runs one case in a fresh process and returns its measurements. If the
+    process dies without reporting (e.g. killed for memory, or an exception)
+    or runs longer than `timeout` seconds, the case is returned as failed:
+    no measurements and an 'error' describing why.
+    """
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run_stage,
+                          args=(stage, num_customers, num_servers, engine, output_dir, queue))
+    process.start()
+    deadline = time.monotonic() + timeout if timeout else None
+    result = None
+    error = None
+    while result is None and error is None:
+        try:
+            result = queue.get(timeout=POLL_SECONDS)
+        except Empty:
+            if not process.is_alive():
+                try:
+                    # The result may have been sent just before the process exited
+                    result = queue.get(timeout=POLL_SECONDS)
+                except Empty:
+                    error = f"process exited with code {process.exitcode}"
+            elif deadline is not None and time.monotonic() > deadline:
+                process.terminate()
+                error = f"timed out after {timeout:g}s"
+    process.join()
+    if result is None:
+        return {'wall_seconds': None, 'peak_rss_mb': None, 'worker_peak_rss_mb': None,
+                'events_per_second': None, 'error': error}
+    return result
+
+def case_key(case):
+    return f"{case['stage']}|{case['engine']}|{case['customers']}|{case['servers']}"
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def find_regressions(cases, baseline, threshold):
+    """
+    Cases whose wall time exceeds the baseline's by more than `threshold` (fraction).
+    """
+    reference = {case_key(case): case for case in baseline.get('cases', [])}
+    regressions = []
+    for case in cases:
+        base = reference.get(case_key(case))
+        # Failed cases have no timing to compare (they are reported separately)
+        if case.get('error') or not base or base.get('error'):
+            continue
+        if case['wall_seconds'] > base['wall_seconds'] * (1 + threshold):
+            regressions.append((case, base))
+    return regressions
+
+def main(argv=None):
+    import simulation
+
+    parser = argparse.ArgumentParser(description='Benchmark every pipeline stage across data sizes.')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--customers', type=int, nargs='+', default=[1_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--servers', type=int, nargs='+', default=[3, 10])
+    parser.add_argument('--engines', nargs='+', choices=simulation.ENGINES, default=['fast', 'simpy'])
+    parser.add_argument('--simpy-max-customers', type=int, default=100_000,
+                        help='Skip the SimPy engine above this size')
+    parser.add_argument('--visualize-max-customers', type=int, default=1_000_000,
+                        help='Skip the visualize stage above this size')
+    parser.add_argument('--history', default='benchmark_history.jsonl')
+    parser.add_argument('--baseline', default='benchmark_baseline.json')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown vs baseline before flagging (0.2 = 20%%)')
+    parser.add_argument('--output-dir', default='benchmark_outputs')
+    parser.add_argument('--case-timeout', type=float, default=None,
+                        help='Fail a case that runs longer than this many seconds')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_dir = os.path.abspath(args.output_dir)
+    cases = []
+    print(f"{'Stage':<10} | {'Engine':<6} | {'Customers':>10} | {'Lanes':>5} | {'Seconds':>9} | "
+          f"{'Peak RSS MB':>11} | {'Worker MB':>9} | {'Events/s':>11}")
+    print("-" * 94)
+    for stage in args.stages:
+        # Only the simulate stage depends on the engine choice being measured
+        engines = args.engines if stage == 'simulate' else ['fast']
+        for engine in engines:
+            for num_customers in args.customers:
+                if engine == 'simpy' and num_customers > args.simpy_max_customers:
+                    continue
+                if stage == 'visualize' and num_customers > args.visualize_max_customers:
+                    continue
+                for num_servers in args.servers:
+                    case = {'stage': stage, 'engine': engine, 'customers': num_customers,
+                            'servers': num_servers}
+                    case.update(run_case(stage, num_customers, num_servers, engine, output_dir,
+                                         args.case_timeout))
+                    cases.append(case)
+                    if case.get('error'):
+                        print(f"{stage:<10} | {engine:<6} | {num_customers:>10} | {num_servers:>5} | "
+                              f"❌ FAILED: {case['error']}")
+                        continue
+                    eps = f"{case['events_per_second']:.0f}" if case['events_per_second'] else '-'
+                    workers = f"{case['worker_peak_rss_mb']:.1f}" if case['worker_peak_rss_mb'] else '-'
+                    print(f"{stage:<10} | {engine:<6} | {num_customers:>10} | {num_servers:>5} | "
+                          f"{case['wall_seconds']:>9.3f} | {case['peak_rss_mb']:>11.1f} | {workers:>9} | "
+                          f"{eps:>11}")
+
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'cases': cases
+    }
+    with open(args.history, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f"\n📄 Appended results to {args.history}")
+
+    failed = [case for case in cases if case.get('error')]
+    for case in failed:
+        print(f"❌ FAILED {case_key(case)}: {case['error']}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"📌 Saved baseline to {args.baseline}")
+        return 1 if failed else 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ No baseline found; run with --save-baseline to create one.")
+        return 1 if failed else 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = find_regressions(cases, baseline, args.threshold)
+    for case, base in regressions:
+        print(f"🚨 REGRESSION {case_key(case)}: {case['wall_seconds']:.3f}s vs baseline "
+              f"{base['wall_seconds']:.3f}s")
+    if not regressions:
+        print(f"✅ No regressions beyond {args.threshold:.0%} of baseline.")
+    return 1 if regressions or failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
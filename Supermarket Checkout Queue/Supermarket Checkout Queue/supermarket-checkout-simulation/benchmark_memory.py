@@ -0,0 +1,69 @@
+import argparse
+import time
+import tracemalloc
+import pandas as pd
+import numpy as np
+
+from simulation import RecordBuffer
+
+def _sample_records(num_customers, num_servers=3, seed=0):
+    rng = np.random.default_rng(seed)
+    arrivals = np.cumsum(rng.exponential(1.0, num_customers))
+    services = np.maximum(rng.exponential(2.5, num_customers), 0.5)
+    starts = arrivals + rng.exponential(1.0, num_customers)
+    lanes = rng.integers(1, num_servers + 1, num_customers)
+    return (list(range(1, num_customers + 1)), arrivals.tolist(), starts.tolist(),
+            (starts + services).tolist(), services.tolist(), lanes.tolist())
+
+def dict_path(columns):
+    """
+    The original storage: one eight-key dict per customer, then pd.DataFrame(records).
+    """
+    records = []
+    for customer_id, arrival, start, end, service, lane_id in zip(*columns):
+        wait = start - arrival
+        records.append({
+            'Customer ID': customer_id,
+            'Arrival Time': arrival,
+            'Service Start Time': start,
+            'Service End Time': end,
+            'Service Time': service,
+            'Wait Time': wait,
+            'Server ID': lane_id,
+            'Time in System': wait + service
+        })
+    return pd.DataFrame(records)
+
+def buffer_path(columns):
+    """
+    The columnar RecordBuffer used by CheckoutLane.
+    """
+    records = RecordBuffer()
+    for row in zip(*columns):
+        records.append(*row)
+    return records.to_dataframe()
+
+def measure(path, columns):
+    tracemalloc.start()
+    started = time.perf_counter()
+    df = path(columns)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed, len(df)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Memory benchmark: dict records vs RecordBuffer.')
+    parser.add_argument('--customers', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'Customers':>10} | {'Storage':<12} | {'Peak MB':>9} | {'Bytes/cust':>10} | {'Seconds':>8}")
+    print("-" * 62)
+    for num_customers in args.customers:
+        columns = _sample_records(num_customers)
+        for name, path in (('dict', dict_path), ('RecordBuffer', buffer_path)):
+            peak, elapsed, rows = measure(path, columns)
+            print(f"{rows:>10} | {name:<12} | {peak / 1e6:>9.1f} | {peak / rows:>10.0f} | {elapsed:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import os
+import argparse
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_data import common_window_minutes
+from replications import run_replication, confidence_intervals
+
+METHODS = ('independent', 'crn', 'antithetic')
+
+# Metrics every configuration reports, whatever its lane count
+COMPARE_METRICS = ('Mean Wait', 'P95 Wait', 'Throughput (/hr)')
+
+def _run(task):
+    seed_seq, antithetic, config = task
+    summary = run_replication(seed_seq, antithetic=antithetic, **config)
+    return {metric: summary[metric] for metric in COMPARE_METRICS}
+
+def _paired_tasks(configs, num_replications, seed, method, common):
+    """
+    (keys, tasks): one (configuration, replication) key and one
+    (seed, antithetic, run_replication arguments) task per run.
+    """
+    root = np.random.SeedSequence(seed)
+    if method == 'independent':
+        seeds = [root.spawn(num_replications) for _ in configs]
+    else:
+        seeds = [root.spawn(num_replications)] * len(configs)
+    mirrors = (False, True) if method == 'antithetic' else (False,)
+    if method != 'independent':
+        rates = [{**common, **config}.get('mean_inter_arrival', 1.0) for config in configs]
+        common = {**common, 'window_minutes': common_window_minutes(rates)}
+
+    keys = []
+    tasks = []
+    for c, config in enumerate(configs):
+        for r in range(num_replications):
+            for antithetic in mirrors:
+                keys.append((c, r))
+                tasks.append((seeds[c][r], antithetic, {**common, **config}))
+    return keys, tasks
+
+def compare_configurations(configs, num_replications=10, seed=42, method='crn', confidence=0.95,
+                           max_workers=None, **common):
+    """
+    Compares simulated configurations (e.g. 3 vs 4 lanes) with paired-difference
+    confidence intervals against the first one.
+
+    Parameters:
+    - configs: List of dicts of run_replication arguments that differ between
+      configurations, e.g. [{'num_servers': 3}, {'num_servers': 4}]
+    - num_replications: Observations per configuration
+    - seed: Root seed; replication r uses the r-th SeedSequence.spawn() child
+    - method: Variance reduction:
+        'independent': every configuration draws its own customers (no pairing benefit)
+        'crn': common random numbers, every configuration replays the same
+          random numbers in replication r, so differences between configurations
+          are not drowned by differences between sample paths. Configurations
+          with different arrival rates share one generation window length,
+          so their customers stay in step window by window
+        'antithetic': CRN, and each observation is the average of a run and
+          its antithetic mirror (2 runs per observation)
+    - confidence: Confidence level of the intervals
+    - max_workers: Process pool size (defaults to all cores)
+    - common: run_replication arguments shared by all configurations
+      (num_customers, mean_inter_arrival, mean_service_time, engine)
+
+    Returns (observations_df, differences_df): one row per configuration and
+    replication, and per configuration after the first and per metric the
+    mean difference with its interval. 'Variance Ratio' is Var(X) + Var(Y)
+    over Var(X - Y), roughly how many times more replications independent
+    sampling would need for the same interval width.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Expected one of {METHODS}")
+    if len(configs) < 2:
+        raise ValueError("Need at least two configurations to compare")
+    keys, tasks = _paired_tasks(configs, num_replications, seed, method, common)
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        rows = list(pool.map(_run, tasks))
+
+    runs = pd.DataFrame(rows)
+    runs['Configuration'] = [c for c, _ in keys]
+    runs['Replication'] = [r + 1 for _, r in keys]
+    # An antithetic pair is one observation: the mean of its two runs
+    observations = runs.groupby(['Configuration', 'Replication'], as_index=False).mean()
+    print(f"🔬 {len(configs)} configurations x {num_replications} observations "
+          f"({len(tasks)} runs, method={method})")
+
+    base = observations[observations['Configuration'] == 0].set_index('Replication')[list(COMPARE_METRICS)]
+    tables = []
+    for c in range(1, len(configs)):
+        other = observations[observations['Configuration'] == c].set_index('Replication')[list(COMPARE_METRICS)]
+        differences = (other - base).reset_index()
+        table = confidence_intervals(differences, confidence)
+        table['Variance Ratio'] = (other.var(ddof=1) + base.var(ddof=1)).values / table['Std Dev'].values ** 2
+        table.insert(0, 'Configuration', str(configs[c]))
+        table.insert(1, 'Baseline', str(configs[0]))
+        tables.append(table)
+    return observations, pd.concat(tables, ignore_index=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare lane counts with paired-difference confidence intervals.')
+    parser.add_argument('--servers', type=int, nargs='+', default=[3, 4],
+                        help='Lane counts to compare; the first is the baseline')
+    parser.add_argument('--method', choices=METHODS, default='crn')
+    parser.add_argument('--replications', type=int, default=10)
+    parser.add_argument('--customers', type=int, default=500)
+    parser.add_argument('--inter-arrival', type=float, default=1.0)
+    parser.add_argument('--service', type=float, default=2.5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    _, differences = compare_configurations([{'num_servers': n} for n in args.servers], args.replications,
+                                            args.seed, args.method, max_workers=args.workers,
+                                            num_customers=args.customers, mean_inter_arrival=args.inter_arrival,
+                                            mean_service_time=args.service)
+    print("\n📈 Paired differences vs baseline:")
+    print(differences.to_string(index=False))
+    return differences
+
+if __name__ == "__main__":
+    main()
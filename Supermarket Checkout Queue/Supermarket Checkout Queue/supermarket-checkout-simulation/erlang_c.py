@@ -0,0 +1,90 @@
+import math
+
+def erlang_c(num_servers, offered_load):
+    """
+    Probability that an arriving customer has to wait in an M/M/c queue
+    (Erlang C), for `offered_load` = arrival rate / service rate in Erlangs.
+
+    Built from the Erlang B recursion B(k) = a B(k-1) / (k + a B(k-1)), which
+    stays stable for hundreds of lanes where the textbook factorial sums overflow.
+    """
+    if offered_load >= num_servers:
+        return 1.0
+    if offered_load <= 0:
+        return 0.0
+    blocking = 1.0
+    for k in range(1, num_servers + 1):
+        blocking = offered_load * blocking / (k + offered_load * blocking)
+    return num_servers * blocking / (num_servers - offered_load * (1 - blocking))
+
+def mmc_metrics(mean_inter_arrival=1.0, mean_service_time=2.5, num_servers=3):
+    """
+    Steady-state M/M/c metrics in closed form.
+
+    Parameters:
+    - mean_inter_arrival: Average time between arrivals (minutes)
+    - mean_service_time: Average service time (minutes)
+    - num_servers: Number of lanes sharing one FCFS queue
+
+    Returns a dict with utilization, prob_wait (P(wait > 0)), mean_wait,
+    p95_wait, mean_queue_length and mean_time_in_system (minutes / customers).
+    An unstable system (utilization >= 1) has infinite waits.
+    """
+    arrival_rate = 1 / mean_inter_arrival
+    service_rate = 1 / mean_service_time
+    offered_load = arrival_rate / service_rate
+    utilization = offered_load / num_servers
+    prob_wait = erlang_c(num_servers, offered_load)
+    if utilization >= 1:
+        mean_wait = math.inf
+    else:
+        mean_wait = prob_wait / (num_servers * service_rate - arrival_rate)
+    return {
+        'num_servers': num_servers,
+        'offered_load': offered_load,
+        'utilization': utilization,
+        'prob_wait': prob_wait,
+        'mean_wait': mean_wait,
+        'p95_wait': wait_quantile(0.95, mean_inter_arrival, mean_service_time, num_servers),
+        'mean_queue_length': arrival_rate * mean_wait,
+        'mean_time_in_system': mean_wait + mean_service_time
+    }
+
+def prob_wait_exceeds(t, mean_inter_arrival=1.0, mean_service_time=2.5, num_servers=3):
+    """
+    P(wait > t): the waiting time is 0 with probability 1 - C, otherwise
+    exponential with rate c*mu - lambda.
+    """
+    arrival_rate = 1 / mean_inter_arrival
+    service_rate = 1 / mean_service_time
+    drain_rate = num_servers * service_rate - arrival_rate
+    if drain_rate <= 0:
+        return 1.0
+    return erlang_c(num_servers, arrival_rate / service_rate) * math.exp(-drain_rate * t)
+
+def wait_quantile(q, mean_inter_arrival=1.0, mean_service_time=2.5, num_servers=3):
+    """
+    The q-quantile of the waiting time (e.g. q=0.95 for the 95th percentile).
+    """
+    arrival_rate = 1 / mean_inter_arrival
+    service_rate = 1 / mean_service_time
+    drain_rate = num_servers * service_rate - arrival_rate
+    if drain_rate <= 0:
+        return math.inf
+    prob_wait = erlang_c(num_servers, arrival_rate / service_rate)
+    if prob_wait <= 1 - q:
+        return 0.0
+    return math.log(prob_wait / (1 - q)) / drain_rate
+
+def min_stable_servers(mean_inter_arrival=1.0, mean_service_time=2.5):
+    """
+    Fewest lanes with utilization below 1.
+    """
+    return math.floor(mean_service_time / mean_inter_arrival) + 1
+
+if __name__ == "__main__":
+    # The generate_data defaults: lambda = 1.0/min, mu = 0.4/min
+    for servers in range(3, 7):
+        m = mmc_metrics(1.0, 2.5, servers)
+        print(f"{servers} lanes: utilization {m['utilization']:.1%}, P(wait) {m['prob_wait']:.3f}, "
+              f"mean wait {m['mean_wait']:.2f} min, p95 wait {m['p95_wait']:.2f} min")
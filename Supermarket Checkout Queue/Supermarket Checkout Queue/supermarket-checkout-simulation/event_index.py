@@ -0,0 +1,139 @@
+import numpy as np
+
+def _sorted(values):
+    values = np.asarray(values, dtype=float)
+    # Results are stored in departure order, so arrival and start times usually need sorting
+    return values if np.all(values[1:] >= values[:-1]) else np.sort(values)
+
+class StepFunction:
+    """
+    A right-continuous count over time, +1 at each `up` time and -1 at each
+    `down` time (e.g. arrivals and service starts for the queue length).
+
+    The two sorted event arrays are merged in O(n) (a stable sort of two
+    concatenated runs), collapsed to one level per distinct time, and the area
+    under the steps is kept as a prefix sum. Point values and the integral up
+    to any time are then one binary search each, so windowed time-weighted
+    averages over arbitrary intervals cost O(log n).
+
+    Parameters:
+    - up_times: Times the count rises by one
+    - down_times: Times the count falls by one (each at or after its rise)
+    """
+    def __init__(self, up_times, down_times):
+        up_times = _sorted(up_times)
+        down_times = _sorted(down_times)
+        times = np.concatenate([up_times, down_times])
+        changes = np.concatenate([np.ones(len(up_times), dtype=np.int64),
+                                  -np.ones(len(down_times), dtype=np.int64)])
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        levels = np.cumsum(changes[order])
+
+        # Keep the level after the last change at each distinct time
+        last = np.flatnonzero(np.append(times[1:] != times[:-1], True)) if len(times) else order
+        self.times = times[last]
+        self.levels = levels[last]
+        # area[i]: integral of the count from the first event to times[i]
+        self.area = np.zeros(len(self.times))
+        if len(self.times) > 1:
+            np.cumsum(self.levels[:-1] * np.diff(self.times), out=self.area[1:])
+
+    def __len__(self):
+        return len(self.times)
+
+    def value_at(self, t):
+        """
+        The count at time(s) `t` (after any change at exactly `t`).
+        """
+        idx = np.searchsorted(self.times, t, side='right') - 1
+        values = np.where(idx >= 0, self.levels[np.maximum(idx, 0)], 0) if len(self) else np.zeros_like(idx)
+        return values if np.ndim(values) else int(values)
+
+    def integral_to(self, t):
+        """
+        Area under the count from the first event up to time(s) `t`.
+        """
+        if not len(self):
+            return np.zeros(np.shape(t)) if np.ndim(t) else 0.0
+        idx = np.searchsorted(self.times, t, side='right') - 1
+        safe = np.maximum(idx, 0)
+        area = self.area[safe] + self.levels[safe] * (np.asarray(t, dtype=float) - self.times[safe])
+        area = np.where(idx >= 0, area, 0.0)
+        return area if np.ndim(area) else float(area)
+
+    def time_average(self, start=None, end=None):
+        """
+        Time-weighted mean of the count over [start, end] (default: first to last event).
+        `start` and `end` may be arrays of window bounds.
+        """
+        start = self.times[0] if start is None else start
+        end = self.times[-1] if end is None else end
+        width = np.asarray(end, dtype=float) - np.asarray(start, dtype=float)
+        area = self.integral_to(end) - self.integral_to(start)
+        mean = np.divide(area, width, out=np.zeros(np.shape(width)), where=width > 0)
+        return mean if np.ndim(mean) else float(mean)
+
+    def peak(self):
+        """
+        (time, level) of the first time the count reaches its maximum.
+        """
+        if not len(self):
+            return 0.0, 0
+        i = int(np.argmax(self.levels))
+        return float(self.times[i]), int(self.levels[i])
+
+class QueueStateIndex:
+    """
+    Time index of the system state built once from a results table: the number
+    of customers waiting (arrival to service start) and of busy lanes (service
+    start to end). Both are StepFunctions, so queue length or busy lanes at any
+    time, and their time-weighted averages over any window, are O(log n).
+
+    Parameters:
+    - arrival_times, start_times, end_times: One entry per customer, in any order
+    """
+    def __init__(self, arrival_times, start_times, end_times):
+        self.queue = StepFunction(arrival_times, start_times)
+        self.busy = StepFunction(start_times, end_times)
+        self.num_customers = len(arrival_times)
+
+    @classmethod
+    def from_results(cls, df):
+        return cls(df['Arrival Time'].to_numpy(), df['Service Start Time'].to_numpy(),
+                   df['Service End Time'].to_numpy())
+
+    def queue_length_at(self, t):
+        return self.queue.value_at(t)
+
+    def busy_lanes_at(self, t):
+        return self.busy.value_at(t)
+
+    def mean_queue_length(self, start=None, end=None):
+        return self.queue.time_average(start, end)
+
+    def mean_busy_lanes(self, start=None, end=None):
+        return self.busy.time_average(start, end)
+
+    def littles_law(self, start, end, mean_wait, mean_time_in_system):
+        """
+        Compares the time-weighted number waiting (Lq) and in the system (L) over
+        [start, end] with the arrival rate times the mean wait / time in system
+        (Little's law: L = lambda * W). Over a horizon that holds every customer
+        the two sides agree to rounding; a gap means the stored wait and
+        time-in-system columns disagree with the event times.
+        """
+        duration = end - start
+        arrival_rate = self.num_customers / duration if duration > 0 else 0.0
+        queue = self.mean_queue_length(start, end)
+        in_system = queue + self.mean_busy_lanes(start, end)
+        check = {
+            'arrival_rate': arrival_rate,
+            'L_queue': queue,
+            'lambda_W_queue': arrival_rate * mean_wait,
+            'L_system': in_system,
+            'lambda_W_system': arrival_rate * mean_time_in_system
+        }
+        expected = check['lambda_W_system']
+        check['relative_error'] = abs(in_system - expected) / expected if expected > 0 else 0.0
+        return check
@@ -1,46 +1,239 @@
 import pandas as pd
 import numpy as np
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-def generate_data(num_customers=500, mean_inter_arrival=1.0, mean_service_time=2.5, seed=42):
+# Expected arrival candidates per generation window. Windows are sized from
+# the peak rate alone, so the output never depends on worker count.
+WINDOW_TARGET_CANDIDATES = 65_536
+
+# Customers per hour, midnight to midnight: closed overnight, a lunch peak
+# at 12-14h and an evening peak at 17-19h (about 1,900 customers a day)
+DAILY_PROFILE = (0, 0, 0, 0, 0, 0, 0, 20, 60, 80, 90, 110,
+                 200, 190, 100, 90, 120, 220, 240, 160, 100, 60, 30, 0)
+
+MIN_SERVICE_TIME = 0.5
+
+def _window_minutes(peak_rate):
+    """
+    Window length holding at most ~WINDOW_TARGET_CANDIDATES arrivals at the
+    peak rate: a whole number of hours at low rates, otherwise 60 / n minutes,
+    so window edges still fall on the rate profile's hour edges.
+    """
+    per_hour = peak_rate * 60
+    if per_hour <= WINDOW_TARGET_CANDIDATES:
+        return 60.0 * int(np.ceil(WINDOW_TARGET_CANDIDATES / per_hour))
+    return 60.0 / int(np.ceil(per_hour / WINDOW_TARGET_CANDIDATES))
+
+def common_window_minutes(mean_inter_arrivals):
+    """
+    One window length for several arrival rates: the shortest of their own
+    windows (still a whole number of hours or 60 / n minutes), so memory stays
+    bounded for the fastest. Pass it as generate_data(window_minutes=...) to
+    every configuration compared under common random numbers.
+    """
+    return min(_window_minutes(1 / mean) for mean in mean_inter_arrivals)
+
+def _uniforms(rng, size, antithetic):
+    """
+    Uniforms in [0, 1) for inverse-transform sampling; the antithetic run of the
+    same stream uses 1 - u (kept below 1 so every inverse stays finite).
+    """
+    u = rng.random(size)
+    return np.minimum(1 - u, np.nextafter(1, 0)) if antithetic else u
+
+def _exponential(u, mean):
+    return -mean * np.log1p(-u)
+
+def _generate_window(seed_seq, window_start, window_minutes, peak_rate, rate_profile,
+                     mean_service_time, mean_items, antithetic=False):
+    """
+    Customers arriving in [window_start, window_start + window_minutes).
+
+    Every quantity is drawn by inverse transform from its own child stream
+    of the window's SeedSequence (arrival gaps, thinning, services, items),
+    so for a given window seed the k-th customer of the window gets the same
+    uniforms whatever the rates, and `antithetic` mirrors every uniform.
+    Traces only line up window by window when they share the window length:
+    the default length follows the peak rate, so configurations with
+    different rates compared under common random numbers must pass one
+    window_minutes (see common_window_minutes).
+
+    Arrivals at the peak rate are cumulative exponential gaps; with a rate
+    profile each candidate is kept with probability rate(t) / peak rate
+    (thinning), all vectorised.
+    """
+    arrival_rng, thinning_rng, service_rng, items_rng = (np.random.default_rng(s) for s in seed_seq.spawn(4))
+    expected = peak_rate * window_minutes
+    offsets = np.empty(0)
+    while not len(offsets) or offsets[-1] < window_minutes:
+        # Draw gaps in batches (mean + 6 sd) until the window is covered
+        gaps = _exponential(_uniforms(arrival_rng, int(expected + 6 * np.sqrt(expected)) + 16, antithetic),
+                            1 / peak_rate)
+        offsets = np.concatenate([offsets, (offsets[-1] if len(offsets) else 0) + np.cumsum(gaps)])
+    arrival_times = window_start + offsets[offsets < window_minutes]
+    if rate_profile is not None:
+        hours = (arrival_times // 60).astype(np.int64) % len(rate_profile)
+        keep = _uniforms(thinning_rng, len(arrival_times), antithetic) * peak_rate < rate_profile[hours] / 60
+        arrival_times = arrival_times[keep]
+
+    num_customers = len(arrival_times)
+    # Adding a small buffer to avoid near-zero service times which are unrealistic for checkout
+    service_times = np.maximum(_exponential(_uniforms(service_rng, num_customers, antithetic), mean_service_time),
+                               MIN_SERVICE_TIME)
+    columns = {
+        'Arrival Time': np.round(arrival_times, 2),
+        'Service Time': np.round(service_times, 2)
+    }
+    if mean_items is not None:
+        # Geometric (at least 1 item) by inverse transform
+        u = _uniforms(items_rng, num_customers, antithetic)
+        columns['Items'] = np.ceil(np.log1p(-u) / np.log1p(-1 / mean_items)).astype(np.int64).clip(min=1)
+    return columns
+
+def _generate_windows(root_seed, window_minutes, peak_rate, rate_profile, mean_service_time,
+                      mean_items, workers, antithetic=False):
+    """
+    Yields every window's columns in time order. Window k always uses the k-th
+    child spawned from `root_seed`, whichever worker generates it; at most
+    2 * workers windows are in flight, which bounds memory.
+    """
+    def window_args(k):
+        return (root_seed.spawn(1)[0], k * window_minutes, window_minutes, peak_rate, rate_profile,
+                mean_service_time, mean_items, antithetic)
+
+    k = 0
+    if workers <= 1:
+        while True:
+            yield _generate_window(*window_args(k))
+            k += 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        while True:
+            while len(in_flight) < 2 * workers:
+                in_flight.append(executor.submit(_generate_window, *window_args(k)))
+                k += 1
+            yield in_flight.popleft().result()
+
+def customer_chunks(mean_inter_arrival=1.0, mean_service_time=2.5, seed=42, mean_items=None,
+                    rate_profile=None, workers=1, antithetic=False, window_minutes=None):
+    """
+    Endless stream of customers, one DataFrame per non-empty generation window,
+    with Customer IDs continuing from 1. Taking the first n customers gives
+    exactly generate_data(n, ...) for the same arguments, so callers that do
+    not know the run length in advance (adaptive.py) draw the same customers.
+    Parameters are as in generate_data.
+    """
+    root_seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    # A private copy: spawning must not advance the caller's SeedSequence
+    root_seed = np.random.SeedSequence(root_seed.entropy, spawn_key=root_seed.spawn_key,
+                                       pool_size=root_seed.pool_size)
+    if rate_profile is not None:
+        rate_profile = np.asarray(rate_profile, dtype=float)
+        peak_rate = rate_profile.max() / 60
+        if peak_rate <= 0:
+            raise ValueError("rate_profile needs at least one hour with a positive arrival rate")
+    else:
+        peak_rate = 1 / mean_inter_arrival
+    workers = os.cpu_count() if workers is None else workers
+
+    window_minutes = window_minutes or _window_minutes(peak_rate)
+    windows = _generate_windows(root_seed, window_minutes, peak_rate, rate_profile,
+                                mean_service_time, mean_items, workers, antithetic)
+    generated = 0
+    try:
+        for columns in windows:
+            size = len(columns['Arrival Time'])
+            if size == 0:
+                continue
+            chunk = pd.DataFrame({'Customer ID': np.arange(generated + 1, generated + size + 1)})
+            for name, values in columns.items():
+                chunk[name] = values
+            generated += size
+            yield chunk
+    finally:
+        windows.close()
+
+def generate_data(num_customers=500, mean_inter_arrival=1.0, mean_service_time=2.5, seed=42,
+                  output_path='customers.csv', mean_items=None, rate_profile=None, workers=1,
+                  return_df=True, antithetic=False, window_minutes=None):
     """
     Generates synthetic customer data for supermarket simulation.
-    
+
     Parameters:
     - num_customers: Total number of customers to generate
-    - mean_inter_arrival: Average time between arrivals (minutes) - Exponential distribution
+    - mean_inter_arrival: Average time between arrivals (minutes) - Poisson arrivals
     - mean_service_time: Average service time (minutes) - Exponential distribution
-    - seed: Random seed for reproducibility
-    """
-    np.random.seed(seed)
-    
-    # Generate Inter-arrival times (Exponential distribution)
-    inter_arrival_times = np.random.exponential(scale=mean_inter_arrival, size=num_customers)
-    
-    # Calculate exact arrival times (Cumulative sum)
-    arrival_times = np.cumsum(inter_arrival_times)
-    
-    # Generate Service times (Exponential distribution)
-    # Adding a small buffer to avoid near-zero service times which are unrealistic for checkout
-    min_service_time = 0.5
-    service_times = np.random.exponential(scale=mean_service_time, size=num_customers) 
-    
-    # Ensure no service time is below minimum (optional realism adjustment)
-    service_times = np.maximum(service_times, min_service_time)
-    
-    # Create DataFrame
-    df = pd.DataFrame({
-        'Customer ID': range(1, num_customers + 1),
-        'Arrival Time': np.round(arrival_times, 2),
-        'Service Time': np.round(service_times, 2)
-    })
-    
-    # Save to CSV
-    output_path = 'customers.csv'
-    df.to_csv(output_path, index=False)
-    print(f"✅ Generated {num_customers} customers in '{output_path}'")
-    print(f"   Mean Inter-arrival: {mean_inter_arrival} min (Target: {mean_inter_arrival})")
-    print(f"   Mean Service Time: {df['Service Time'].mean():.2f} min (Target: {mean_service_time})")
+    - seed: Seed for the numpy Generator streams, an int or a numpy.random.SeedSequence
+      (used by replications)
+    - output_path: CSV file to write, or None to keep the data in memory only
+    - mean_items: Average basket size; when set, an 'Items' column (Geometric
+      distribution, at least 1 item) is added for express-lane eligibility
+    - rate_profile: Arrival rate per hour of the day in customers/hour (e.g.
+      DAILY_PROFILE), repeated day after day, for non-homogeneous Poisson
+      arrivals. Replaces mean_inter_arrival
+    - workers: Processes generating time windows in parallel (None = all cores).
+      The output is identical for any number of workers
+    - return_df: Return the customers DataFrame. Set False for traces larger
+      than memory; the CSV is then written window by window and None is returned
+    - antithetic: Mirror every uniform draw (u -> 1 - u). With the same seed,
+      the plain and antithetic traces form a negatively correlated pair
+      (see compare.py)
+    - window_minutes: Generation window length. Defaults to one sized from the
+      peak rate; configurations with different rates that must share random
+      numbers pass the same value (common_window_minutes)
+
+    Time is split into windows (whole hours, or whole fractions of an hour at
+    high rates), each drawn from its own child of the SeedSequence, so windows
+    can be generated independently and streamed with bounded memory.
+    """
+    if rate_profile is not None:
+        rate_profile = np.asarray(rate_profile, dtype=float)
+        if rate_profile.max() <= 0:
+            raise ValueError("rate_profile needs at least one hour with a positive arrival rate")
+    if not return_df and output_path is None:
+        raise ValueError("Nothing to do: set output_path or return_df")
+
+    stream = customer_chunks(mean_inter_arrival, mean_service_time, seed, mean_items, rate_profile,
+                             workers, antithetic, window_minutes)
+    chunks = []
+    generated = 0
+    service_total = 0.0
+    last_arrival = 0.0
+    try:
+        while generated < num_customers:
+            chunk = next(stream)
+            if len(chunk) > num_customers - generated:
+                chunk = chunk.iloc[:num_customers - generated]
+            if output_path is not None:
+                chunk.to_csv(output_path, index=False, mode='w' if generated == 0 else 'a',
+                             header=generated == 0)
+            if return_df:
+                chunks.append(chunk)
+            generated += len(chunk)
+            service_total += chunk['Service Time'].sum()
+            last_arrival = chunk['Arrival Time'].iat[-1]
+    finally:
+        stream.close()
+
+    columns = ['Customer ID', 'Arrival Time', 'Service Time'] + (['Items'] if mean_items is not None else [])
+    empty = pd.DataFrame(columns=columns)
+    df = (pd.concat(chunks, ignore_index=True) if chunks else empty) if return_df else None
+
+    if output_path is None:
+        return df
+
+    if generated == 0:
+        empty.to_csv(output_path, index=False)
+    print(f"✅ Generated {generated} customers in '{output_path}'")
+    if rate_profile is None:
+        print(f"   Mean Inter-arrival: {last_arrival / max(generated, 1):.2f} min (Target: {mean_inter_arrival})")
+    else:
+        print(f"   Arrival profile: {len(rate_profile)} hours, peak {rate_profile.max():.0f}/hour, "
+              f"trace spans {last_arrival / 60:.1f} hours")
+    print(f"   Mean Service Time: {service_total / max(generated, 1):.2f} min (Target: {mean_service_time})")
     return df
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import os
+import io
+import sys
+import json
+import time
+import pstats
+import cProfile
+import resource
+import tracemalloc
+from contextlib import contextmanager
+
+def peak_rss_mb(children=False):
+    """
+    Peak resident set size of this process so far, in MB. With `children`,
+    the peak of the largest child process that has been waited for instead.
+    """
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class Instrumentation:
+    """
+    Collects per-stage timings and engine counters for one pipeline run.
+
+    Parameters:
+    - trace_memory: Track each stage's peak Python allocation with tracemalloc
+      (accurate but slows allocation-heavy stages; process peak RSS is always recorded)
+    - profile_stages: Stage names to run under cProfile
+    - profile_dir: Where .prof files for profiled stages are written
+    """
+    def __init__(self, trace_memory=False, profile_stages=(), profile_dir='outputs'):
+        self.trace_memory = trace_memory
+        self.profile_stages = set(profile_stages)
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.counters = {}
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times the enclosed block as stage `name` (wall, CPU, memory, optional cProfile).
+        """
+        profiler = cProfile.Profile() if name in self.profile_stages else None
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        record = {'name': name}
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler:
+                profiler.disable()
+            record['start_seconds'] = wall_start - self._origin
+            record['wall_seconds'] = time.perf_counter() - wall_start
+            record['cpu_seconds'] = time.process_time() - cpu_start
+            record['peak_rss_mb'] = peak_rss_mb()
+            if self.trace_memory:
+                record['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+            if profiler:
+                record['profile'] = self._save_profile(name, profiler)
+            self.stages.append(record)
+
+    def _save_profile(self, name, profiler):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f'profile_{name}.prof')
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(15)
+        return {'path': path, 'top_cumulative': summary.getvalue()}
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_max(self, name, value):
+        self.counters[name] = max(self.counters.get(name, value), value)
+
+    def to_dict(self):
+        return {'stages': self.stages, 'counters': self.counters}
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_chrome_trace(self, path):
+        """
+        Chrome trace-event file (open in chrome://tracing or Perfetto):
+        one complete event per stage, and the engine counters at the end.
+        """
+        pid = os.getpid()
+        events = []
+        for stage in self.stages:
+            events.append({
+                'name': stage['name'], 'ph': 'X', 'pid': pid, 'tid': 0,
+                'ts': stage['start_seconds'] * 1e6, 'dur': stage['wall_seconds'] * 1e6,
+                'args': {k: v for k, v in stage.items()
+                         if k in ('cpu_seconds', 'peak_rss_mb', 'peak_traced_mb')}
+            })
+        end = max((s['start_seconds'] + s['wall_seconds'] for s in self.stages), default=0)
+        for name, value in self.counters.items():
+            events.append({'name': name, 'ph': 'C', 'pid': pid, 'ts': end * 1e6, 'args': {name: value}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -1,33 +1,178 @@
-import generate_data
-import simulation
-import analysis
-import visualizations
 import os
+import argparse
+from contextlib import nullcontext
+
+# Pipeline modules pull in pandas, SimPy, matplotlib and SciPy, so each is
+# imported inside the command that needs it: `--help` answers immediately and
+# headless runs never load the plotting stack.
+
+def run_pipeline(results_file='simulation_results.npy', export_csv=False, profile_json=None,
+                 chrome_trace=None, cprofile_stages=(), trace_memory=False, plots=True, metrics_json=None,
+                 num_customers=500, num_servers=3, engine='simpy', seed=42, dpi=150):
+    """
+    Runs the full pipeline. The results table is handed from stage to stage in
+    memory; it is persisted once to `results_file` (columnar .npy by default)
+    and exported to simulation_results.csv only when `export_csv` is set.
+
+    Headless runs (plots=False) skip the visualization stage and never import
+    matplotlib; `metrics_json` writes the analysis metrics as JSON.
+
+    Instrumentation (enabled by any of the options below):
+    - profile_json: Write per-stage wall/CPU time, peak memory and engine counters as JSON
+    - chrome_trace: Write the same run as a Chrome trace-event file
+    - cprofile_stages: Stage names ('generate', 'simulate', 'analyze', 'visualize') to run under cProfile
+    - trace_memory: Also record each stage's peak Python allocation (tracemalloc)
+    """
+    import generate_data
+    import simulation
+    import analysis
+    from results_io import save_results
+
+    instrumented = profile_json or chrome_trace or cprofile_stages or trace_memory
+    if instrumented:
+        from instrumentation import Instrumentation
+        inst = Instrumentation(trace_memory, cprofile_stages)
+    else:
+        inst = None
+    stage = inst.stage if inst else (lambda name: nullcontext())
+    num_stages = 4 if plots else 3
 
-def main():
     print("🚀 Starting Supermarket Queue Simulation System...")
     print("-" * 50)
-    
+
     # 1. Generate Data
-    print("\n[1/4] Generating Customer Data...")
-    generate_data.generate_data(num_customers=500, mean_inter_arrival=1.0, mean_service_time=2.5)
-    
+    print(f"\n[1/{num_stages}] Generating Customer Data...")
+    with stage('generate'):
+        customers_df = generate_data.generate_data(num_customers=num_customers, mean_inter_arrival=1.0,
+                                                   mean_service_time=2.5, seed=seed)
+
     # 2. Run Simulation
-    print("\n[2/4] Running Simulation Engine...")
-    simulation.run_simulation()
-    
+    print(f"\n[2/{num_stages}] Running Simulation Engine...")
+    with stage('simulate'):
+        results_df, _ = simulation.run_simulation(customers_df, num_servers=num_servers, engine=engine,
+                                                  output_file=results_file, instrumentation=inst)
+        if export_csv:
+            save_results(results_df, 'simulation_results.csv')
+            print("📄 Results exported to simulation_results.csv")
+
     # 3. Analyze Results
-    print("\n[3/4] Analyzing Performance Metrics...")
-    analysis.analyze_results()
-    
+    print(f"\n[3/{num_stages}] Analyzing Performance Metrics...")
+    with stage('analyze'):
+        analysis.analyze_results(results_df, metrics_json=metrics_json)
+
     # 4. Visualize
-    print("\n[4/4] Generating Visualizations...")
-    visualizations.generate_visualizations()
-    
+    if plots:
+        import visualizations
+        print(f"\n[4/{num_stages}] Generating Visualizations...")
+        with stage('visualize'):
+            visualizations.generate_visualizations(results_df, dpi=dpi)
+
+    if profile_json:
+        inst.write_json(profile_json)
+        print(f"⏱️ Stage profile written to {profile_json}")
+    if chrome_trace:
+        inst.write_chrome_trace(chrome_trace)
+        print(f"⏱️ Chrome trace written to {chrome_trace}")
+
     print("-" * 50)
     print("✅ System execution complete!")
-    print(f"📂 Outputs available in: {os.path.abspath('outputs')}")
+    if plots:
+        print(f"📂 Outputs available in: {os.path.abspath('outputs')}")
     print(f"📄 Report available in: {os.path.abspath('analysis_report.txt')}")
 
+def cmd_generate(args):
+    import generate_data
+    rate_profile = generate_data.DAILY_PROFILE if args.daily_profile else None
+    generate_data.generate_data(args.customers, args.inter_arrival, args.service, seed=args.seed,
+                                output_path=args.output, mean_items=args.mean_items,
+                                rate_profile=rate_profile, workers=args.workers, return_df=False)
+
+def cmd_simulate(args):
+    import simulation
+    simulation.run_simulation(args.input, num_servers=args.servers, engine=args.engine,
+                              output_file=args.output, chunksize=args.chunksize, routing=args.routing,
+                              append=args.append)
+
+def cmd_analyze(args):
+    import analysis
+    analysis.analyze_results(args.results, incremental=args.incremental, metrics_json=args.metrics_json)
+
+def cmd_plot(args):
+    import visualizations
+    visualizations.generate_visualizations(args.results, parallel=not args.serial, dpi=args.dpi)
+
+def cmd_run(args):
+    run_pipeline(args.results, export_csv=args.export_csv, profile_json=args.profile_json,
+                 chrome_trace=args.chrome_trace, cprofile_stages=args.cprofile, trace_memory=args.trace_memory,
+                 plots=not args.no_plots, metrics_json=args.metrics_json, num_customers=args.customers,
+                 num_servers=args.servers, engine=args.engine, seed=args.seed, dpi=args.dpi)
+
+def build_parser():
+    # Choices are spelled out here rather than read from the modules, which would import them
+    engines = ('simpy', 'fast')
+    parser = argparse.ArgumentParser(description='Supermarket checkout queue simulation.')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    generate = commands.add_parser('generate', help='Generate synthetic customers')
+    generate.add_argument('--customers', type=int, default=500)
+    generate.add_argument('--inter-arrival', type=float, default=1.0)
+    generate.add_argument('--service', type=float, default=2.5)
+    generate.add_argument('--seed', type=int, default=42)
+    generate.add_argument('--mean-items', type=float, default=None)
+    generate.add_argument('--daily-profile', action='store_true',
+                          help='Use the built-in hourly arrival profile instead of --inter-arrival')
+    generate.add_argument('--workers', type=int, default=1)
+    generate.add_argument('--output', default='customers.csv')
+    generate.set_defaults(func=cmd_generate)
+
+    simulate = commands.add_parser('simulate', help='Simulate a customer file')
+    simulate.add_argument('--input', default='customers.csv')
+    simulate.add_argument('--servers', type=int, default=3)
+    simulate.add_argument('--engine', choices=engines, default='simpy')
+    simulate.add_argument('--routing', choices=('jsq', 'lwl', 'p2c'), default=None,
+                          help='Give every lane its own queue with this routing policy')
+    simulate.add_argument('--chunksize', type=int, default=None, help='Stream the input in chunks')
+    simulate.add_argument('--append', action='store_true', help='Append to an existing results file')
+    simulate.add_argument('--output', default='simulation_results.npy')
+    simulate.set_defaults(func=cmd_simulate)
+
+    analyze = commands.add_parser('analyze', help='Report metrics for a results file')
+    analyze.add_argument('results', nargs='?', default='simulation_results.npy')
+    analyze.add_argument('--incremental', action='store_true', help='Only read rows appended since last time')
+    analyze.add_argument('--metrics-json', default=None)
+    analyze.set_defaults(func=cmd_analyze)
+
+    plot = commands.add_parser('plot', help='Render the charts for a results file')
+    plot.add_argument('results', nargs='?', default='simulation_results.npy')
+    plot.add_argument('--dpi', type=int, default=150)
+    plot.add_argument('--serial', action='store_true', help='Render in this process')
+    plot.set_defaults(func=cmd_plot)
+
+    run = commands.add_parser('run', help='Generate, simulate, analyze and plot (the default)')
+    run.add_argument('--customers', type=int, default=500)
+    run.add_argument('--servers', type=int, default=3)
+    run.add_argument('--engine', choices=engines, default='simpy')
+    run.add_argument('--seed', type=int, default=42)
+    run.add_argument('--results', default='simulation_results.npy')
+    run.add_argument('--export-csv', action='store_true')
+    run.add_argument('--no-plots', action='store_true', help='Headless: skip the charts')
+    run.add_argument('--metrics-json', default=None)
+    run.add_argument('--dpi', type=int, default=150)
+    run.add_argument('--profile-json', default=None)
+    run.add_argument('--chrome-trace', default=None)
+    run.add_argument('--cprofile', nargs='+', default=(), metavar='STAGE',
+                     choices=('generate', 'simulate', 'analyze', 'visualize'))
+    run.add_argument('--trace-memory', action='store_true')
+    run.set_defaults(func=cmd_run)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        # `python main.py` keeps running the whole pipeline
+        args = parser.parse_args(['run'])
+    args.func(args)
+
 if __name__ == "__main__":
     main()
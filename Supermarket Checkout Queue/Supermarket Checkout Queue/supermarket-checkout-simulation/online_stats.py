@@ -0,0 +1,269 @@
+import math
+import pandas as pd
+import numpy as np
+
+class RunningMoments:
+    """
+    Welford running mean/variance. Batches are folded in with Chan's parallel
+    update, and two instances can be merged the same way.
+    """
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def update_batch(self, values):
+        values = np.asarray(values, dtype=float)
+        if len(values):
+            batch_mean = float(values.mean())
+            self.merge(RunningMoments(len(values), batch_mean, float(((values - batch_mean) ** 2).sum())))
+
+    def merge(self, other):
+        count = self.count + other.count
+        if count == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['count'], state['mean'], state['m2'])
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy (DDSketch-style).
+
+    Positive values fall into logarithmic buckets (gamma = (1+a)/(1-a)); values
+    at or below `min_value` (zero waits, and float noise like -4e-16) share a
+    zero bucket. Any quantile is within `relative_accuracy` of the true value.
+    Memory is O(log(max/min) / a) buckets whatever the number of values, updates
+    are vectorised with np.bincount, and sketches merge by adding bucket counts.
+    """
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.zero_count = 0
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def count(self):
+        return self.zero_count + int(self.counts.sum())
+
+    def _grow(self, low, high):
+        if not len(self.counts):
+            self.offset = low
+            self.counts = np.zeros(high - low + 1, dtype=np.int64)
+            return
+        new_low = min(low, self.offset)
+        new_high = max(high, self.offset + len(self.counts) - 1)
+        if new_low == self.offset and new_high == self.offset + len(self.counts) - 1:
+            return
+        counts = np.zeros(new_high - new_low + 1, dtype=np.int64)
+        counts[self.offset - new_low:self.offset - new_low + len(self.counts)] = self.counts
+        self.offset, self.counts = new_low, counts
+
+    def update(self, x):
+        if x <= self.min_value:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(x) / self.log_gamma)
+        self._grow(index, index)
+        self.counts[index - self.offset] += 1
+
+    def update_batch(self, values):
+        values = np.asarray(values, dtype=float)
+        positive = values[values > self.min_value]
+        self.zero_count += len(values) - len(positive)
+        if not len(positive):
+            return
+        indices = np.ceil(np.log(positive) / self.log_gamma).astype(np.int64)
+        low, high = int(indices.min()), int(indices.max())
+        self._grow(low, high)
+        self.counts += np.bincount(indices - self.offset, minlength=len(self.counts))
+
+    def merge(self, other):
+        self.zero_count += other.zero_count
+        if len(other.counts):
+            self._grow(other.offset, other.offset + len(other.counts) - 1)
+            start = other.offset - self.offset
+            self.counts[start:start + len(other.counts)] += other.counts
+
+    def quantile(self, q):
+        total = self.count
+        if total == 0:
+            return float('nan')
+        rank = q * (total - 1)
+        if rank < self.zero_count:
+            return 0.0
+        position = int(np.searchsorted(np.cumsum(self.counts), rank - self.zero_count, side='right'))
+        index = self.offset + position
+        # Bucket midpoint in relative terms: within relative_accuracy of any member
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'min_value': self.min_value,
+            'zero_count': self.zero_count,
+            'offset': self.offset,
+            'counts': self.counts.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['relative_accuracy'], state['min_value'])
+        sketch.zero_count = state['zero_count']
+        sketch.offset = state['offset']
+        sketch.counts = np.array(state['counts'], dtype=np.int64)
+        return sketch
+
+class SimulationSummary:
+    """
+    O(lanes) replacement for the per-customer results table.
+
+    It exposes the same append() as simulation.RecordBuffer, so CheckoutLane can
+    record into it directly, plus update_batch() for blocks of fast-engine records.
+    to_metrics() returns the dict analysis.compute_metrics builds from a full table
+    (p95 wait comes from the quantile sketch, so it is approximate to 1%).
+    Summaries merge, and to_dict()/from_dict() persist them as JSON-ready state.
+    """
+    def __init__(self, num_servers, relative_accuracy=0.01):
+        self.num_servers = num_servers
+        self.relative_accuracy = relative_accuracy
+        self.wait = RunningMoments()
+        self.time_in_system = RunningMoments()
+        self.service = RunningMoments()
+        self.wait_sketch = QuantileSketch(relative_accuracy)
+        self.first_arrival = math.inf
+        self.last_departure = -math.inf
+        self.busy_time = np.zeros(num_servers)
+        self.served = np.zeros(num_servers, dtype=np.int64)
+
+    def __len__(self):
+        return self.wait.count
+
+    def append(self, customer_id, arrival, start, end, service, server_id):
+        wait = start - arrival
+        self.wait.update(wait)
+        self.time_in_system.update(wait + service)
+        self.service.update(service)
+        self.wait_sketch.update(wait)
+        self.first_arrival = min(self.first_arrival, arrival)
+        self.last_departure = max(self.last_departure, end)
+        self.busy_time[server_id - 1] += service
+        self.served[server_id - 1] += 1
+
+    def _grow(self, num_servers):
+        # Lanes beyond the ones seen so far (results appended from a larger layout)
+        if num_servers > self.num_servers:
+            extra = num_servers - self.num_servers
+            self.busy_time = np.concatenate([self.busy_time, np.zeros(extra)])
+            self.served = np.concatenate([self.served, np.zeros(extra, dtype=np.int64)])
+            self.num_servers = num_servers
+
+    def update_batch(self, records):
+        if not len(records):
+            return
+        waits = records['Wait Time'].to_numpy()
+        services = records['Service Time'].to_numpy()
+        lanes = records['Server ID'].to_numpy() - 1
+        self._grow(int(lanes.max()) + 1)
+        self.wait.update_batch(waits)
+        self.time_in_system.update_batch(records['Time in System'].to_numpy())
+        self.service.update_batch(services)
+        self.wait_sketch.update_batch(waits)
+        self.first_arrival = min(self.first_arrival, float(records['Arrival Time'].min()))
+        self.last_departure = max(self.last_departure, float(records['Service End Time'].max()))
+        self.busy_time += np.bincount(lanes, weights=services, minlength=self.num_servers)
+        self.served += np.bincount(lanes, minlength=self.num_servers)
+
+    def merge(self, other):
+        self.wait.merge(other.wait)
+        self.time_in_system.merge(other.time_in_system)
+        self.service.merge(other.service)
+        self.wait_sketch.merge(other.wait_sketch)
+        self.first_arrival = min(self.first_arrival, other.first_arrival)
+        self.last_departure = max(self.last_departure, other.last_departure)
+        self._grow(other.num_servers)
+        self.busy_time[:other.num_servers] += other.busy_time
+        self.served[:other.num_servers] += other.served
+
+    def to_dict(self):
+        return {
+            'num_servers': self.num_servers,
+            'relative_accuracy': self.relative_accuracy,
+            'wait': self.wait.to_dict(),
+            'time_in_system': self.time_in_system.to_dict(),
+            'service': self.service.to_dict(),
+            'wait_sketch': self.wait_sketch.to_dict(),
+            'first_arrival': self.first_arrival,
+            'last_departure': self.last_departure,
+            'busy_time': self.busy_time.tolist(),
+            'served': self.served.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        summary = cls(state['num_servers'], state['relative_accuracy'])
+        summary.wait = RunningMoments.from_dict(state['wait'])
+        summary.time_in_system = RunningMoments.from_dict(state['time_in_system'])
+        summary.service = RunningMoments.from_dict(state['service'])
+        summary.wait_sketch = QuantileSketch.from_dict(state['wait_sketch'])
+        summary.first_arrival = state['first_arrival']
+        summary.last_departure = state['last_departure']
+        summary.busy_time = np.array(state['busy_time'], dtype=float)
+        summary.served = np.array(state['served'], dtype=np.int64)
+        return summary
+
+    def to_metrics(self):
+        total_duration_minutes = self.last_departure - self.first_arrival
+        active = self.served > 0
+        server_ids = np.arange(1, self.num_servers + 1)[active]
+        server_stats = pd.DataFrame({
+            'Server ID': server_ids,
+            'Total Busy Time': self.busy_time[active],
+            'Utilization (%)': self.busy_time[active] / self.last_departure * 100
+        })
+        customers_per_server = pd.DataFrame({
+            'Server ID': server_ids,
+            'Customer Count': self.served[active]
+        })
+        return {
+            'total_customers': self.wait.count,
+            'total_duration_minutes': total_duration_minutes,
+            'throughput_per_hour': self.wait.count / total_duration_minutes * 60,
+            'avg_waiting_time': self.wait.mean,
+            'avg_time_in_system': self.time_in_system.mean,
+            'wait_time_p95': self.wait_sketch.quantile(0.95),
+            'avg_service_time': self.service.mean,
+            'workload_std': customers_per_server['Customer Count'].std(),
+            # Areas under the queue-length and busy-counter curves are the summed waits and services
+            'avg_queue_length': self.wait.mean * self.wait.count / total_duration_minutes,
+            'avg_busy_servers': self.busy_time.sum() / total_duration_minutes,
+            'server_stats': server_stats,
+            'customers_per_server': customers_per_server
+        }
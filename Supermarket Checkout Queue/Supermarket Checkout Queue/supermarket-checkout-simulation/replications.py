@@ -0,0 +1,103 @@
+import os
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+import generate_data
+import simulation
+import analysis
+
+def run_replication(seed_seq, num_customers=500, mean_inter_arrival=1.0, mean_service_time=2.5,
+                    num_servers=3, engine='fast', antithetic=False, window_minutes=None):
+    """
+    Runs one independent replication entirely in memory and returns its summary row.
+    With `antithetic` the customers are the mirrored draws of the same seed;
+    `window_minutes` is passed to generate_data (common random numbers across rates).
+    """
+    customers = generate_data.generate_data(num_customers=num_customers,
+                                            mean_inter_arrival=mean_inter_arrival,
+                                            mean_service_time=mean_service_time,
+                                            seed=seed_seq, output_path=None, antithetic=antithetic,
+                                            window_minutes=window_minutes)
+    results_df, _ = simulation.run_simulation(customers, num_servers=num_servers,
+                                              engine=engine, output_file=None)
+    metrics = analysis.compute_metrics(results_df)
+
+    summary = {
+        'Mean Wait': metrics['avg_waiting_time'],
+        'P95 Wait': metrics['wait_time_p95'],
+        'Throughput (/hr)': metrics['throughput_per_hour']
+    }
+    # Counters that served nobody still count as 0% utilization
+    utilization = metrics['server_stats'].set_index('Server ID')['Utilization (%)']
+    for server_id in range(1, num_servers + 1):
+        summary[f'Utilization Counter {server_id} (%)'] = utilization.get(server_id, 0.0)
+    return summary
+
+def confidence_intervals(replications_df, confidence=0.95):
+    """
+    Student-t confidence intervals for every metric column across replications.
+    """
+    from scipy.stats import t
+
+    n = len(replications_df)
+    if n < 2:
+        raise ValueError(f"Confidence intervals need at least 2 replications, got {n}")
+    metrics = replications_df.drop(columns=['Replication'])
+    means = metrics.mean()
+    std_devs = metrics.std(ddof=1)
+    half_widths = t.ppf(0.5 + confidence / 2, n - 1) * std_devs / np.sqrt(n)
+
+    return pd.DataFrame({
+        'Metric': metrics.columns,
+        'Mean': means.values,
+        'Std Dev': std_devs.values,
+        'CI Lower': (means - half_widths).values,
+        'CI Upper': (means + half_widths).values,
+        'Half Width': half_widths.values
+    })
+
+def _mean_row(rows):
+    return {metric: float(np.mean([row[metric] for row in rows])) for metric in rows[0]}
+
+def run_replications(num_replications=10, num_customers=500, mean_inter_arrival=1.0,
+                     mean_service_time=2.5, num_servers=3, seed=42, engine='fast',
+                     confidence=0.95, max_workers=None, antithetic=False):
+    """
+    Runs independent replications in parallel and aggregates them.
+
+    Parameters:
+    - num_replications: Number of independent sample paths (at least 2)
+    - seed: Root seed; each replication gets its own SeedSequence.spawn() child
+    - engine: Simulation engine passed to run_simulation ('fast' or 'simpy')
+    - confidence: Confidence level for the aggregate intervals
+    - max_workers: Process pool size (defaults to all cores)
+    - antithetic: Each replication is the average of a run and its antithetic
+      mirror (2 runs per replication), which usually narrows the intervals
+
+    Returns (replications_df, summary_df). Nothing is written to disk.
+    """
+    if num_replications < 2:
+        raise ValueError(f"num_replications must be at least 2 for a confidence interval, got {num_replications}")
+    seed_seqs = np.random.SeedSequence(seed).spawn(num_replications)
+    max_workers = max_workers or os.cpu_count()
+    mirrors = (False, True) if antithetic else (False,)
+
+    kwargs = dict(num_customers=num_customers, mean_inter_arrival=mean_inter_arrival,
+                  mean_service_time=mean_service_time, num_servers=num_servers, engine=engine)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [[pool.submit(run_replication, seed_seq, antithetic=mirror, **kwargs) for mirror in mirrors]
+                   for seed_seq in seed_seqs]
+        rows = [_mean_row([future.result() for future in pair]) for pair in futures]
+
+    replications_df = pd.DataFrame(rows)
+    replications_df.insert(0, 'Replication', range(1, num_replications + 1))
+    summary_df = confidence_intervals(replications_df, confidence)
+    return replications_df, summary_df
+
+if __name__ == "__main__":
+    replications_df, summary_df = run_replications(num_replications=20)
+    print("📊 Per-replication metrics:")
+    print(replications_df.to_string(index=False))
+    print("\n📈 95% confidence intervals:")
+    print(summary_df.to_string(index=False))
@@ -0,0 +1,204 @@
+import os
+import struct
+import pandas as pd
+import numpy as np
+
+# Typed columnar layout of simulation_results (one record per served customer)
+RESULTS_DTYPE = np.dtype([
+    ('Customer ID', '<i8'),
+    ('Arrival Time', '<f8'),
+    ('Service Start Time', '<f8'),
+    ('Service End Time', '<f8'),
+    ('Service Time', '<f8'),
+    ('Wait Time', '<f8'),
+    ('Server ID', '<i8'),
+    ('Time in System', '<f8')
+])
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+def results_format(path):
+    """
+    The results file format ('.npy', '.parquet' or '.csv') from a path's extension.
+    """
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in ('.npy', '.parquet', '.csv'):
+        raise ValueError(f"Unsupported results format '{ext}'. Use .npy, .parquet or .csv")
+    return ext
+
+def to_records(df):
+    """
+    Packs a results DataFrame into a RESULTS_DTYPE structured array.
+    """
+    records = np.empty(len(df), dtype=RESULTS_DTYPE)
+    for name in RESULTS_DTYPE.names:
+        records[name] = df[name].to_numpy()
+    return records
+
+def save_results(df, path, append=False):
+    """
+    Persists a results table. The format follows the extension:
+    - .npy: NumPy structured array (memory-mappable, default)
+    - .parquet: Parquet via pandas (needs pyarrow or fastparquet)
+    - .csv: Plain CSV export
+    With append=True the rows are added to an existing .npy or .csv file
+    (e.g. a new day's results) instead of replacing it.
+    """
+    ext = results_format(path)
+    if append:
+        writer = ResultsWriter(path, append=True)
+        writer.write(df)
+        writer.close()
+    elif ext == '.npy':
+        np.save(path, to_records(df))
+    elif ext == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+def load_results(source='simulation_results.npy', mmap=True):
+    """
+    Returns the results table from a DataFrame (passed through untouched)
+    or from a .npy / .parquet / .csv file.
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+    ext = results_format(source)
+    if ext == '.npy':
+        records = np.load(source, mmap_mode='r' if mmap else None)
+        return pd.DataFrame({name: records[name] for name in records.dtype.names})
+    if ext == '.parquet':
+        return pd.read_parquet(source)
+    return pd.read_csv(source)
+
+def read_npy_header(file):
+    """
+    Returns (num_rows, header_length) of an open .npy results file.
+    """
+    version = np.lib.format.read_magic(file)
+    read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+    shape, fortran_order, dtype = read_header(file)
+    if dtype != RESULTS_DTYPE or fortran_order or len(shape) != 1:
+        raise ValueError(f"'{file.name}' is not a results file with the RESULTS_DTYPE layout")
+    return shape[0], file.tell()
+
+def npy_header(num_rows, length=None, dtype=RESULTS_DTYPE):
+    """
+    .npy header bytes for a 1-D structured array of `num_rows` rows, padded
+    to `length` bytes (by default the shortest 64-byte aligned length).
+    Lets files be written row batch by row batch and the header fixed up last.
+    """
+    header = repr({
+        'descr': np.lib.format.dtype_to_descr(dtype),
+        'fortran_order': False,
+        'shape': (num_rows,)
+    })
+    if length is None:
+        # Round up so the data section stays 64-byte aligned
+        length = -(-(len(NPY_MAGIC) + 2 + len(header) + 1) // 64) * 64
+    padding = length - len(NPY_MAGIC) - 2 - len(header) - 1
+    text = (header + ' ' * padding + '\n').encode('latin1')
+    return NPY_MAGIC + struct.pack('<H', len(text)) + text
+
+def npy_header_length(dtype=RESULTS_DTYPE):
+    """
+    Header length that fits any row count: reserve it before streaming rows of unknown number.
+    """
+    return len(npy_header(np.iinfo(np.int64).max, dtype=dtype))
+
+class ResultsWriter:
+    """
+    Appends batches of results to disk without holding the whole table.
+    For .npy a header large enough for any row count is reserved up front
+    and rewritten with the final shape on close(). Parquet is not supported
+    here because it cannot be appended to.
+
+    With append=True an existing file is extended in place. A .npy file
+    written by np.save may lack room in its header for the larger shape; it
+    is then rewritten once with a full-size header.
+    """
+    def __init__(self, path, append=False):
+        self.path = path
+        self.format = results_format(path)
+        if self.format == '.parquet':
+            raise ValueError("Streaming output supports .npy or .csv, not .parquet")
+        self.num_rows = 0
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            self._open_append()
+        elif self.format == '.npy':
+            self.header_length = npy_header_length()
+            self.file = open(path, 'wb')
+            self.file.write(b'\0' * self.header_length)
+        else:
+            self.file = open(path, 'w', newline='')
+
+    def _open_append(self):
+        if self.format == '.csv':
+            self.file = open(self.path, 'a', newline='')
+            # Only the header-less continuation matters: any existing row count is non-zero
+            self.num_rows = 1
+            return
+        with open(self.path, 'rb') as f:
+            num_rows, header_length = read_npy_header(f)
+        if npy_header_length() > header_length:
+            self._widen_header(num_rows, header_length)
+            header_length = npy_header_length()
+        self.header_length = header_length
+        self.file = open(self.path, 'r+b')
+        self.file.seek(header_length + num_rows * RESULTS_DTYPE.itemsize)
+        self.file.truncate()
+        self.num_rows = num_rows
+
+    def _widen_header(self, num_rows, header_length):
+        # Copy the data behind a header with room for any row count
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            dst.write(npy_header(num_rows, npy_header_length()))
+            src.seek(header_length)
+            while block := src.read(1 << 24):
+                dst.write(block)
+        os.replace(tmp_path, self.path)
+
+    def checkpoint(self):
+        """
+        Flushes and returns the position a resumed run truncates back to.
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {'num_rows': self.num_rows, 'bytes': self.file.tell(),
+                'header_length': getattr(self, 'header_length', None)}
+
+    @classmethod
+    def resume(cls, path, state):
+        """
+        Reopens a file left by an interrupted run at a checkpoint() position,
+        dropping anything written after it (the .npy header is rewritten on close).
+        """
+        writer = cls.__new__(cls)
+        writer.path = path
+        writer.format = results_format(path)
+        writer.num_rows = state['num_rows']
+        os.truncate(path, state['bytes'])
+        if writer.format == '.npy':
+            writer.header_length = state['header_length']
+            writer.file = open(path, 'r+b')
+            writer.file.seek(state['bytes'])
+        else:
+            writer.file = open(path, 'a', newline='')
+        return writer
+
+    def write(self, df):
+        if self.format == '.npy':
+            self.file.write(to_records(df).tobytes())
+        else:
+            df.to_csv(self.file, header=self.num_rows == 0, index=False)
+        self.num_rows += len(df)
+
+    def close(self):
+        if self.format == '.npy':
+            self.file.seek(0)
+            self.file.write(npy_header(self.num_rows, self.header_length))
+        elif self.num_rows == 0:
+            # Keep an empty CSV readable
+            pd.DataFrame(columns=list(RESULTS_DTYPE.names)).to_csv(self.file, index=False)
+        self.file.close()
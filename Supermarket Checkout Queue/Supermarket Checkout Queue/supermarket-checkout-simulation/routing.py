@@ -0,0 +1,345 @@
+import heapq
+import random
+
+import numpy as np
+
+class LaneGroup:
+    """
+    A set of identical checkout lanes.
+
+    Parameters:
+    - name: Label for the group (e.g. 'regular', 'express', 'self-checkout')
+    - count: Number of lanes (or kiosks) in the group
+    - max_items: Express limit; only customers with at most this many items may
+      join the group (requires an 'Items' column in the customer data)
+    - shared_queue: One queue feeding every lane of the group (a self-checkout
+      bank) instead of a queue per lane
+    - service_multiplier: Scales service times in this group (e.g. 1.5 for
+      customers scanning their own items)
+    """
+    def __init__(self, name, count, max_items=None, shared_queue=False, service_multiplier=1.0):
+        if count < 1:
+            raise ValueError(f"Lane group '{name}' needs at least one lane")
+        self.name = name
+        self.count = count
+        self.max_items = max_items
+        self.shared_queue = shared_queue
+        self.service_multiplier = service_multiplier
+
+    def accepts(self, items):
+        return self.max_items is None or items <= self.max_items
+
+class IndexedMinHeap:
+    """
+    Binary min-heap of items with a position index, so the key of any item
+    can be raised or lowered in O(log n) and the minimum read in O(1).
+    Keys are tuples ending in the item itself, which keeps ties deterministic.
+    """
+    __slots__ = ('heap', 'position')
+
+    def __init__(self):
+        self.heap = []
+        self.position = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def top(self):
+        return self.heap[0]
+
+    def update(self, item, key):
+        """
+        Inserts `item` with `key`, or moves it to its new place if present.
+        """
+        entry = key + (item,)
+        pos = self.position.get(item)
+        if pos is None:
+            self.heap.append(entry)
+            self._sift_up(len(self.heap) - 1)
+        elif entry < self.heap[pos]:
+            self.heap[pos] = entry
+            self._sift_up(pos)
+        else:
+            self.heap[pos] = entry
+            self._sift_down(pos)
+
+    def _sift_up(self, pos):
+        heap, position = self.heap, self.position
+        entry = heap[pos]
+        while pos:
+            parent = (pos - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[pos] = heap[parent]
+            position[heap[pos][-1]] = pos
+            pos = parent
+        heap[pos] = entry
+        position[entry[-1]] = pos
+
+    def _sift_down(self, pos):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[pos]
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[pos] = heap[child]
+            position[heap[pos][-1]] = pos
+            pos = child
+        heap[pos] = entry
+        position[entry[-1]] = pos
+
+class LaneRouter:
+    """
+    Routes arriving customers to the queues of a multi-queue lane layout.
+
+    Every lane of a per-lane group has its own queue; a shared-queue group is
+    one queue. For each queue the router keeps the FCFS schedule of the work
+    already sent to it, as a min-heap of (free time, service order, lane id)
+    like FastFCFSEngine, plus the number of customers present and a heap of
+    pending departures. Decisions therefore depend only on simulated time, so
+    the SimPy model and the event-free schedule() route identically.
+
+    Subclasses define the policy: queue_key() orders the queues of each group
+    in an IndexedMinHeap (one O(log lanes) update per arrival or departure),
+    or choose() is overridden outright.
+
+    Parameters:
+    - groups: List of LaneGroup, numbered into lane ids 1..N in order
+    - seed: Seed for randomised policies
+    - instrumentation: Optional instrumentation.Instrumentation receiving the
+      engine counters from schedule()
+    """
+    # Whether queue_key() changes when a customer departs
+    key_uses_present = False
+
+    def __init__(self, groups, seed=0, instrumentation=None):
+        self.groups = list(groups)
+        self.rng = random.Random(seed)
+        self.instrumentation = instrumentation
+        self.needs_items = any(group.max_items is not None for group in self.groups)
+        self._all_groups = list(range(len(self.groups)))
+        self.now = 0
+
+        self.queue_group = []
+        self.lane_queue = []
+        self.lane_group_names = []
+        self.kiosks = []
+        self.group_queues = []
+        for g, group in enumerate(self.groups):
+            queues = []
+            lanes_per_queue = group.count if group.shared_queue else 1
+            for _ in range(group.count // lanes_per_queue):
+                queue = len(self.queue_group)
+                first_lane = len(self.lane_queue) + 1
+                # Lanes of a queue first ask for customers in lane order at time 0
+                self.kiosks.append([(0, i - lanes_per_queue, first_lane + i) for i in range(lanes_per_queue)])
+                self.lane_queue.extend([queue] * lanes_per_queue)
+                self.lane_group_names.extend([group.name] * lanes_per_queue)
+                self.queue_group.append(g)
+                queues.append(queue)
+            self.group_queues.append(queues)
+
+        num_queues = len(self.queue_group)
+        self.servers_per_queue = [len(kiosks) for kiosks in self.kiosks]
+        self.served = [0] * num_queues
+        self.present = [0] * num_queues
+        self.departures = []
+        self.heaps = [IndexedMinHeap() for _ in self.groups]
+        for queue in range(num_queues):
+            self._refresh(queue)
+
+    @property
+    def num_lanes(self):
+        return len(self.lane_queue)
+
+    @property
+    def num_queues(self):
+        return len(self.queue_group)
+
+    def queue_key(self, queue):
+        raise NotImplementedError
+
+    def _refresh(self, queue):
+        self.heaps[self.queue_group[queue]].update(queue, self.queue_key(queue))
+
+    def eligible_groups(self, items):
+        if not self.needs_items:
+            return self._all_groups
+        groups = [g for g, group in enumerate(self.groups) if group.accepts(items)]
+        if not groups:
+            raise ValueError(f"No lane group accepts a customer with {items} items")
+        return groups
+
+    def choose(self, groups):
+        """
+        The queue with the smallest key among the eligible groups.
+        """
+        return min(self.heaps[g].top() for g in groups)[-1]
+
+    def _release(self, now):
+        # Customers leaving at exactly `now` are gone before the arrival is routed
+        departures = self.departures
+        while departures and departures[0][0] <= now:
+            _, queue = heapq.heappop(departures)
+            self.present[queue] -= 1
+            if self.key_uses_present:
+                self._refresh(queue)
+
+    def assign(self, now, service_time, items=0):
+        """
+        Routes one customer arriving at `now`.
+        Returns (queue, lane_id, start, end, service_time) where the service
+        time includes the group's multiplier.
+        """
+        self._release(now)
+        queue = self.choose(self.eligible_groups(items))
+        multiplier = self.groups[self.queue_group[queue]].service_multiplier
+        if multiplier != 1.0:
+            service_time = service_time * multiplier
+
+        kiosks = self.kiosks[queue]
+        free_time, _, lane_id = kiosks[0]
+        start = free_time if free_time > now else now
+        end = start + service_time
+        heapq.heapreplace(kiosks, (end, self.served[queue], lane_id))
+        self.served[queue] += 1
+        self.present[queue] += 1
+        heapq.heappush(self.departures, (end, queue))
+        self._refresh(queue)
+        return queue, lane_id, start, end, service_time
+
+    def to_dict(self):
+        """
+        JSON-ready routing state (schedules, occupancy, RNG) for checkpoints.
+        """
+        version, internal, gauss = self.rng.getstate()
+        return {
+            'now': self.now,
+            'kiosks': self.kiosks,
+            'served': self.served,
+            'present': self.present,
+            'departures': self.departures,
+            'rng': [version, list(internal), gauss]
+        }
+
+    def restore(self, state):
+        """
+        Loads to_dict() state into a router built with the same groups.
+        """
+        if len(state['kiosks']) != self.num_queues:
+            raise ValueError("Checkpoint was taken with a different lane layout")
+        self.now = state['now']
+        self.kiosks = [[tuple(kiosk) for kiosk in kiosks] for kiosks in state['kiosks']]
+        self.served = list(state['served'])
+        self.present = list(state['present'])
+        self.departures = [tuple(departure) for departure in state['departures']]
+        version, internal, gauss = state['rng']
+        self.rng.setstate((version, tuple(internal), gauss))
+        # Keys are unique (they end in the queue), so rebuilt heaps pick the same queues
+        self.heaps = [IndexedMinHeap() for _ in self.groups]
+        for queue in range(self.num_queues):
+            self._refresh(queue)
+
+    def waiting(self, queue):
+        """
+        Customers in `queue` not yet in service.
+        """
+        return max(self.present[queue] - self.servers_per_queue[queue], 0)
+
+    def schedule(self, arrival_times, service_times, items=None):
+        """
+        Event-free counterpart of the SimPy model: routes and schedules each
+        customer (in arrival order), advancing the clock the way SimPy does.
+        Returns (start_times, end_times, lane_ids, service_times) as NumPy arrays.
+        """
+        arrivals = np.asarray(arrival_times, dtype=float).tolist()
+        services = np.asarray(service_times, dtype=float).tolist()
+        items = np.asarray(items).tolist() if items is not None else [0] * len(arrivals)
+        n = len(arrivals)
+        starts = [0.0] * n
+        ends = [0.0] * n
+        lanes = [0] * n
+
+        now = self.now
+        assign = self.assign
+        instrumentation = self.instrumentation
+        for k in range(n):
+            now = now + (arrivals[k] - now)
+            queue, lanes[k], starts[k], ends[k], services[k] = assign(now, services[k], items[k])
+            if instrumentation is not None:
+                instrumentation.record_max('max_queue_depth', self.waiting(queue))
+        self.now = now
+
+        if instrumentation is not None:
+            instrumentation.count('events_processed', 4 * n)
+            instrumentation.count('queue_puts', n)
+            instrumentation.count('queue_gets', n)
+        return np.array(starts), np.array(ends), np.array(lanes, dtype=np.int64), np.array(services)
+
+class JoinShortestQueue(LaneRouter):
+    """
+    Join the queue with the fewest customers present (waiting or in service)
+    per lane serving it; ties go to the earlier queue.
+    """
+    key_uses_present = True
+
+    def queue_key(self, queue):
+        return (self.present[queue] / self.servers_per_queue[queue],)
+
+class LeastWorkLeft(LaneRouter):
+    """
+    Join the queue whose next lane frees up first, i.e. the least work left
+    ahead of the customer. Among idle queues the one idle longest wins.
+    """
+    def queue_key(self, queue):
+        return (self.kiosks[queue][0][0],)
+
+class PowerOfTwoChoices(LaneRouter):
+    """
+    Sample two eligible queues at random and join the one with fewer customers
+    present per lane. O(1) per decision with most of JSQ's balancing.
+    """
+    def __init__(self, groups, seed=0, instrumentation=None):
+        self._eligible_queues = {}
+        super().__init__(groups, seed, instrumentation)
+
+    def queue_key(self, queue):
+        return ()
+
+    def _refresh(self, queue):
+        pass
+
+    def choose(self, groups):
+        key = tuple(groups)
+        queues = self._eligible_queues.get(key)
+        if queues is None:
+            queues = self._eligible_queues[key] = [q for g in groups for q in self.group_queues[g]]
+        first = queues[self.rng.randrange(len(queues))]
+        if len(queues) == 1:
+            return first
+        second = queues[self.rng.randrange(len(queues) - 1)]
+        if second == first:
+            second = queues[-1]
+        return min((self.present[q] / self.servers_per_queue[q], q) for q in (first, second))[-1]
+
+ROUTING_POLICIES = {
+    'jsq': JoinShortestQueue,
+    'lwl': LeastWorkLeft,
+    'p2c': PowerOfTwoChoices
+}
+
+def make_router(groups, policy='jsq', seed=0, instrumentation=None):
+    """
+    Builds a fresh router for `policy` (a ROUTING_POLICIES name or a LaneRouter subclass).
+    """
+    if isinstance(policy, str):
+        if policy not in ROUTING_POLICIES:
+            raise ValueError(f"Unknown routing policy '{policy}'. Expected one of {tuple(ROUTING_POLICIES)}")
+        policy = ROUTING_POLICIES[policy]
+    return policy(groups, seed, instrumentation)
@@ -1,33 +1,29 @@
 /* ============================================
-   🎮 SIMULATION ENGINE - JavaScript
+   🎮 LIVE SIMULATION - JavaScript
    Supermarket Queue Simulation Dashboard
+   Renders the event stream of the Python engine (server.py)
    ============================================ */
 
-// Simulation State
+// Stream State
 const state = {
-    running: false,
+    source: null,
     paused: false,
+    done: false,
+    lanes: 0,
+    frame: null,
+    rendered: null,
     simTime: 0,
-    customers: [],
-    queue: [],
-    counters: [
-        { id: 1, busy: false, customer: null, endTime: 0, served: 0 },
-        { id: 2, busy: false, customer: null, endTime: 0, served: 0 },
-        { id: 3, busy: false, customer: null, endTime: 0, served: 0 }
-    ],
-    completed: 0,
-    totalWaitTime: 0,
-    nextCustomerId: 1,
-    nextArrivalTime: 0,
+    lastFrameAt: null,
+    eventsRate: 0,
     speed: 5
 };
 
-// Configuration
+// Configuration: page query parameters (customers, servers, routing, inter_arrival,
+// service, seed) are passed through to the engine, e.g. index.html?customers=1000000&servers=40
 const config = {
-    meanInterArrival: 1.0,  // minutes
-    meanServiceTime: 2.5,   // minutes
-    maxSimTime: 60,         // minutes to simulate
-    tickInterval: 50        // ms per tick
+    query: new URLSearchParams(window.location.search),
+    fps: 30,
+    compactLanes: 12       // lanes above this render as compact tiles
 };
 
 // DOM Elements
@@ -36,225 +32,221 @@ const elements = {
     pauseBtn: document.getElementById('btn-pause'),
     resetBtn: document.getElementById('btn-reset'),
     speedSlider: document.getElementById('speed-slider'),
+    speedLabel: document.getElementById('speed-label'),
+    streamStatus: document.getElementById('stream-status'),
     queueDisplay: document.getElementById('queue-display'),
     queueLength: document.getElementById('queue-length'),
     completedCount: document.getElementById('completed-count'),
     simTime: document.getElementById('sim-time'),
     arrivedCount: document.getElementById('arrived-count'),
     liveAvgWait: document.getElementById('live-avg-wait'),
-    counters: [
-        document.getElementById('counter-1'),
-        document.getElementById('counter-2'),
-        document.getElementById('counter-3')
-    ]
+    eventsRate: document.getElementById('events-rate'),
+    laneCount: document.getElementById('lane-count'),
+    totalCustomers: document.getElementById('total-customers'),
+    countersSection: document.getElementById('counters-section'),
+    counters: []
 };
 
-// Utility: Exponential random variable
-function exponentialRandom(mean) {
-    return -mean * Math.log(1 - Math.random());
+// Simulated minutes per wall-clock second: 1 (slider 1) up to 100,000 (slider 10)
+function speedFromSlider(value) {
+    return Math.round(Math.pow(10, (value - 1) * 5 / 9));
 }
 
-// Schedule next arrival
-function scheduleNextArrival() {
-    const interArrival = exponentialRandom(config.meanInterArrival);
-    state.nextArrivalTime = state.simTime + interArrival;
+function formatNumber(value) {
+    return Math.round(value).toLocaleString();
 }
 
-// Create a new customer
-function createCustomer() {
-    const serviceTime = Math.max(0.5, exponentialRandom(config.meanServiceTime));
-    const customer = {
-        id: state.nextCustomerId++,
-        arrivalTime: state.simTime,
-        serviceTime: serviceTime,
-        startServiceTime: null,
-        endServiceTime: null
-    };
-    state.customers.push(customer);
-    state.queue.push(customer);
-    updateQueueDisplay();
-    updateMetrics();
-    scheduleNextArrival();
+// Build one counter per lane reported by the engine
+function buildLanes(count) {
+    state.lanes = count;
+    elements.countersSection.innerHTML = '';
+    elements.countersSection.classList.toggle('compact', count > config.compactLanes);
+    elements.counters = [];
+    for (let lane = 1; lane <= count; lane++) {
+        const el = document.createElement('div');
+        el.className = 'counter';
+        el.innerHTML = `
+            <div class="counter-header">Counter ${lane}</div>
+            <div class="counter-status idle">Idle</div>
+            <div class="counter-customer"></div>
+            <div class="progress-bar"><div class="progress-fill"></div></div>`;
+        elements.countersSection.appendChild(el);
+        elements.counters.push({
+            el: el,
+            status: el.querySelector('.counter-status'),
+            customer: el.querySelector('.counter-customer'),
+            progress: el.querySelector('.progress-fill'),
+            busy: false
+        });
+    }
+    elements.laneCount.textContent = count;
 }
 
-// Find available counter
-function findAvailableCounter() {
-    return state.counters.find(c => !c.busy);
+function streamUrl(startTime) {
+    const params = new URLSearchParams(config.query);
+    params.set('speed', speedFromSlider(state.speed));
+    params.set('fps', config.fps);
+    params.set('start', startTime);
+    return '/events?' + params.toString();
 }
 
-// Start serving customer
-function startService(counter, customer) {
-    customer.startServiceTime = state.simTime;
-    customer.waitTime = customer.startServiceTime - customer.arrivalTime;
-    state.totalWaitTime += customer.waitTime;
-    
-    counter.busy = true;
-    counter.customer = customer;
-    counter.endTime = state.simTime + customer.serviceTime;
-    
-    updateCounterDisplay(counter);
+function setStatus(text) {
+    elements.streamStatus.textContent = text;
 }
 
-// Complete service
-function completeService(counter) {
-    const customer = counter.customer;
-    customer.endServiceTime = state.simTime;
-    
-    counter.busy = false;
-    counter.customer = null;
-    counter.served++;
-    state.completed++;
-    
-    updateCounterDisplay(counter);
-    updateMetrics();
-}
+// Open the event stream, resuming at `startTime` simulated minutes
+function connect(startTime) {
+    disconnect();
+    const source = new EventSource(streamUrl(startTime));
+    state.source = source;
 
-// Process queue - try to assign customers to available counters
-function processQueue() {
-    while (state.queue.length > 0) {
-        const counter = findAvailableCounter();
-        if (!counter) break;
-        
-        const customer = state.queue.shift();
-        startService(counter, customer);
-        updateQueueDisplay();
-    }
-}
-
-// Check for completed services
-function checkServiceCompletion() {
-    state.counters.forEach(counter => {
-        if (counter.busy && state.simTime >= counter.endTime) {
-            completeService(counter);
+    source.addEventListener('config', (e) => {
+        const engine = JSON.parse(e.data);
+        if (engine.lanes !== state.lanes) {
+            buildLanes(engine.lanes);
         }
+        elements.totalCustomers.textContent = formatNumber(engine.customers);
+        setStatus(`Streaming ${formatNumber(engine.customers)} customers, ${engine.lanes} lanes, ${engine.routing}`);
     });
-}
 
-// Update progress bars
-function updateProgressBars() {
-    state.counters.forEach((counter, index) => {
-        const el = elements.counters[index];
-        const progressFill = el.querySelector('.progress-fill');
-        
-        if (counter.busy && counter.customer) {
-            const elapsed = state.simTime - counter.customer.startServiceTime;
-            const total = counter.customer.serviceTime;
-            const percent = Math.min(100, (elapsed / total) * 100);
-            progressFill.style.width = percent + '%';
-        } else {
-            progressFill.style.width = '0%';
+    // Frames only replace the latest state; rendering happens once per animation frame
+    source.addEventListener('frame', (e) => {
+        const frame = JSON.parse(e.data);
+        const now = performance.now();
+        if (state.lastFrameAt !== null) {
+            const seconds = (now - state.lastFrameAt) / 1000;
+            state.eventsRate = 0.8 * state.eventsRate + 0.2 * (frame.events / Math.max(seconds, 1e-3));
         }
+        state.lastFrameAt = now;
+        state.frame = frame;
+        state.simTime = frame.t;
     });
+
+    source.addEventListener('done', (e) => {
+        const summary = JSON.parse(e.data);
+        state.done = true;
+        disconnect();
+        stopSimulation();
+        setStatus(`Complete: ${formatNumber(summary.completed)} customers, average wait ${summary.avg_wait.toFixed(2)} min`);
+    });
+
+    // Fires for connection failures and for the server's 'error' event (which carries data)
+    source.onerror = (e) => {
+        if (!state.done) {
+            disconnect();
+            if (e.data) {
+                setStatus(`Simulation failed: ${JSON.parse(e.data).error}`);
+            } else {
+                setStatus('Stream unavailable: start the engine with "python server.py" and open http://127.0.0.1:8000/');
+            }
+            elements.startBtn.disabled = false;
+        }
+    };
+}
+
+function disconnect() {
+    if (state.source) {
+        state.source.close();
+        state.source = null;
+    }
+    state.lastFrameAt = null;
 }
 
 // UI Update Functions
-function updateQueueDisplay() {
-    elements.queueDisplay.innerHTML = state.queue.slice(0, 8).map(c => 
-        `<div class="queue-customer">C${c.id}</div>`
+function renderQueue(frame) {
+    elements.queueDisplay.innerHTML = frame.queue_head.map(id =>
+        `<div class="queue-customer">C${id}</div>`
     ).join('');
-    
-    if (state.queue.length > 8) {
-        elements.queueDisplay.innerHTML += `<div class="queue-customer">+${state.queue.length - 8} more</div>`;
+
+    if (frame.queue > frame.queue_head.length) {
+        elements.queueDisplay.innerHTML += `<div class="queue-customer">+${formatNumber(frame.queue - frame.queue_head.length)} more</div>`;
     }
-    
-    elements.queueLength.textContent = state.queue.length;
+
+    elements.queueLength.textContent = formatNumber(frame.queue);
 }
 
-function updateCounterDisplay(counter) {
-    const el = elements.counters[counter.id - 1];
-    const statusEl = el.querySelector('.counter-status');
-    const customerEl = el.querySelector('.counter-customer');
-    
-    if (counter.busy) {
-        el.classList.add('active');
-        statusEl.textContent = 'Busy';
-        statusEl.className = 'counter-status busy';
-        customerEl.textContent = `C${counter.customer.id}`;
-    } else {
-        el.classList.remove('active');
-        statusEl.textContent = 'Idle';
-        statusEl.className = 'counter-status idle';
-        customerEl.textContent = '';
-    }
+function renderLanes(frame) {
+    const busy = new Array(state.lanes).fill(null);
+    frame.lanes.forEach(([lane, customer, start, end]) => {
+        busy[lane - 1] = { customer, start, end };
+    });
+
+    elements.counters.forEach((counter, index) => {
+        const service = busy[index];
+        if (service) {
+            if (!counter.busy) {
+                counter.el.classList.add('active');
+                counter.status.textContent = 'Busy';
+                counter.status.className = 'counter-status busy';
+                counter.busy = true;
+            }
+            counter.customer.textContent = `C${service.customer}`;
+            const percent = Math.min(100, (frame.t - service.start) / (service.end - service.start) * 100);
+            counter.progress.style.width = percent + '%';
+        } else if (counter.busy) {
+            counter.el.classList.remove('active');
+            counter.status.textContent = 'Idle';
+            counter.status.className = 'counter-status idle';
+            counter.customer.textContent = '';
+            counter.progress.style.width = '0%';
+            counter.busy = false;
+        }
+        if (frame.lane_queues) {
+            counter.customer.title = `${frame.lane_queues[index]} waiting`;
+        }
+    });
 }
 
-function updateMetrics() {
-    elements.simTime.textContent = state.simTime.toFixed(2) + ' min';
-    elements.arrivedCount.textContent = state.customers.length;
-    elements.completedCount.textContent = state.completed;
-    
-    if (state.completed > 0) {
-        const avgWait = state.totalWaitTime / state.completed;
-        elements.liveAvgWait.textContent = avgWait.toFixed(2) + ' min';
+function renderMetrics(frame) {
+    elements.simTime.textContent = frame.t.toFixed(2) + ' min';
+    elements.arrivedCount.textContent = formatNumber(frame.arrived);
+    elements.completedCount.textContent = formatNumber(frame.completed);
+    if (frame.completed > 0) {
+        elements.liveAvgWait.textContent = (frame.wait_sum / frame.completed).toFixed(2) + ' min';
     }
+    elements.eventsRate.textContent = formatNumber(state.eventsRate);
 }
 
-// Main simulation tick
-function tick() {
-    if (!state.running || state.paused) return;
-    
-    // Advance time
-    const timeStep = 0.05 * state.speed;
-    state.simTime += timeStep;
-    
-    // Check for new arrivals
-    if (state.simTime >= state.nextArrivalTime) {
-        createCustomer();
+// Draw the most recent frame once per display refresh
+function render() {
+    const frame = state.frame;
+    if (frame && frame !== state.rendered) {
+        renderQueue(frame);
+        renderLanes(frame);
+        renderMetrics(frame);
+        state.rendered = frame;
     }
-    
-    // Check for completed services
-    checkServiceCompletion();
-    
-    // Process queue
-    processQueue();
-    
-    // Update progress bars
-    updateProgressBars();
-    
-    // Update time display
-    elements.simTime.textContent = state.simTime.toFixed(2) + ' min';
-    
-    // Check end condition
-    if (state.simTime >= config.maxSimTime && state.queue.length === 0 && !state.counters.some(c => c.busy)) {
-        stopSimulation();
-        return;
-    }
-    
-    // Schedule next tick
-    setTimeout(tick, config.tickInterval);
+    requestAnimationFrame(render);
 }
 
 // Control Functions
 function startSimulation() {
-    if (state.running && state.paused) {
-        state.paused = false;
-        elements.startBtn.textContent = '▶ Running...';
-        tick();
-        return;
-    }
-    
-    state.running = true;
     state.paused = false;
+    state.done = false;
     elements.startBtn.textContent = '▶ Running...';
     elements.startBtn.disabled = true;
-    
-    scheduleNextArrival();
-    tick();
+    elements.pauseBtn.textContent = '⏸ Pause';
+    elements.pauseBtn.disabled = false;
+    connect(state.simTime);
 }
 
 function pauseSimulation() {
+    if (state.done) return;
     state.paused = !state.paused;
     elements.pauseBtn.textContent = state.paused ? '▶ Resume' : '⏸ Pause';
     elements.startBtn.textContent = state.paused ? '▶ Resume' : '▶ Running...';
     elements.startBtn.disabled = !state.paused;
-    
-    if (!state.paused) {
-        tick();
+
+    // The engine is deterministic: resuming replays it up to the paused time
+    if (state.paused) {
+        disconnect();
+        setStatus(`Paused at ${state.simTime.toFixed(2)} min`);
+    } else {
+        connect(state.simTime);
     }
 }
 
 function stopSimulation() {
-    state.running = false;
     state.paused = false;
     elements.startBtn.textContent = '✓ Complete';
     elements.startBtn.disabled = true;
@@ -262,22 +254,14 @@ function stopSimulation() {
 }
 
 function resetSimulation() {
-    state.running = false;
+    disconnect();
     state.paused = false;
+    state.done = false;
+    state.frame = null;
+    state.rendered = null;
     state.simTime = 0;
-    state.customers = [];
-    state.queue = [];
-    state.counters.forEach(c => {
-        c.busy = false;
-        c.customer = null;
-        c.endTime = 0;
-        c.served = 0;
-    });
-    state.completed = 0;
-    state.totalWaitTime = 0;
-    state.nextCustomerId = 1;
-    state.nextArrivalTime = 0;
-    
+    state.eventsRate = 0;
+
     // Reset UI
     elements.startBtn.textContent = '▶ Start Simulation';
     elements.startBtn.disabled = false;
@@ -289,21 +273,33 @@ function resetSimulation() {
     elements.simTime.textContent = '0.00 min';
     elements.arrivedCount.textContent = '0';
     elements.liveAvgWait.textContent = '0.00 min';
-    
-    state.counters.forEach((c, i) => updateCounterDisplay(c));
-    elements.counters.forEach(el => {
-        el.querySelector('.progress-fill').style.width = '0%';
-    });
+    elements.eventsRate.textContent = '0';
+    setStatus('Idle');
+
+    renderLanes({ t: 0, lanes: [] });
+}
+
+function updateSpeed(value) {
+    state.speed = value;
+    elements.speedLabel.textContent = `${formatNumber(speedFromSlider(value))} min/s`;
+    // A new speed takes effect by reopening the stream at the current time
+    if (state.source) {
+        connect(state.simTime);
+    }
 }
 
 // Event Listeners
 elements.startBtn.addEventListener('click', startSimulation);
 elements.pauseBtn.addEventListener('click', pauseSimulation);
 elements.resetBtn.addEventListener('click', resetSimulation);
-elements.speedSlider.addEventListener('input', (e) => {
-    state.speed = parseInt(e.target.value);
+elements.speedSlider.addEventListener('change', (e) => {
+    updateSpeed(parseInt(e.target.value));
 });
 
+buildLanes(parseInt(config.query.get('servers') || '3'));
+updateSpeed(parseInt(elements.speedSlider.value));
+requestAnimationFrame(render);
+
 // Tab functionality for visualizations
 document.querySelectorAll('.viz-tab').forEach(tab => {
     tab.addEventListener('click', () => {
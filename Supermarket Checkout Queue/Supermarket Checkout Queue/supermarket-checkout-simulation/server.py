@@ -0,0 +1,271 @@
+import os
+import json
+import math
+import asyncio
+import argparse
+import mimetypes
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+import generate_data
+import simulation
+from routing import LaneGroup, make_router
+
+STATIC_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_FILES = ('index.html', 'script.js', 'styles.css')
+
+# Frames buffered per client before the simulation waits for it (backpressure)
+FRAME_QUEUE_SIZE = 8
+
+MAX_STREAM_CUSTOMERS = 10_000_000
+MAX_STREAM_SERVERS = 1_000
+
+# Waiting customers listed per frame (the page shows the head of the line)
+QUEUE_HEAD_SIZE = 8
+
+class EngineStream:
+    """
+    Replays a run of the fast engine as a sequence of frames.
+
+    Customers are generated up front; each advance() schedules exactly the
+    customers that arrived by the new clock (their FCFS schedule depends only on
+    earlier arrivals) and reduces the arrivals, service starts and departures
+    since the last frame to one batch: cumulative counts, the queue, and what
+    every busy lane is serving. Only customers still in the system are kept.
+
+    Parameters:
+    - num_customers, mean_inter_arrival, mean_service_time, seed: As in generate_data
+    - num_servers: Number of lanes
+    - routing: None for the shared FCFS queue, or a routing policy name giving
+      every lane its own queue
+    """
+    def __init__(self, num_customers=500, num_servers=3, mean_inter_arrival=1.0, mean_service_time=2.5,
+                 seed=42, routing=None):
+        self.customers = generate_data.generate_data(num_customers, mean_inter_arrival, mean_service_time,
+                                                     seed=seed, output_path=None)
+        self.arrivals = self.customers['Arrival Time'].to_numpy()
+        router = make_router([LaneGroup('regular', num_servers)], routing) if routing else None
+        self.engine = simulation.new_fast_engine(num_servers, router)
+        self.num_lanes = router.num_lanes if router else num_servers
+        self.lane_queue = np.array(router.lane_queue) if router else None
+        self.routing = routing
+
+        self.now = 0.0
+        self.scheduled = 0
+        self.completed = 0
+        self.wait_sum = 0.0
+        self.pending = {name: np.empty(0, dtype=np.int64 if name in ('id', 'lane') else float)
+                        for name in ('id', 'arrival', 'start', 'end', 'lane')}
+
+    @property
+    def finished(self):
+        return self.scheduled == len(self.arrivals) and not len(self.pending['id'])
+
+    def config(self):
+        return {
+            'customers': len(self.arrivals),
+            'lanes': self.num_lanes,
+            'routing': self.routing or 'shared FCFS queue'
+        }
+
+    def _schedule_until(self, t):
+        arrived = int(np.searchsorted(self.arrivals, t, side='right'))
+        if arrived == self.scheduled:
+            return 0
+        records = simulation.schedule_records(self.engine, self.customers.iloc[self.scheduled:arrived])
+        new = {
+            'id': records['Customer ID'].to_numpy(),
+            'arrival': records['Arrival Time'].to_numpy(),
+            'start': records['Service Start Time'].to_numpy(),
+            'end': records['Service End Time'].to_numpy(),
+            'lane': records['Server ID'].to_numpy()
+        }
+        self.pending = {name: np.concatenate([self.pending[name], new[name]]) for name in new}
+        count = arrived - self.scheduled
+        self.scheduled = arrived
+        return count
+
+    def advance(self, dt):
+        """
+        Moves the clock forward by `dt` simulated minutes and returns the frame.
+        """
+        previous = self.now
+        self.now = previous + dt
+        if self.scheduled == len(self.arrivals) and len(self.pending['id']):
+            # Nothing left to arrive: finish on the last departure, not past it
+            self.now = min(self.now, float(self.pending['end'].max()))
+        arrivals = self._schedule_until(self.now)
+
+        pending = self.pending
+        starts = int(((pending['start'] > previous) & (pending['start'] <= self.now)).sum())
+        departed = pending['end'] <= self.now
+        departures = int(departed.sum())
+        if departures:
+            self.completed += departures
+            self.wait_sum += float((pending['start'][departed] - pending['arrival'][departed]).sum())
+            self.pending = pending = {name: values[~departed] for name, values in pending.items()}
+
+        in_service = pending['start'] <= self.now
+        waiting = ~in_service
+        frame = {
+            't': self.now,
+            'arrived': self.scheduled,
+            'completed': self.completed,
+            'wait_sum': self.wait_sum,
+            'events': arrivals + starts + departures,
+            'queue': int(waiting.sum()),
+            # Pending customers are in arrival order, so the first waiting ones head the line
+            'queue_head': pending['id'][waiting][:QUEUE_HEAD_SIZE].tolist(),
+            # [lane, customer, service start, service end] for every busy lane
+            'lanes': [list(row) for row in zip(pending['lane'][in_service].tolist(),
+                                               pending['id'][in_service].tolist(),
+                                               pending['start'][in_service].tolist(),
+                                               pending['end'][in_service].tolist())]
+        }
+        if self.lane_queue is not None:
+            frame['lane_queues'] = np.bincount(pending['lane'][waiting] - 1,
+                                               minlength=self.num_lanes).tolist()
+        return frame
+
+    def summary(self):
+        return {
+            't': self.now,
+            'completed': self.completed,
+            'avg_wait': self.wait_sum / self.completed if self.completed else 0.0
+        }
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+async def stream_events(writer, stream, speed, fps, start=0.0):
+    """
+    Sends the stream as Server-Sent Events: a 'config' event, one 'frame' per
+    display frame and a final 'done' (or 'error' if the simulation raised).
+    Each frame covers speed / fps simulated minutes. Frames pass through a
+    bounded queue, and the writer awaits drain(): a slow client fills the
+    queue and pauses the producer, so the simulation runs at the client's pace
+    and memory stays bounded.
+    """
+    queue = asyncio.Queue(maxsize=FRAME_QUEUE_SIZE)
+    frame_interval = 1 / fps
+
+    async def produce():
+        cancelled = False
+        try:
+            await queue.put(_sse('config', stream.config()))
+            if start > 0:
+                # Resume (after pause or a speed change): fast-forward without sending frames
+                await asyncio.to_thread(stream.advance, start)
+            loop = asyncio.get_running_loop()
+            next_tick = loop.time()
+            while not stream.finished:
+                frame = await asyncio.to_thread(stream.advance, speed * frame_interval)
+                await queue.put(_sse('frame', frame))
+                next_tick = max(next_tick + frame_interval, loop.time())
+                await asyncio.sleep(next_tick - loop.time())
+            await queue.put(_sse('done', stream.summary()))
+        except asyncio.CancelledError:
+            # The client hung up: nobody is left to read the queue
+            cancelled = True
+            raise
+        finally:
+            # End the stream even when the simulation raised, so the client is never left waiting
+            if not cancelled:
+                await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (message := await queue.get()) is not None:
+            writer.write(message)
+            await writer.drain()
+        try:
+            await producer
+        except Exception as error:
+            writer.write(_sse('error', {'error': f"{type(error).__name__}: {error}"}))
+            await writer.drain()
+    finally:
+        producer.cancel()
+
+def _param(query, name, cast, default):
+    values = query.get(name)
+    return cast(values[0]) if values else default
+
+async def _send(writer, status, body, content_type='text/plain; charset=utf-8'):
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+
+async def handle_client(reader, writer):
+    """
+    Minimal HTTP/1.1: GET /events streams a simulation, anything else is a static file.
+    """
+    try:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+        if len(request_line) < 2 or request_line[0] != 'GET':
+            await _send(writer, '405 Method Not Allowed', b'Only GET is supported')
+            return
+        url = urlsplit(request_line[1])
+
+        if url.path == '/events':
+            query = parse_qs(url.query)
+            try:
+                num_customers = min(_param(query, 'customers', int, 500), MAX_STREAM_CUSTOMERS)
+                num_servers = _param(query, 'servers', int, 3)
+                inter_arrival = _param(query, 'inter_arrival', float, 1.0)
+                service = _param(query, 'service', float, 2.5)
+                routing = _param(query, 'routing', str, None)
+                speed = _param(query, 'speed', float, 5.0)
+                fps = min(_param(query, 'fps', float, 30.0), 120.0)
+                start = _param(query, 'start', float, 0.0)
+                # Reject what would crash the engine or keep the stream open forever
+                if not all(math.isfinite(value) for value in (inter_arrival, service, speed, fps, start)):
+                    raise ValueError("inter_arrival, service, speed, fps and start must be finite")
+                if not 1 <= num_servers <= MAX_STREAM_SERVERS:
+                    raise ValueError(f"servers must be between 1 and {MAX_STREAM_SERVERS}")
+                if not (inter_arrival > 0 and service > 0 and speed > 0 and fps > 0):
+                    raise ValueError("inter_arrival, service, speed and fps must be positive")
+                stream = await asyncio.to_thread(EngineStream, num_customers, num_servers, inter_arrival, service,
+                                                 _param(query, 'seed', int, 42), routing)
+            except ValueError as error:
+                await _send(writer, '400 Bad Request', str(error).encode())
+                return
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+            await stream_events(writer, stream, speed, fps, start)
+            return
+
+        name = url.path.lstrip('/') or 'index.html'
+        is_chart = name.startswith('outputs/') and name.endswith('.png') and '..' not in name
+        path = os.path.join(STATIC_DIR, name)
+        if (name not in STATIC_FILES and not is_chart) or not os.path.isfile(path):
+            await _send(writer, '404 Not Found', b'Not found')
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        await _send(writer, '200 OK', body, mimetypes.guess_type(name)[0] or 'application/octet-stream')
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(host='127.0.0.1', port=8000):
+    server = await asyncio.start_server(handle_client, host, port)
+    print(f"🌐 Live dashboard at http://{host}:{port}/  (Ctrl+C to stop)")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the dashboard with a live stream of the simulation engine.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
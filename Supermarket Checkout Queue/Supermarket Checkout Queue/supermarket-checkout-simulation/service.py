@@ -0,0 +1,302 @@
+import os
+import json
+import math
+import time
+import asyncio
+import argparse
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit, parse_qs
+
+# Scenario fields, their types and defaults; anything else in a request is rejected
+SCENARIO_FIELDS = {
+    'customers': (int, 500),
+    'servers': (int, 3),
+    'inter_arrival': (float, 1.0),
+    'service': (float, 2.5),
+    'seed': (int, 42),
+    'engine': (str, 'fast'),
+    'routing': (str, None)
+}
+
+# Inclusive bounds of the numeric scenario fields. The arrival rate is capped
+# too: the generator draws every arrival candidate, so a near-zero
+# inter-arrival time would have a worker allocate without limit
+SCENARIO_LIMITS = {
+    'customers': (1, 5_000_000),
+    'servers': (1, 1_000),
+    'inter_arrival': (1e-3, 1e6),
+    'service': (1e-3, 1e6),
+    'seed': (0, 2 ** 63 - 1)
+}
+MAX_REQUEST_BYTES = 64 * 1024
+
+def normalize_scenario(params):
+    """
+    Validated scenario with every field filled in, so equal scenarios get equal cache keys.
+    Raises ValueError on unknown fields or bad values (booleans, NaN or
+    infinite numbers, values outside SCENARIO_LIMITS).
+    """
+    if not isinstance(params, dict):
+        raise ValueError("The scenario must be a JSON object")
+    unknown = set(params) - set(SCENARIO_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown scenario fields: {sorted(unknown)}")
+    scenario = {}
+    for name, (cast, default) in SCENARIO_FIELDS.items():
+        value = params.get(name, default)
+        # bool is an int subclass: `true` would silently become 1
+        if isinstance(value, bool):
+            raise ValueError(f"{name} must be a {cast.__name__}, not a boolean")
+        if cast is int and isinstance(value, float) and not value.is_integer():
+            raise ValueError(f"{name} must be a whole number, got {value!r}")
+        if value is not None:
+            try:
+                value = cast(value)
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError(f"{name} must be a {cast.__name__}, got {value!r}") from None
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(f"{name} must be finite")
+        if name in SCENARIO_LIMITS:
+            low, high = SCENARIO_LIMITS[name]
+            if not low <= value <= high:
+                raise ValueError(f"{name} must be between {low:g} and {high:g}")
+        scenario[name] = value
+    if scenario['engine'] not in ('fast', 'simpy'):
+        raise ValueError("engine must be 'fast' or 'simpy'")
+    if scenario['routing'] not in (None, 'jsq', 'lwl', 'p2c'):
+        raise ValueError("routing must be 'jsq', 'lwl' or 'p2c'")
+    return scenario
+
+def run_scenario(scenario):
+    """
+    Worker-side pipeline: generate customers, simulate and compute the metrics,
+    all in memory. Pipeline modules are imported here, so only workers load them.
+    """
+    import generate_data
+    import simulation
+    import analysis
+
+    customers = generate_data.generate_data(scenario['customers'], scenario['inter_arrival'], scenario['service'],
+                                            seed=scenario['seed'], output_path=None)
+    results_df, _ = simulation.run_simulation(customers, scenario['servers'], engine=scenario['engine'],
+                                              output_file=None, routing=scenario['routing'])
+    return analysis.metrics_to_dict(analysis.compute_metrics(results_df))
+
+class TTLCache:
+    """
+    In-memory LRU cache whose entries also expire `ttl` seconds after being stored.
+    """
+    def __init__(self, max_entries=256, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+class SimulationService:
+    """
+    Answers scenario requests from the cache, by joining an identical scenario
+    already being computed (request coalescing), or by running it in a
+    bounded process pool. At most `max_pending` distinct scenarios are queued
+    or running; beyond that requests are refused rather than oversubscribing
+    the machine.
+
+    Parameters:
+    - workers: Process pool size (defaults to all cores)
+    - cache_entries, cache_ttl: LRU capacity and entry lifetime in seconds
+    - max_pending: Distinct scenarios queued or running at once
+
+    A worker dying (e.g. killed for memory) breaks the whole pool; the
+    scenarios it held fail and the next request gets a fresh pool.
+    """
+    def __init__(self, workers=None, cache_entries=256, cache_ttl=600, max_pending=None):
+        self.workers = workers or os.cpu_count()
+        self.pool = self._new_pool()
+        self.cache = TTLCache(cache_entries, cache_ttl)
+        self.max_pending = max_pending or 4 * self.workers
+        self.in_flight = {}
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'computed': 0, 'rejected': 0,
+                      'pool_restarts': 0}
+
+    def _new_pool(self):
+        # Workers start lazily, during a request: forked ones would inherit that
+        # client's socket and keep it open, so clients reading to EOF would hang
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def _restart_pool(self, broken):
+        if broken is self.pool:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = self._new_pool()
+            self.stats['pool_restarts'] += 1
+            print(f"⚠️ Worker pool broke; started a new one ({self.stats['pool_restarts']} restarts)")
+
+    async def simulate(self, scenario):
+        """
+        Returns (metrics, source) with source 'cache', 'coalesced' or 'computed'.
+        Raises OverflowError when the queue is full.
+        """
+        self.stats['requests'] += 1
+        key = json.dumps(scenario, sort_keys=True)
+        metrics = self.cache.get(key)
+        if metrics is not None:
+            self.stats['cache_hits'] += 1
+            return metrics, 'cache'
+
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            # shield: a caller hanging up must not cancel the run others are waiting for
+            return await asyncio.shield(future), 'coalesced'
+
+        if len(self.in_flight) >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise OverflowError(f"{len(self.in_flight)} scenarios already queued")
+        pool = self.pool
+        try:
+            future = asyncio.get_running_loop().run_in_executor(pool, run_scenario, scenario)
+        except BrokenProcessPool:
+            self._restart_pool(pool)
+            pool = self.pool
+            future = asyncio.get_running_loop().run_in_executor(pool, run_scenario, scenario)
+        self.in_flight[key] = future
+        future.add_done_callback(lambda done: self._finish(key, pool, done))
+        return await asyncio.shield(future), 'computed'
+
+    def _finish(self, key, pool, future):
+        # Runs when the worker returns, even if every caller has hung up
+        del self.in_flight[key]
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            self.stats['computed'] += 1
+            self.cache.put(key, future.result())
+        elif isinstance(future.exception(), BrokenProcessPool):
+            self._restart_pool(pool)
+
+    def status(self):
+        return dict(self.stats, in_flight=len(self.in_flight), cached=len(self.cache.entries),
+                    workers=self.workers, max_pending=self.max_pending)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+async def _send_json(writer, status, payload, extra_headers=''):
+    # Strict JSON: a NaN reaching here is a bug, not something to send as a bare token
+    body = json.dumps(payload, allow_nan=False).encode()
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n{extra_headers}"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+
+async def _read_request(reader):
+    """
+    Returns (method, url, body) of a minimal HTTP/1.1 request.
+    """
+    request_line = (await reader.readline()).decode('latin-1').split()
+    content_length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            content_length = int(value.strip())
+    if len(request_line) < 2:
+        raise ValueError("Malformed request")
+    if content_length > MAX_REQUEST_BYTES:
+        raise ValueError("Request body too large")
+    body = await reader.readexactly(content_length) if content_length else b''
+    return request_line[0], urlsplit(request_line[1]), body
+
+async def handle_client(service, reader, writer):
+    """
+    POST /simulate with a JSON scenario (or GET /simulate?servers=4&...)
+    returns its metrics; GET /status returns the service counters.
+    """
+    try:
+        try:
+            method, url, body = await _read_request(reader)
+        except ValueError as error:
+            await _send_json(writer, '400 Bad Request', {'error': str(error)})
+            return
+
+        if url.path == '/status' and method == 'GET':
+            await _send_json(writer, '200 OK', service.status())
+            return
+        if url.path != '/simulate' or method not in ('GET', 'POST'):
+            await _send_json(writer, '404 Not Found', {'error': 'Use POST /simulate or GET /status'})
+            return
+
+        try:
+            if method == 'POST':
+                params = json.loads(body or b'{}')
+            else:
+                params = {name: values[0] for name, values in parse_qs(url.query).items()}
+            scenario = normalize_scenario(params)
+        except (ValueError, TypeError) as error:
+            await _send_json(writer, '400 Bad Request', {'error': str(error)})
+            return
+
+        started = time.perf_counter()
+        try:
+            metrics, source = await service.simulate(scenario)
+        except OverflowError as error:
+            await _send_json(writer, '503 Service Unavailable', {'error': str(error)}, 'Retry-After: 1\r\n')
+            return
+        except Exception as error:
+            await _send_json(writer, '500 Internal Server Error', {'error': f"{type(error).__name__}: {error}"})
+            return
+        await _send_json(writer, '200 OK', {
+            'scenario': scenario,
+            'metrics': metrics,
+            'source': source,
+            'elapsed_ms': (time.perf_counter() - started) * 1000
+        })
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(host='127.0.0.1', port=8001, **service_options):
+    service = SimulationService(**service_options)
+    server = await asyncio.start_server(lambda r, w: handle_client(service, r, w), host, port)
+    print(f"🧪 Simulation service at http://{host}:{port}/simulate  "
+          f"({service.workers} workers, Ctrl+C to stop)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local HTTP/JSON simulation service with a result cache.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-entries', type=int, default=256)
+    parser.add_argument('--cache-ttl', type=float, default=600, help='Seconds a cached result stays valid')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='Distinct scenarios queued or running at once (default 4 x workers)')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, cache_entries=args.cache_entries,
+                          cache_ttl=args.cache_ttl, max_pending=args.max_pending))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
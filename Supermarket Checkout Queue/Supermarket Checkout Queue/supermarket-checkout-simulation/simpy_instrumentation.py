@@ -0,0 +1,35 @@
+import simpy
+
+class InstrumentedEnvironment(simpy.Environment):
+    """
+    simpy.Environment that counts every processed event.
+    """
+    def __init__(self, instrumentation):
+        super().__init__()
+        self.instrumentation = instrumentation
+
+    def step(self):
+        self.instrumentation.count('events_processed')
+        super().step()
+
+class InstrumentedStore(simpy.Store):
+    """
+    simpy.Store that counts puts/gets and tracks the deepest waiting queue.
+    """
+    def __init__(self, env, instrumentation):
+        super().__init__(env)
+        self.instrumentation = instrumentation
+
+    def _do_put(self, event):
+        self.instrumentation.count('queue_puts')
+        return super()._do_put(event)
+
+    def _do_get(self, event):
+        if self.items:
+            self.instrumentation.count('queue_gets')
+        return super()._do_get(event)
+
+    def _trigger_get(self, put_event):
+        super()._trigger_get(put_event)
+        # Whatever is left after idle lanes took their customer is waiting
+        self.instrumentation.record_max('max_queue_depth', len(self.items))
@@ -1,13 +1,98 @@
-import simpy
 import pandas as pd
 import numpy as np
+import io
+import os
+import json
+import heapq
+import itertools
+from array import array
+
+from results_io import ResultsWriter, save_results
+from online_stats import SimulationSummary
+from routing import LaneGroup, LaneRouter, make_router
+
+ENGINES = ('simpy', 'fast')
+
+# Events SimPy processes per customer: arrival timeout, queue put, queue get, service timeout
+EVENTS_PER_CUSTOMER = 4
+
+# Customers scheduled per block when only summary metrics are kept
+METRICS_BLOCK_SIZE = 1_000_000
+
+# Bump whenever a change alters simulated results, engine or generated data (invalidates cached sweeps)
+ENGINE_VERSION = '5'
+
+class RecordBuffer:
+    """
+    Growable columnar store of served-customer records.
+    Each column is an array.array (8 bytes per value, amortised growth), and
+    to_dataframe() wraps the columns with NumPy views instead of copying them.
+    Wait Time and Time in System are derived from the stored columns with the
+    same arithmetic CheckoutLane used to compute them per customer.
+    """
+    __slots__ = ('customer_id', 'arrival', 'start', 'end', 'service', 'server_id')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # Fresh arrays rather than resizing: existing DataFrame views stay valid
+        self.customer_id = array('q')
+        self.arrival = array('d')
+        self.start = array('d')
+        self.end = array('d')
+        self.service = array('d')
+        self.server_id = array('q')
+
+    def __len__(self):
+        return len(self.customer_id)
+
+    def append(self, customer_id, arrival, start, end, service, server_id):
+        self.customer_id.append(customer_id)
+        self.arrival.append(arrival)
+        self.start.append(start)
+        self.end.append(end)
+        self.service.append(service)
+        self.server_id.append(server_id)
+
+    def to_dataframe(self):
+        arrival = np.frombuffer(self.arrival, dtype=np.float64)
+        start = np.frombuffer(self.start, dtype=np.float64)
+        service = np.frombuffer(self.service, dtype=np.float64)
+        wait = start - arrival
+        return pd.DataFrame({
+            'Customer ID': np.frombuffer(self.customer_id, dtype=np.int64),
+            'Arrival Time': arrival,
+            'Service Start Time': start,
+            'Service End Time': np.frombuffer(self.end, dtype=np.float64),
+            'Service Time': service,
+            'Wait Time': wait,
+            'Server ID': np.frombuffer(self.server_id, dtype=np.int64),
+            'Time in System': wait + service
+        }, copy=False)
 
 class CheckoutLane:
-    def __init__(self, env, lane_id):
+    __slots__ = ('env', 'lane_id', 'busy_time', 'num_served', 'records')
+
+    def __init__(self, env, lane_id, records=None):
         self.env = env
         self.lane_id = lane_id
         self.busy_time = 0
-        self.customers_served = []
+        self.num_served = 0
+        # Lanes of one run share a buffer, so records land in departure order
+        self.records = records if records is not None else RecordBuffer()
+
+    @property
+    def customers_served(self):
+        """
+        This lane's records as a list of dicts (compatibility view; builds the dicts on demand).
+        Lanes recording into a SimulationSummary keep no records, so there it is
+        the number of customers the lane served.
+        """
+        if isinstance(self.records, SimulationSummary):
+            return int(self.records.served[self.lane_id - 1])
+        df = self.records.to_dataframe()
+        return df[df['Server ID'] == self.lane_id].to_dict('records')
 
     def serve(self, customer, queue_store):
         """
@@ -21,7 +106,6 @@ class CheckoutLane:
             # In a real line, the customer moves to the counter.
             
             start_service_time = self.env.now
-            wait_time = start_service_time - customer_data['arrival_time']
             
             # Log usage
             service_duration = customer_data['service_time']
@@ -33,86 +117,579 @@ class CheckoutLane:
             self.busy_time += service_duration
             
             # Record metrics for this customer
-            record = {
-                'Customer ID': customer_data['id'],
-                'Arrival Time': customer_data['arrival_time'],
-                'Service Start Time': start_service_time,
-                'Service End Time': end_service_time,
-                'Service Time': service_duration,
-                'Wait Time': wait_time,
-                'Server ID': self.lane_id,
-                'Time in System': wait_time + service_duration
-            }
-            self.customers_served.append(record)
+            self.records.append(customer_data['id'], customer_data['arrival_time'],
+                                start_service_time, end_service_time, service_duration, self.lane_id)
+            self.num_served += 1
+
+def _new_environment(instrumentation=None):
+    """
+    Environment and shared FCFS queue, instrumented when requested.
+    SimPy is imported here, so runs of the fast engine never load it.
+    """
+    import simpy
+    if instrumentation is None:
+        env = simpy.Environment()
+    else:
+        from simpy_instrumentation import InstrumentedEnvironment
+        env = InstrumentedEnvironment(instrumentation)
+    return env, _new_store(env, instrumentation)
 
-def customer_generator(env, customers_df, queue_store):
+def _new_store(env, instrumentation=None):
+    import simpy
+    if instrumentation is None:
+        return simpy.Store(env)
+    from simpy_instrumentation import InstrumentedStore
+    return InstrumentedStore(env, instrumentation)
+
+def customer_generator(env, customers_df, queue_store, on_chunk=None):
     """
     Generates customers based on the arrival times in the dataframe.
+    `customers_df` may also be an iterator of dataframe chunks (streaming mode);
+    `on_chunk` is called after each chunk has been fed into the queue.
+    Returns the number of customers generated.
+    """
+    chunks = [customers_df] if isinstance(customers_df, pd.DataFrame) else customers_df
+    num_customers = 0
+    # We assume each chunk is sorted by Arrival Time
+    for chunk in chunks:
+        # Plain Python lists avoid boxing every row into a Series (iterrows)
+        customer_ids = chunk['Customer ID'].tolist()
+        arrival_times = chunk['Arrival Time'].tolist()
+        service_times = chunk['Service Time'].tolist()
+        for customer_id, arrival_time, service_time in zip(customer_ids, arrival_times, service_times):
+            yield env.timeout(arrival_time - env.now)  # Wait until arrival time
+            
+            customer_payload = {
+                'id': int(customer_id),
+                'arrival_time': arrival_time,
+                'service_time': service_time
+            }
+            
+            # Put customer in the SHARED queue
+            # The servers (CheckoutLanes) will pull from this queue
+            yield queue_store.put(customer_payload)
+        num_customers += len(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk)
+    return num_customers
+
+def routed_customer_generator(env, customers_df, router, queue_stores, on_chunk=None):
+    """
+    customer_generator for multi-queue layouts: on arrival each customer is
+    routed by `router` (a routing.LaneRouter) into one of `queue_stores`.
     """
-    # Iterate through each customer in the sorted dataframe
-    # We assume dataframe is sorted by Arrival Time
-    for index, row in customers_df.iterrows():
-        arrival_time = row['Arrival Time']
-        yield env.timeout(arrival_time - env.now)  # Wait until arrival time
-        
-        customer_payload = {
-            'id': int(row['Customer ID']),
-            'arrival_time': arrival_time,
-            'service_time': row['Service Time']
+    chunks = [customers_df] if isinstance(customers_df, pd.DataFrame) else customers_df
+    num_customers = 0
+    for chunk in chunks:
+        customer_ids = chunk['Customer ID'].tolist()
+        arrival_times = chunk['Arrival Time'].tolist()
+        service_times = chunk['Service Time'].tolist()
+        items = _customer_items(chunk, router).tolist()
+        for customer_id, arrival_time, service_time, item_count in zip(customer_ids, arrival_times,
+                                                                       service_times, items):
+            yield env.timeout(arrival_time - env.now)
+            queue, _, _, _, service_time = router.assign(env.now, service_time, item_count)
+            yield queue_stores[queue].put({
+                'id': int(customer_id),
+                'arrival_time': arrival_time,
+                'service_time': service_time
+            })
+        num_customers += len(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk)
+    return num_customers
+
+def _customer_items(df, router):
+    if not router.needs_items:
+        return np.zeros(len(df), dtype=np.int64)
+    if 'Items' not in df:
+        raise ValueError("Express lanes need an 'Items' column in the customer data "
+                         "(see generate_data(mean_items=...))")
+    return df['Items'].to_numpy()
+
+def read_customer_chunks(input_file, chunksize, verify_sorted=True):
+    """
+    Streams customers from a CSV in fixed-size chunks so memory stays bounded.
+    The file must already be sorted by Arrival Time; with verify_sorted this
+    is checked chunk by chunk and a ValueError is raised on the first violation.
+    """
+    last_arrival = -np.inf
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        if verify_sorted:
+            arrivals = chunk['Arrival Time'].to_numpy()
+            if arrivals[0] < last_arrival or (np.diff(arrivals) < 0).any():
+                raise ValueError(f"'{input_file}' is not sorted by Arrival Time; "
+                                 "sort it before streaming or run without chunksize")
+            last_arrival = arrivals[-1]
+        yield chunk
+
+def read_customer_chunks_at(input_file, chunksize, verify_sorted=True, position=None):
+    """
+    read_customer_chunks that also reports where each chunk ends, for
+    checkpoints. Yields (chunk, position); `position` is a JSON-ready dict
+    (byte offset, column names, last arrival seen), and passing one back in
+    resumes reading right after that chunk.
+    """
+    with open(input_file, 'rb') as f:
+        if position is None:
+            columns = next(f).decode().strip().split(',')
+            last_arrival = -np.inf
+        else:
+            f.seek(position['offset'])
+            columns = position['columns']
+            last_arrival = position['last_arrival']
+        while lines := list(itertools.islice(f, chunksize)):
+            chunk = pd.read_csv(io.BytesIO(b''.join(lines)), header=None, names=columns)
+            arrivals = chunk['Arrival Time'].to_numpy()
+            if verify_sorted and (arrivals[0] < last_arrival or (np.diff(arrivals) < 0).any()):
+                raise ValueError(f"'{input_file}' is not sorted by Arrival Time; "
+                                 "sort it before streaming or run without chunksize")
+            last_arrival = float(arrivals[-1])
+            yield chunk, {'offset': f.tell(), 'columns': columns, 'last_arrival': last_arrival}
+
+def run_until_departed(env, generator, servers):
+    """
+    Runs the environment until the customer generator has finished and every
+    customer it produced has departed, then stops immediately.
+    """
+    env.run(until=generator)
+    num_customers = generator.value
+    while sum(server.num_served for server in servers) < num_customers:
+        env.step()
+
+class FastFCFSEngine:
+    """
+    Event-free FCFS schedule for a single shared queue feeding identical lanes.
+
+    Lane free-times are kept in a min-heap keyed by (free time, order of the
+    service that freed the lane), which reproduces the order in which the
+    SimPy lanes re-join the Store's get queue. The arrival clock is advanced
+    the same way SimPy does (now + (arrival - now)) so every start/end time
+    is bit-for-bit identical to the SimPy engine.
+    """
+    def __init__(self, num_servers=3, instrumentation=None):
+        self.num_servers = num_servers
+        self.now = 0
+        self.served = 0
+        # Initial lanes request a customer in lane order at time 0
+        self.free_heap = [(0, i - num_servers, i + 1) for i in range(num_servers)]
+        self.instrumentation = instrumentation
+        # Start times of customers still queued at the last arrival (for queue depth)
+        self.queued_starts = np.empty(0)
+
+    def schedule(self, arrival_times, service_times):
+        """
+        Assigns each customer (in arrival order) to a lane.
+        Returns (start_times, end_times, lane_ids) as NumPy arrays.
+        """
+        arrivals = np.asarray(arrival_times, dtype=float).tolist()
+        services = np.asarray(service_times, dtype=float).tolist()
+        n = len(arrivals)
+        starts = [0.0] * n
+        ends = [0.0] * n
+        lanes = [0] * n
+
+        heap = self.free_heap
+        now = self.now
+        seq = self.served
+        heapreplace = heapq.heapreplace
+        for k in range(n):
+            arrival = arrivals[k]
+            now = now + (arrival - now)
+            free_time, _, lane_id = heap[0]
+            start = free_time if free_time > now else now
+            end = start + services[k]
+            heapreplace(heap, (end, seq + k, lane_id))
+            starts[k] = start
+            ends[k] = end
+            lanes[k] = lane_id
+
+        self.now = now
+        self.served = seq + n
+        starts = np.array(starts)
+        if self.instrumentation is not None and n:
+            self._count(np.asarray(arrival_times, dtype=float), starts)
+        return starts, np.array(ends), np.array(lanes, dtype=np.int64)
+
+    def to_dict(self):
+        """
+        JSON-ready engine state (clock, lane free-times, queued starts) for checkpoints.
+        """
+        return {
+            'now': self.now,
+            'served': self.served,
+            'free_heap': self.free_heap,
+            'queued_starts': self.queued_starts.tolist()
         }
-        
-        # Put customer in the SHARED queue
-        # The servers (CheckoutLanes) will pull from this queue
-        yield queue_store.put(customer_payload)
 
-def run_simulation(input_file='customers.csv', num_servers=3):
+    def restore(self, state):
+        if len(state['free_heap']) != self.num_servers:
+            raise ValueError("Checkpoint was taken with a different number of lanes")
+        self.now = state['now']
+        self.served = state['served']
+        self.free_heap = [tuple(entry) for entry in state['free_heap']]
+        self.queued_starts = np.array(state['queued_starts'], dtype=float)
+
+    def _count(self, arrivals, starts):
+        """
+        Engine counters equivalent to the SimPy run: the four events SimPy
+        processes per customer (arrival timeout, put, get, service timeout),
+        one queue put and one get, and the most customers waiting at any arrival.
+        """
+        n = len(arrivals)
+        self.instrumentation.count('events_processed', EVENTS_PER_CUSTOMER * n)
+        self.instrumentation.count('queue_puts', n)
+        self.instrumentation.count('queue_gets', n)
+        # FCFS start times are non-decreasing, so "started by t" is a searchsorted
+        all_starts = np.concatenate([self.queued_starts, starts])
+        arrived = len(self.queued_starts) + np.arange(1, n + 1)
+        started = np.minimum(np.searchsorted(all_starts, arrivals, side='right'), arrived)
+        self.instrumentation.record_max('max_queue_depth', int((arrived - started).max()))
+        self.queued_starts = all_starts[all_starts > arrivals[-1]]
+
+def new_fast_engine(num_servers, router=None, instrumentation=None):
+    """
+    Event-free engine for incremental scheduling with schedule_records: a
+    FastFCFSEngine for the shared queue, or `router` itself (a
+    routing.LaneRouter) for multi-queue layouts. Engine state carries over
+    between blocks, so customers can be fed in as they arrive.
+    """
+    return router if router is not None else FastFCFSEngine(num_servers, instrumentation)
+
+def _start_simpy(customers, num_servers, records, router=None, instrumentation=None, on_chunk=None):
+    """
+    Builds the SimPy model: lanes recording into `records`, all pulling from one
+    shared FCFS queue, or with a router each from its own queue (or its bank's).
+    Returns (env, generator process, servers).
+    """
+    # Shared Queue (FCFS by default in SimPy Store)
+    env, queue_store = _new_environment(instrumentation)
+    if router is None:
+        servers = [CheckoutLane(env, i+1, records) for i in range(num_servers)]
+        lane_stores = [queue_store] * num_servers
+        generator = customer_generator(env, customers, queue_store, on_chunk)
+    else:
+        queue_stores = [queue_store] + [_new_store(env, instrumentation) for _ in range(router.num_queues - 1)]
+        servers = [CheckoutLane(env, i+1, records) for i in range(router.num_lanes)]
+        lane_stores = [queue_stores[queue] for queue in router.lane_queue]
+        generator = routed_customer_generator(env, customers, router, queue_stores, on_chunk)
+
+    # Start Server Processes
+    for server, store in zip(servers, lane_stores):
+        env.process(server.serve(None, store))
+    return env, env.process(generator), servers
+
+def schedule_records(engine, df):
+    """
+    Schedules the next block of customers (sorted by Arrival Time, arriving no
+    earlier than the previous block) on an engine from new_fast_engine.
+    Returns the records in arrival order with the SimPy record columns.
+    """
+    arrivals = df['Arrival Time'].to_numpy(dtype=float)
+    services = df['Service Time'].to_numpy(dtype=float)
+    if isinstance(engine, LaneRouter):
+        starts, ends, lanes, services = engine.schedule(arrivals, services, _customer_items(df, engine))
+    else:
+        starts, ends, lanes = engine.schedule(arrivals, services)
+    waits = starts - arrivals
+    return pd.DataFrame({
+        'Customer ID': df['Customer ID'].to_numpy().astype(np.int64),
+        'Arrival Time': arrivals,
+        'Service Start Time': starts,
+        'Service End Time': ends,
+        'Service Time': services,
+        'Wait Time': waits,
+        'Server ID': lanes,
+        'Time in System': waits + services
+    })
+
+def _add_busy_time(servers, records):
+    # Accumulate in departure order per lane, exactly as CheckoutLane.serve does
+    for lane_id, duration in zip(records['Server ID'].tolist(), records['Service Time'].tolist()):
+        servers[lane_id - 1].busy_time += duration
+
+def _run_fast(df, num_servers, instrumentation=None, router=None):
+    """
+    Runs the FastFCFSEngine (or the router's schedule) and builds the same
+    records the SimPy lanes collect.
+    """
+    engine = new_fast_engine(num_servers, router, instrumentation)
+    records = schedule_records(engine, df)
+
+    servers = [CheckoutLane(None, i + 1) for i in range(num_servers)]
+    _add_busy_time(servers, records)
+
+    # Match the SimPy record buffer: departure order, simultaneous departures
+    # in the order their services were scheduled (by start time, then customer order)
+    order = np.lexsort((records['Service Start Time'].to_numpy(), records['Service End Time'].to_numpy()))
+    results_df = records.iloc[order].reset_index(drop=True)
+    return results_df, servers
+
+def _run_fast_streaming(chunks, num_servers, write_batch, instrumentation=None, router=None):
+    """
+    Streaming variant of _run_fast: each chunk is scheduled and written as soon
+    as it is read, carrying the lane free-times over to the next chunk.
+    """
+    engine = new_fast_engine(num_servers, router, instrumentation)
+    servers = [CheckoutLane(None, i + 1) for i in range(num_servers)]
+    for chunk in chunks:
+        records = schedule_records(engine, chunk)
+        _add_busy_time(servers, records)
+        write_batch(records)
+    return servers
+
+def _run_streaming(input_file, num_servers, engine, output_file, chunksize, verify_sorted,
+                   instrumentation=None, router=None, append=False):
+    """
+    Bounded-memory run: input is read `chunksize` rows at a time and finished
+    records are appended to `output_file` in batches, each sorted by Customer ID.
+    """
+    chunks = read_customer_chunks(input_file, chunksize, verify_sorted)
+    writer = ResultsWriter(output_file, append) if output_file is not None else None
+    def write_batch(records):
+        if writer is not None:
+            writer.write(records.sort_values('Customer ID'))
+
+    if engine == 'fast':
+        servers = _run_fast_streaming(chunks, num_servers, write_batch, instrumentation, router)
+    else:
+        records = RecordBuffer()
+
+        def drain(chunk=None):
+            if len(records):
+                write_batch(records.to_dataframe())
+                records.clear()
+
+        env, generator, servers = _start_simpy(chunks, num_servers, records, router, instrumentation,
+                                               on_chunk=drain)
+        run_until_departed(env, generator, servers)
+        drain()
+
+    if writer is not None:
+        writer.close()
+        print(f"✅ Simulation complete. Results streamed to {output_file}")
+    return None, servers
+
+def summarize_chunks(chunks, num_servers, engine='fast', instrumentation=None, router=None):
+    """
+    Runs either engine over an iterable of customer blocks (each sorted by
+    Arrival Time, in arrival order overall) while only updating a
+    SimulationSummary (O(lanes) memory). This is run_simulation's
+    metrics_only mode for callers that supply their own blocks.
+    Returns (SimulationSummary, servers).
+    """
+    summary = SimulationSummary(num_servers)
+    if engine == 'fast':
+        fcfs = new_fast_engine(num_servers, router, instrumentation)
+        for chunk in chunks:
+            summary.update_batch(schedule_records(fcfs, chunk))
+        servers = [CheckoutLane(None, i + 1) for i in range(num_servers)]
+        for server, busy_time, served in zip(servers, summary.busy_time, summary.served):
+            server.busy_time = float(busy_time)
+            server.num_served = int(served)
+        return summary, servers
+
+    # Lanes record straight into the summary instead of a RecordBuffer
+    env, generator, servers = _start_simpy(chunks, num_servers, summary, router, instrumentation)
+    run_until_departed(env, generator, servers)
+    return summary, servers
+
+def _save_checkpoint(path, state):
+    # Write-then-rename: a crash mid-write leaves the previous checkpoint intact
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _run_checkpointed(input_file, num_servers, output_file, chunksize, verify_sorted, metrics_only,
+                      instrumentation, router, append, checkpoint_path, checkpoint_every, resume_from):
+    """
+    Fast-engine streaming run that snapshots its full state every
+    `checkpoint_every` chunks: engine clock, lane free-times and queued
+    customers (or the router's queues and RNG), input cursor, lane busy times,
+    the output file position or running summary, and engine counters. With
+    `resume_from` the run continues from such a snapshot, truncating output
+    written after it, so the results match an uninterrupted run exactly.
+    """
+    engine = new_fast_engine(num_servers, router, instrumentation)
+    servers = [CheckoutLane(None, i + 1) for i in range(num_servers)]
+    summary = SimulationSummary(num_servers) if metrics_only else None
+    writer = None
+    position = None
+
+    if resume_from is not None:
+        with open(resume_from) as f:
+            state = json.load(f)
+        if state['engine_version'] != ENGINE_VERSION or state['num_servers'] != num_servers:
+            raise ValueError(f"Checkpoint '{resume_from}' was taken by a different engine or lane count")
+        if state['input_file'] != os.path.abspath(input_file) or state['metrics_only'] != metrics_only:
+            raise ValueError(f"Checkpoint '{resume_from}' belongs to another run")
+        engine.restore(state['engine'])
+        for server, busy_time in zip(servers, state['busy_time']):
+            server.busy_time = busy_time
+        if metrics_only:
+            summary = SimulationSummary.from_dict(state['summary'])
+        elif output_file is not None:
+            writer = ResultsWriter.resume(output_file, state['output'])
+        if instrumentation is not None:
+            instrumentation.counters.update(state['counters'])
+        position = state['input']
+        print(f"⏯️ Resuming from '{resume_from}' after {state['rows']} customers")
+        rows = state['rows']
+    else:
+        rows = 0
+        if not metrics_only and output_file is not None:
+            writer = ResultsWriter(output_file, append)
+
+    chunks = read_customer_chunks_at(input_file, chunksize, verify_sorted, position)
+    for k, (chunk, position) in enumerate(chunks, start=1):
+        records = schedule_records(engine, chunk)
+        if summary is not None:
+            summary.update_batch(records)
+        else:
+            _add_busy_time(servers, records)
+            if writer is not None:
+                writer.write(records.sort_values('Customer ID'))
+        rows += len(chunk)
+        if k % checkpoint_every == 0:
+            _save_checkpoint(checkpoint_path, {
+                'engine_version': ENGINE_VERSION,
+                'input_file': os.path.abspath(input_file),
+                'num_servers': num_servers,
+                'metrics_only': metrics_only,
+                'rows': rows,
+                'input': position,
+                'engine': engine.to_dict(),
+                'busy_time': [server.busy_time for server in servers],
+                'summary': summary.to_dict() if summary is not None else None,
+                'output': writer.checkpoint() if writer is not None else None,
+                'counters': instrumentation.counters if instrumentation is not None else None
+            })
+
+    if writer is not None:
+        writer.close()
+        print(f"✅ Simulation complete. Results streamed to {output_file}")
+    # The run finished: there is nothing left to resume
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    if summary is not None:
+        for server, busy_time, served in zip(servers, summary.busy_time, summary.served):
+            server.busy_time = float(busy_time)
+            server.num_served = int(served)
+        return summary, servers
+    return None, servers
+
+def _load_customers(input_file):
     # Load data
-    df = pd.read_csv(input_file)
+    if isinstance(input_file, pd.DataFrame):
+        df = input_file
+    else:
+        df = pd.read_csv(input_file)
     
     # Sort just in case
-    df = df.sort_values('Arrival Time')
-    
-    env = simpy.Environment()
-    
-    # Shared Queue (FCFS by default in SimPy Store)
-    queue_store = simpy.Store(env)
-    
-    # Create Servers
-    servers = [CheckoutLane(env, i+1) for i in range(num_servers)]
-    
-    # Start Server Processes
-    for server in servers:
-        env.process(server.serve(None, queue_store))
-        
-    # Start Customer Generator
-    env.process(customer_generator(env, df, queue_store))
+    return df.sort_values('Arrival Time')
+
+def run_simulation(input_file='customers.csv', num_servers=3, engine='simpy',
+                   output_file='simulation_results.npy', chunksize=None, verify_sorted=True,
+                   metrics_only=False, instrumentation=None, lanes=None, routing=None, routing_seed=0,
+                   append=False, checkpoint_path=None, checkpoint_every=10, resume_from=None):
+    """
+    Runs the checkout simulation over the customers in `input_file`.
+
+    Parameters:
+    - input_file: CSV with Customer ID, Arrival Time and Service Time columns,
+      or a customers DataFrame already in memory
+    - num_servers: Number of checkout lanes sharing the FCFS queue
+    - engine: 'simpy' for the discrete-event model, 'fast' for the event-free
+      heap schedule (identical results, no per-customer process overhead)
+    - output_file: Results file (.npy columnar by default, .parquet, or .csv as
+      an export), or None to keep the results in memory only
+    - chunksize: Stream `input_file` this many rows at a time (bounded memory).
+      Results are appended to `output_file` in batches instead of being
+      returned, so the call returns (None, servers)
+    - verify_sorted: In streaming mode, check the input is sorted by Arrival Time
+    - metrics_only: Keep no per-customer log; return (SimulationSummary, servers)
+      with running statistics updated as customers depart. Nothing is written
+    - instrumentation: Optional instrumentation.Instrumentation receiving engine
+      counters (events processed, queue puts/gets, max queue depth)
+    - lanes: Multi-queue layout as a list of routing.LaneGroup (per-lane queues,
+      express limits, self-checkout banks). Replaces num_servers; Server IDs
+      number the lanes of all groups in order
+    - routing: Policy sending arrivals to a queue, 'jsq' (join shortest queue),
+      'lwl' (least work left), 'p2c' (power of two choices) or a
+      routing.LaneRouter subclass. Without `lanes` this gives each of the
+      num_servers lanes its own queue. Defaults to 'jsq' when `lanes` is set
+    - routing_seed: Seed for randomised routing policies
+    - append: Add the results to an existing .npy / .csv output_file (e.g. the
+      next day of a long run) instead of replacing it; see
+      analysis.analyze_results(incremental=True)
+    - checkpoint_path: Snapshot the run's state to this JSON file every
+      `checkpoint_every` chunks (fast engine with chunksize only: SimPy
+      generators cannot be saved). Removed once the run completes
+    - resume_from: Checkpoint of an interrupted run with the same arguments;
+      the run continues from it (and keeps checkpointing to the same file
+      unless checkpoint_path is given) with results identical to an
+      uninterrupted run
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Expected one of {ENGINES}")
+
+    router = None
+    if lanes is not None or routing is not None:
+        if lanes is None:
+            lanes = [LaneGroup('regular', num_servers)]
+        router = make_router(lanes, routing or 'jsq', routing_seed, instrumentation)
+        num_servers = router.num_lanes
+
+    if checkpoint_path is not None or resume_from is not None:
+        if engine != 'fast' or chunksize is None or isinstance(input_file, pd.DataFrame):
+            raise ValueError("Checkpoints need engine='fast' streaming a CSV with chunksize "
+                             "(SimPy generator state cannot be saved)")
+        return _run_checkpointed(input_file, num_servers, output_file, chunksize, verify_sorted, metrics_only,
+                                 instrumentation, router, append, checkpoint_path or resume_from,
+                                 checkpoint_every, resume_from)
+
+    if metrics_only:
+        if chunksize is not None:
+            chunks = read_customer_chunks(input_file, chunksize, verify_sorted)
+        else:
+            df = _load_customers(input_file)
+            chunks = (df.iloc[i:i + METRICS_BLOCK_SIZE] for i in range(0, len(df), METRICS_BLOCK_SIZE))
+        return summarize_chunks(chunks, num_servers, engine, instrumentation, router)
+
+    if chunksize is not None:
+        return _run_streaming(input_file, num_servers, engine, output_file, chunksize, verify_sorted,
+                              instrumentation, router, append)
+
+    df = _load_customers(input_file)
     
-    # Run until all customers are processed
-    # A simple way is to run until a large time, or better:
-    # We can't easily know when the store is empty unless we track count.
-    # We will run for (last_arrival + sum of max service times + buffer) 
-    # Or just run until the process is done? 
-    # SimPy env.run() goes until no events. Since servers wait forever on queue.get(), 
-    # we need a termination condition.
+    if engine == 'fast':
+        results_df, servers = _run_fast(df, num_servers, instrumentation, router)
+        return _finalize_results(results_df, servers, output_file, append)
+
+    # Create Servers (recording into one shared columnar buffer), their queues
+    # and the Customer Generator
+    records = RecordBuffer()
+    env, generator, servers = _start_simpy(df, num_servers, records, router, instrumentation)
     
-    last_arrival = df['Arrival Time'].iloc[-1]
-    # Estimation: run enough time for the queue to clear
-    # A safer way: Check queue length and active processing?
-    # Simplest: Run for Last Arrival + 1000 mins buffer.
-    env.run(until=last_arrival + 1000)
+    # Run until the last customer departs. Servers wait forever on queue.get(),
+    # so the event queue never empties by itself; stop on the final departure.
+    run_until_departed(env, generator, servers)
     
     # Collect results
-    all_records = []
-    for server in servers:
-        all_records.extend(server.customers_served)
-        
-    results_df = pd.DataFrame(all_records)
+    results_df = records.to_dataframe()
+    return _finalize_results(results_df, servers, output_file, append)
+
+def _finalize_results(results_df, servers, output_file, append=False):
     results_df = results_df.sort_values('Customer ID')
+    if output_file is None:
+        return results_df, servers
     
     # Save results
-    output_file = 'simulation_results.csv'
-    results_df.to_csv(output_file, index=False)
-    print(f"✅ Simulation complete. Results saved to {output_file}")
+    save_results(results_df, output_file, append)
+    print(f"✅ Simulation complete. Results {'appended' if append else 'saved'} to {output_file}")
     return results_df, servers
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+import math
+import argparse
+import pandas as pd
+
+import erlang_c
+import simulation
+from generate_data import MIN_SERVICE_TIME
+from replications import run_replications
+
+# SLA metrics the optimizer understands: replication summary row -> closed-form key
+SLA_METRICS = {
+    'P95 Wait': 'p95_wait',
+    'Mean Wait': 'mean_wait'
+}
+
+def effective_service_time(mean_service_time):
+    """
+    Mean of the generated service times, which are exponential draws raised
+    to at least MIN_SERVICE_TIME: E[max(X, m)] = m + s * exp(-m / s).
+    """
+    return MIN_SERVICE_TIME + mean_service_time * math.exp(-MIN_SERVICE_TIME / mean_service_time)
+
+def analytical_lanes(sla_minutes, sla_metric='P95 Wait', mean_inter_arrival=1.0, mean_service_time=2.5,
+                     max_servers=200):
+    """
+    Fewest lanes whose M/M/c closed form meets the SLA, or None within max_servers.
+    """
+    service = effective_service_time(mean_service_time)
+    for servers in range(erlang_c.min_stable_servers(mean_inter_arrival, service), max_servers + 1):
+        metrics = erlang_c.mmc_metrics(mean_inter_arrival, service, servers)
+        if metrics[SLA_METRICS[sla_metric]] < sla_minutes:
+            return servers
+    return None
+
+def optimize_staffing(sla_minutes=3.0, sla_metric='P95 Wait', mean_inter_arrival=1.0, mean_service_time=2.5,
+                      num_customers=500, num_replications=10, seed=42, engine='fast', confidence=0.95,
+                      max_servers=200, max_workers=None):
+    """
+    Minimum number of lanes meeting an SLA such as "95th percentile wait < 3 min".
+
+    The Erlang C closed form picks the starting lane count in microseconds;
+    simulation then only confirms the boundary: replications at that count,
+    stepping down while one lane fewer still meets the SLA, or up until it is
+    met. A count meets the SLA when the upper confidence limit of the metric
+    across replications is below `sla_minutes`. Every count reuses the same
+    seed (common random numbers), so neighbouring counts see identical customers.
+
+    Parameters:
+    - sla_minutes: Target for the SLA metric
+    - sla_metric: 'P95 Wait' or 'Mean Wait'
+    - mean_inter_arrival, mean_service_time, num_customers: As in generate_data
+    - num_replications, seed, engine, confidence, max_workers: As in run_replications
+    - max_servers: Upper limit of the search
+
+    Returns (lanes, checks_df): the recommended lane count and one row per
+    simulated count with the metric's mean and confidence interval.
+    """
+    if sla_metric not in SLA_METRICS:
+        raise ValueError(f"Unknown SLA metric '{sla_metric}'. Expected one of {tuple(SLA_METRICS)}")
+    start = analytical_lanes(sla_minutes, sla_metric, mean_inter_arrival, mean_service_time, max_servers)
+    if start is None:
+        raise ValueError(f"No lane count up to {max_servers} meets {sla_metric} < {sla_minutes} min")
+    print(f"🧮 Erlang C: {start} lanes meet {sla_metric} < {sla_minutes} min analytically")
+
+    checks = {}
+
+    def meets_sla(servers):
+        if servers not in checks:
+            _, summary_df = run_replications(num_replications, num_customers, mean_inter_arrival,
+                                             mean_service_time, servers, seed, engine, confidence,
+                                             max_workers)
+            row = summary_df.set_index('Metric').loc[sla_metric]
+            checks[servers] = {
+                'Lanes': servers,
+                'Erlang C': erlang_c.mmc_metrics(mean_inter_arrival, effective_service_time(mean_service_time),
+                                                 servers)[SLA_METRICS[sla_metric]],
+                'Mean': row['Mean'],
+                'CI Lower': row['CI Lower'],
+                'CI Upper': row['CI Upper'],
+                'Meets SLA': bool(row['CI Upper'] < sla_minutes)
+            }
+            verdict = '✅ meets' if checks[servers]['Meets SLA'] else '❌ misses'
+            print(f"   {servers} lanes: {sla_metric} {row['Mean']:.2f} min "
+                  f"(CI {row['CI Lower']:.2f}-{row['CI Upper']:.2f}) {verdict} the SLA")
+        return checks[servers]['Meets SLA']
+
+    lanes = start
+    if meets_sla(lanes):
+        floor = erlang_c.min_stable_servers(mean_inter_arrival, effective_service_time(mean_service_time))
+        while lanes - 1 >= max(floor, 1) and meets_sla(lanes - 1):
+            lanes -= 1
+    else:
+        while not meets_sla(lanes):
+            lanes += 1
+            if lanes > max_servers:
+                raise ValueError(f"No lane count up to {max_servers} meets {sla_metric} < {sla_minutes} min")
+
+    checks_df = pd.DataFrame(sorted(checks.values(), key=lambda row: row['Lanes']))
+    print(f"✅ Minimum staffing: {lanes} lanes ({len(checks)} lane counts simulated)")
+    return lanes, checks_df
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find the fewest checkout lanes that meet a waiting-time SLA.')
+    parser.add_argument('--sla-minutes', type=float, default=3.0)
+    parser.add_argument('--sla-metric', choices=tuple(SLA_METRICS), default='P95 Wait')
+    parser.add_argument('--inter-arrival', type=float, default=1.0)
+    parser.add_argument('--service', type=float, default=2.5)
+    parser.add_argument('--customers', type=int, default=500)
+    parser.add_argument('--replications', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--engine', choices=simulation.ENGINES, default='fast')
+    parser.add_argument('--max-servers', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    lanes, checks_df = optimize_staffing(args.sla_minutes, args.sla_metric, args.inter_arrival, args.service,
+                                         args.customers, args.replications, args.seed, args.engine,
+                                         max_servers=args.max_servers, max_workers=args.workers)
+    print(checks_df.to_string(index=False))
+    return lanes
+
+if __name__ == "__main__":
+    main()
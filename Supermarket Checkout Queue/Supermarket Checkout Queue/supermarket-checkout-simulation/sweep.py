@@ -0,0 +1,186 @@
+import os
+import json
+import hashlib
+import argparse
+import itertools
+from collections import OrderedDict
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+import simulation
+from replications import run_replication
+
+class ResultCache:
+    """
+    Content-addressed store of sweep cells, one JSON file per cell.
+    Files are touched on every hit so their mtime gives the LRU order;
+    the least recently used cells are evicted once the store exceeds max_bytes.
+    The directory is scanned once when the cache is opened; after that the
+    LRU order and total size are kept in memory, so put() is O(1) amortised.
+    """
+    def __init__(self, cache_dir='.sweep_cache', max_bytes=50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        # File name -> size, least recently used first
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self._scan()
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+        for _, size, name in sorted(entries):
+            self.entries[name] = size
+        self.total_bytes = sum(self.entries.values())
+
+    @staticmethod
+    def key(params):
+        payload = json.dumps(params, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _forget(self, name):
+        self.total_bytes -= self.entries.pop(name, 0)
+
+    def get(self, key):
+        path = self._path(key)
+        name = os.path.basename(path)
+        try:
+            with open(path) as f:
+                row = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._forget(name)
+            return None
+        os.utime(path)
+        if name not in self.entries:
+            # Written by another process since the scan
+            self.entries[name] = os.path.getsize(path)
+            self.total_bytes += self.entries[name]
+        self.entries.move_to_end(name)
+        return row
+
+    def put(self, key, row):
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(row, f)
+            size = f.tell()
+        os.replace(tmp_path, path)
+        name = os.path.basename(path)
+        self._forget(name)
+        self.entries[name] = size
+        self.total_bytes += size
+        self.evict()
+
+    def evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+
+def _run_cell(cell):
+    """
+    Simulates one grid cell and returns its tidy metrics row.
+    """
+    summary = run_replication(np.random.SeedSequence(cell['seed']),
+                              num_customers=cell['num_customers'],
+                              mean_inter_arrival=cell['mean_inter_arrival'],
+                              mean_service_time=cell['mean_service_time'],
+                              num_servers=cell['num_servers'],
+                              engine=cell['engine'])
+    utilization = [v for k, v in summary.items() if k.startswith('Utilization Counter')]
+    return {
+        'Mean Wait': summary['Mean Wait'],
+        'P95 Wait': summary['P95 Wait'],
+        'Throughput (/hr)': summary['Throughput (/hr)'],
+        'Mean Utilization (%)': float(np.mean(utilization)),
+        'Max Utilization (%)': float(np.max(utilization))
+    }
+
+def run_sweep(num_servers=(2, 3, 4), mean_inter_arrival=(1.0,), mean_service_time=(2.5,),
+              num_customers=500, seed=42, engine='fast', max_workers=None,
+              cache_dir='.sweep_cache', cache_max_bytes=50 * 1024 * 1024):
+    """
+    Runs the full grid of configurations and returns one tidy metrics table.
+
+    Parameters:
+    - num_servers, mean_inter_arrival, mean_service_time: Values to sweep (grid = product)
+    - num_customers, seed, engine: Held fixed across the grid
+    - max_workers: Process pool size (defaults to all cores)
+    - cache_dir: Result cache directory, or None to disable caching
+    - cache_max_bytes: Size limit of the cache before LRU eviction
+    """
+    cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir else None
+
+    cells = []
+    for servers, inter_arrival, service in itertools.product(num_servers, mean_inter_arrival,
+                                                             mean_service_time):
+        cells.append({
+            'num_servers': int(servers),
+            'mean_inter_arrival': float(inter_arrival),
+            'mean_service_time': float(service),
+            'num_customers': int(num_customers),
+            'seed': int(seed),
+            'engine': engine,
+            'engine_version': simulation.ENGINE_VERSION
+        })
+
+    rows = [None] * len(cells)
+    keys = [ResultCache.key(cell) for cell in cells]
+    pending = []
+    for i, (cell, key) in enumerate(zip(cells, keys)):
+        cached = cache.get(key) if cache else None
+        if cached is None:
+            pending.append(i)
+        else:
+            rows[i] = cached
+
+    print(f"🧮 Sweep: {len(cells)} cells, {len(cells) - len(pending)} cached, {len(pending)} to compute")
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            for i, row in zip(pending, pool.map(_run_cell, [cells[i] for i in pending])):
+                rows[i] = row
+                if cache:
+                    cache.put(keys[i], row)
+
+    table = pd.DataFrame(cells).drop(columns=['engine_version'])
+    return pd.concat([table, pd.DataFrame(rows)], axis=1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Capacity-planning sweep over the checkout simulation.')
+    parser.add_argument('--servers', type=int, nargs='+', default=[2, 3, 4])
+    parser.add_argument('--inter-arrival', type=float, nargs='+', default=[1.0])
+    parser.add_argument('--service', type=float, nargs='+', default=[2.5])
+    parser.add_argument('--customers', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--engine', choices=simulation.ENGINES, default='fast')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-dir', default='.sweep_cache')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--cache-max-mb', type=float, default=50)
+    parser.add_argument('--output', default='sweep_results.csv')
+    args = parser.parse_args(argv)
+
+    table = run_sweep(num_servers=args.servers, mean_inter_arrival=args.inter_arrival,
+                      mean_service_time=args.service, num_customers=args.customers,
+                      seed=args.seed, engine=args.engine, max_workers=args.workers,
+                      cache_dir=None if args.no_cache else args.cache_dir,
+                      cache_max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    print(table.to_string(index=False))
+    table.to_csv(args.output, index=False)
+    print(f"✅ Sweep results saved to {args.output}")
+    return table
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Adaptive run length: MSER-5 finds an obvious warm-up, and the adaptive run
+simulates exactly the customers generate_data draws for the same seed.
+"""
+import numpy as np
+import pytest
+
+import adaptive
+import generate_data
+import simulation
+
+def test_mser5_discards_an_obvious_warm_up():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([np.linspace(50, 5, 200), 5 + rng.normal(0, 1, 2_000)])
+    warmup = adaptive.mser5_truncation(values)
+    assert warmup % 5 == 0
+    assert 150 <= warmup <= 300
+    assert adaptive.mser5_truncation(values[:9]) == 0
+
+def test_batch_means_interval_covers_the_mean():
+    values = np.random.default_rng(2).exponential(2.0, 30_000)
+    mean, half_width = adaptive.batch_means_ci(values, num_batches=30)
+    assert mean == pytest.approx(values.mean())
+    assert abs(mean - 2.0) < half_width < 0.1
+
+def test_adaptive_run_uses_the_generate_data_customers():
+    summary = adaptive.run_adaptive(num_servers=3, relative_precision=0.1, block_size=700, seed=7)
+    n = summary['Customers Simulated']
+    customers = generate_data.generate_data(n, 1.0, 2.5, seed=7, output_path=None)
+    waits = simulation.schedule_records(simulation.new_fast_engine(3), customers)['Wait Time'].to_numpy()
+
+    assert summary['Converged']
+    assert summary['Warm-up Customers'] == adaptive.mser5_truncation(waits)
+    assert summary['Mean Wait'] == pytest.approx(waits[summary['Warm-up Customers']:].mean(), rel=0.01)
+    assert summary['Relative Half Width'] <= 0.1
+
+def test_adaptive_run_stops_at_max_customers():
+    summary = adaptive.run_adaptive(relative_precision=1e-6, block_size=1_000, min_customers=2_000,
+                                    max_customers=4_500, seed=3)
+    assert summary['Customers Simulated'] == 4_500
+    assert not summary['Converged']
+    assert summary['CI Lower'] < summary['Mean Wait'] < summary['CI Upper']
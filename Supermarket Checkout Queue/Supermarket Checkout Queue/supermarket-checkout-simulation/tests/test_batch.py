@@ -0,0 +1,71 @@
+"""
+The multi-store batch runner: the arrival log keeps each store as a sorted
+contiguous slice, and every store's metrics equal a standalone run of the
+same customers, whatever the block size or worker count.
+"""
+import numpy as np
+import pytest
+
+import batch
+import generate_data
+import simulation
+from analysis import compute_metrics
+
+def _stores():
+    seeds = np.random.SeedSequence(3).spawn(3)
+    return [(f'store-{k}', generate_data.generate_data(n, rate, 2.5, seed=seeds[k], output_path=None))
+            for k, (n, rate) in enumerate([(400, 1.0), (250, 0.8), (600, 1.3)])]
+
+def test_arrival_log_offsets_and_order(tmp_path):
+    stores = _stores()
+    name, customers = stores[1]
+    # A shuffled store is stored in the same order as the sorted one
+    stores[1] = (name, customers.sample(frac=1.0, random_state=0))
+    log_path = str(tmp_path / 'arrivals.npy')
+    index = batch.write_arrival_log(stores, log_path)
+
+    assert index == batch.load_index(log_path)
+    assert [(e['offset'], e['count']) for e in index] == [(0, 400), (400, 250), (650, 600)]
+    log = np.load(log_path)
+    assert len(log) == 1250
+    for entry, (_, customers) in zip(index, _stores()):
+        rows = log[entry['offset']:entry['offset'] + entry['count']]
+        np.testing.assert_array_equal(rows['Customer ID'], customers['Customer ID'])
+        np.testing.assert_array_equal(rows['Arrival Time'], customers['Arrival Time'])
+
+def test_batch_metrics_match_standalone_runs(tmp_path):
+    log_path = str(tmp_path / 'arrivals.npy')
+    batch.write_arrival_log(_stores(), log_path)
+    table = batch.run_batch(log_path, num_servers={'store-0': 3, 'store-1': 2, 'store-2': 4},
+                            max_workers=2).set_index('Store')
+
+    for name, customers in _stores():
+        lanes = table.loc[name, 'Lanes']
+        results_df, _ = simulation.run_simulation(customers, lanes, engine='fast', output_file=None)
+        exact = compute_metrics(results_df)
+        row = table.loc[name]
+        assert row['Customers'] == len(customers)
+        assert row['Mean Wait'] == pytest.approx(exact['avg_waiting_time'], rel=1e-9)
+        assert row['Throughput (/hr)'] == pytest.approx(exact['throughput_per_hour'], rel=1e-9)
+        assert row['Avg Queue Length'] == pytest.approx(exact['avg_queue_length'], rel=1e-9)
+        assert row['Max Utilization (%)'] == pytest.approx(exact['server_stats']['Utilization (%)'].max())
+
+def test_store_results_do_not_depend_on_block_size(tmp_path, monkeypatch):
+    log_path = str(tmp_path / 'arrivals.npy')
+    index = batch.write_arrival_log(_stores(), log_path)
+    entry = index[2]
+    whole = batch._simulate_store((log_path, entry, 3, 'fast'))
+    monkeypatch.setattr(batch, 'BATCH_BLOCK_SIZE', 7)
+    blocked = batch._simulate_store((log_path, entry, 3, 'fast'))
+
+    assert blocked.keys() == whole.keys()
+    assert blocked['Store'] == whole['Store']
+    for key in whole.keys() - {'Store'}:
+        assert blocked[key] == pytest.approx(whole[key], rel=1e-9), key
+
+def test_batch_runs_only_the_selected_stores(tmp_path):
+    log_path = str(tmp_path / 'arrivals.npy')
+    batch.write_arrival_log(_stores(), log_path)
+    table = batch.run_batch(log_path, stores=['store-2', 'store-0'], max_workers=1)
+    assert sorted(table['Store']) == ['store-0', 'store-2']
+    assert list(table.columns[:3]) == ['Store', 'Lanes', 'Customers']
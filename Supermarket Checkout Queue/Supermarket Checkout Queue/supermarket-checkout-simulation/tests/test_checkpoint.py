@@ -0,0 +1,75 @@
+import pytest
+
+import generate_data
+import simulation
+
+def _write_customers(path):
+    generate_data.generate_data(2000, 1.0, 2.5, seed=11, output_path=None).to_csv(path, index=False)
+
+@pytest.mark.parametrize('output_name', ['results.npy', 'results.csv', None])
+@pytest.mark.parametrize('routing', [None, 'p2c'])
+def test_checkpoint_resume_matches_uninterrupted_run(tmp_path, monkeypatch, output_name, routing):
+    input_file = tmp_path / 'customers.csv'
+    _write_customers(input_file)
+    metrics_only = output_name is None
+    options = dict(num_servers=3, engine='fast', chunksize=150, routing=routing, metrics_only=metrics_only)
+
+    expected_file = tmp_path / f'expected{output_name or ""}'
+    expected, _ = simulation.run_simulation(str(input_file), output_file=str(expected_file), **options)
+
+    # Crash partway through: the sixth chunk fails after five were checkpointed
+    checkpoint = tmp_path / 'run.ckpt.json'
+    output_file = tmp_path / f'resumed{output_name or ""}'
+    schedule_records = simulation.schedule_records
+    calls = []
+
+    def failing(engine, df):
+        calls.append(len(df))
+        if len(calls) == 6:
+            raise RuntimeError('simulated crash')
+        return schedule_records(engine, df)
+
+    monkeypatch.setattr(simulation, 'schedule_records', failing)
+    with pytest.raises(RuntimeError):
+        simulation.run_simulation(str(input_file), output_file=str(output_file), checkpoint_path=str(checkpoint),
+                                  checkpoint_every=1, **options)
+    monkeypatch.setattr(simulation, 'schedule_records', schedule_records)
+    assert checkpoint.exists()
+
+    resumed, _ = simulation.run_simulation(str(input_file), output_file=str(output_file),
+                                           resume_from=str(checkpoint), **options)
+    assert not checkpoint.exists()
+    if metrics_only:
+        assert resumed.to_dict() == expected.to_dict()
+    else:
+        assert output_file.read_bytes() == expected_file.read_bytes()
+
+def test_resume_rejects_a_different_lane_count(tmp_path, monkeypatch):
+    input_file = tmp_path / 'customers.csv'
+    _write_customers(input_file)
+    checkpoint = tmp_path / 'run.ckpt.json'
+    schedule_records = simulation.schedule_records
+    calls = []
+
+    def failing(engine, df):
+        calls.append(len(df))
+        if len(calls) == 3:
+            raise RuntimeError('simulated crash')
+        return schedule_records(engine, df)
+
+    monkeypatch.setattr(simulation, 'schedule_records', failing)
+    with pytest.raises(RuntimeError):
+        simulation.run_simulation(str(input_file), 3, engine='fast', output_file=str(tmp_path / 'r.npy'),
+                                  chunksize=200, checkpoint_path=str(checkpoint), checkpoint_every=1)
+    monkeypatch.setattr(simulation, 'schedule_records', schedule_records)
+    with pytest.raises(ValueError):
+        simulation.run_simulation(str(input_file), 4, engine='fast', output_file=str(tmp_path / 'r.npy'),
+                                  chunksize=200, resume_from=str(checkpoint))
+
+@pytest.mark.parametrize('options', [dict(engine='simpy', chunksize=100), dict(engine='fast')])
+def test_checkpoints_need_fast_streaming_runs(tmp_path, options):
+    input_file = tmp_path / 'customers.csv'
+    _write_customers(input_file)
+    with pytest.raises(ValueError):
+        simulation.run_simulation(str(input_file), 3, output_file=None,
+                                  checkpoint_path=str(tmp_path / 'run.ckpt.json'), **options)
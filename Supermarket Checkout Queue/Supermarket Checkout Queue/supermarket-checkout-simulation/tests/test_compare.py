@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import compare
+import generate_data
+
+def _by_window(df, window_minutes):
+    window = (df['Arrival Time'].to_numpy() // window_minutes).astype(int)
+    return {w: df[window == w] for w in np.unique(window)}
+
+@pytest.mark.parametrize('method', ['crn', 'antithetic'])
+def test_paired_runs_share_seeds_and_window_across_rates(method):
+    configs = [{'mean_inter_arrival': 1e-3}, {'mean_inter_arrival': 1.0, 'num_servers': 4}]
+    keys, tasks = compare._paired_tasks(configs, 3, 42, method, {'num_customers': 100})
+    runs = {}
+    for (c, r), (seed_seq, antithetic, arguments) in zip(keys, tasks):
+        runs.setdefault((r, antithetic), []).append((seed_seq.spawn_key, arguments['window_minutes']))
+    for pair in runs.values():
+        assert len(pair) == 2 and pair[0] == pair[1]
+    # Left to themselves the two rates would split time into different windows
+    assert generate_data._window_minutes(1e3) != generate_data._window_minutes(1.0)
+
+def test_independent_runs_draw_their_own_seeds():
+    keys, tasks = compare._paired_tasks([{'num_servers': 3}, {'num_servers': 4}], 2, 42, 'independent', {})
+    assert tasks[0][0].spawn_key != tasks[2][0].spawn_key
+
+def test_customers_line_up_window_by_window_across_rates():
+    window_minutes = 60.0
+    fast = generate_data.generate_data(4_000, 1.0, seed=7, output_path=None, window_minutes=window_minutes)
+    slow = generate_data.generate_data(1_000, 2.0, seed=7, output_path=None, window_minutes=window_minutes)
+    fast_windows = _by_window(fast, window_minutes)
+    slow_windows = _by_window(slow, window_minutes)
+    assert len(slow_windows) > 10
+    for w, slow_window in list(slow_windows.items())[:-1]:
+        fast_window = fast_windows[w].iloc[:len(slow_window)]
+        # Same uniforms: identical services, and arrival offsets scaled by the rate ratio
+        np.testing.assert_array_equal(slow_window['Service Time'].to_numpy(), fast_window['Service Time'].to_numpy())
+        np.testing.assert_allclose(slow_window['Arrival Time'].to_numpy() - w * window_minutes,
+                                   2 * (fast_window['Arrival Time'].to_numpy() - w * window_minutes), atol=0.02)
+
+def test_antithetic_trace_is_negatively_correlated():
+    plain = generate_data.generate_data(5_000, seed=3, output_path=None)
+    mirror = generate_data.generate_data(5_000, seed=3, output_path=None, antithetic=True)
+    # Services are drawn per customer in both traces, so they pair up one to one
+    assert np.corrcoef(plain['Service Time'], mirror['Service Time'])[0, 1] < -0.5
+
+def test_antithetic_comparison_reduces_variance():
+    _, crn = compare.compare_configurations([{'num_servers': 3}, {'num_servers': 4}], 8, method='crn',
+                                            max_workers=2, num_customers=300)
+    _, antithetic = compare.compare_configurations([{'num_servers': 3}, {'num_servers': 4}], 8,
+                                                   method='antithetic', max_workers=2, num_customers=300)
+    assert (crn['Variance Ratio'] > 1).all()
+    wait = lambda table: table.set_index('Metric').loc['Mean Wait']
+    assert wait(antithetic)['Std Dev'] < wait(crn)['Std Dev']
@@ -0,0 +1,64 @@
+"""
+The Erlang C closed forms against textbook values, the factorial-sum
+definition, and each other; plus the analytical lane count the staffing
+search starts from.
+"""
+import math
+
+import pytest
+
+import erlang_c
+import staffing
+
+def _erlang_c_by_sums(num_servers, offered_load):
+    # Textbook definition; fine for the small cases it is compared on
+    c, a = num_servers, offered_load
+    tail = a ** c / math.factorial(c) * c / (c - a)
+    return tail / (sum(a ** k / math.factorial(k) for k in range(c)) + tail)
+
+@pytest.mark.parametrize('num_servers, offered_load, expected', [
+    (1, 0.5, 0.5),           # M/M/1: P(wait) = rho
+    (2, 1.0, 1 / 3),         # M/M/2 at rho = 0.5: 2 rho^2 / (1 + rho)
+    (3, 2.0, 4 / 9),
+    (3, 2.5, 0.702247),      # the generate_data defaults: lambda = 1/min, mean service 2.5 min
+    (5, 4.0, 0.554113),
+    (10, 8.0, 0.409180)
+])
+def test_erlang_c_matches_tables(num_servers, offered_load, expected):
+    assert erlang_c.erlang_c(num_servers, offered_load) == pytest.approx(expected, abs=1e-6)
+    assert erlang_c.erlang_c(num_servers, offered_load) == pytest.approx(
+        _erlang_c_by_sums(num_servers, offered_load), rel=1e-12)
+
+def test_erlang_c_is_stable_for_many_lanes():
+    # 170! is the last factorial a float holds; the recursion must not care
+    assert 0 < erlang_c.erlang_c(400, 380.0) < 1
+    assert erlang_c.erlang_c(400, 400.0) == 1.0
+    assert erlang_c.erlang_c(3, 0.0) == 0.0
+
+def test_mm1_metrics():
+    m = erlang_c.mmc_metrics(mean_inter_arrival=2.0, mean_service_time=1.5, num_servers=1)
+    rho, arrival_rate, service_rate = 0.75, 0.5, 1 / 1.5
+    assert m['utilization'] == pytest.approx(rho)
+    assert m['mean_wait'] == pytest.approx(rho / (service_rate - arrival_rate))
+    assert m['mean_queue_length'] == pytest.approx(rho ** 2 / (1 - rho))
+    assert m['mean_time_in_system'] == pytest.approx(1 / (service_rate - arrival_rate))
+
+def test_wait_quantile_inverts_tail_probability():
+    q = erlang_c.wait_quantile(0.95, 1.0, 2.5, 3)
+    assert q > 0
+    assert erlang_c.prob_wait_exceeds(q, 1.0, 2.5, 3) == pytest.approx(0.05)
+    # Fewer than 5% wait at all, so the 95th percentile is zero
+    assert erlang_c.wait_quantile(0.95, 1.0, 2.5, 8) == 0.0
+
+def test_unstable_systems_have_infinite_waits():
+    assert erlang_c.min_stable_servers(1.0, 2.5) == 3
+    assert erlang_c.min_stable_servers(1.0, 3.0) == 4
+    m = erlang_c.mmc_metrics(1.0, 2.5, 2)
+    assert (m['prob_wait'], m['mean_wait'], m['p95_wait']) == (1.0, math.inf, math.inf)
+
+def test_analytical_lanes_is_the_fewest_meeting_the_sla():
+    lanes = staffing.analytical_lanes(3.0, 'P95 Wait', 1.0, 2.5)
+    service = staffing.effective_service_time(2.5)
+    assert erlang_c.mmc_metrics(1.0, service, lanes)['p95_wait'] < 3.0
+    assert erlang_c.mmc_metrics(1.0, service, lanes - 1)['p95_wait'] >= 3.0
+    assert staffing.analytical_lanes(1e-9, 'Mean Wait', 1.0, 2.5, max_servers=4) is None
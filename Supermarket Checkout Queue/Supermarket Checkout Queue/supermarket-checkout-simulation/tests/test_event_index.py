@@ -0,0 +1,72 @@
+"""
+The event index must agree with brute-force counting over the results table:
+queue length and busy lanes at any time, their time averages over arbitrary
+windows, and Little's law over the full horizon.
+"""
+import numpy as np
+import pytest
+
+import generate_data
+import simulation
+from analysis import compute_metrics
+from event_index import QueueStateIndex, StepFunction
+
+@pytest.fixture(scope='module')
+def results():
+    customers = generate_data.generate_data(2_000, 0.9, 2.5, seed=11, output_path=None)
+    # Shuffled rows: the index must not rely on the stored order
+    return simulation.run_simulation(customers, 3, engine='fast', output_file=None)[0] \
+        .sample(frac=1.0, random_state=0)
+
+def _brute_counts(df, t):
+    arrival = df['Arrival Time'].to_numpy()[:, None]
+    start = df['Service Start Time'].to_numpy()[:, None]
+    end = df['Service End Time'].to_numpy()[:, None]
+    queue = ((arrival <= t) & (start > t)).sum(axis=0)
+    busy = ((start <= t) & (end > t)).sum(axis=0)
+    return queue, busy
+
+def _brute_average(up, down, start, end):
+    # Each customer contributes the overlap of its [up, down) interval with the window
+    overlap = np.minimum(np.asarray(down), end) - np.maximum(np.asarray(up), start)
+    return np.clip(overlap, 0, None).sum() / (end - start)
+
+def test_point_queries_match_brute_force(results):
+    index = QueueStateIndex.from_results(results)
+    times = np.concatenate([np.linspace(-1, results['Service End Time'].max() + 1, 500),
+                            results['Arrival Time'].to_numpy()[:100],
+                            results['Service End Time'].to_numpy()[:100]])
+    queue, busy = _brute_counts(results, times)
+    np.testing.assert_array_equal(index.queue_length_at(times), queue)
+    np.testing.assert_array_equal(index.busy_lanes_at(times), busy)
+    assert isinstance(index.queue_length_at(float(times[0])), int)
+    assert busy.max() <= 3
+
+def test_step_function_integral_is_exact():
+    step = StepFunction([0.0, 1.0, 1.0, 4.0], [2.0, 3.0, 5.0, 6.0])
+    # Levels: 1 on [0,1), 3 on [1,2), 2 on [2,3), 1 on [3,4), 2 on [4,5), 1 on [5,6)
+    assert step.integral_to(6.0) == pytest.approx(1 + 3 + 2 + 1 + 2 + 1)
+    assert step.time_average(1.5, 4.5) == pytest.approx((1.5 + 2 + 1 + 1) / 3)
+    assert step.peak() == (1.0, 3)
+    np.testing.assert_allclose(step.time_average(np.array([0.0, 2.0]), np.array([2.0, 6.0])),
+                               [2.0, 1.5])
+
+@pytest.mark.parametrize('window', [(0.0, None), (100.0, 400.0), (333.3, 333.3)])
+def test_windowed_averages_match_brute_force(results, window):
+    index = QueueStateIndex.from_results(results)
+    start, end = window
+    end = results['Service End Time'].max() if end is None else end
+    if end == start:
+        assert index.mean_queue_length(start, end) == 0.0
+        return
+    queue = _brute_average(results['Arrival Time'], results['Service Start Time'], start, end)
+    busy = _brute_average(results['Service Start Time'], results['Service End Time'], start, end)
+    assert index.mean_queue_length(start, end) == pytest.approx(queue, rel=1e-9)
+    assert index.mean_busy_lanes(start, end) == pytest.approx(busy, rel=1e-9)
+
+def test_littles_law_holds_over_the_full_horizon(results):
+    metrics = compute_metrics(results)
+    check = metrics['littles_law']
+    assert check['relative_error'] < 1e-9
+    assert check['L_queue'] == pytest.approx(check['lambda_W_queue'], rel=1e-9)
+    assert metrics['avg_queue_length'] == check['L_queue']
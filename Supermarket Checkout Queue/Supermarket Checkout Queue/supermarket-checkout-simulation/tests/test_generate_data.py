@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_data
+
+@pytest.mark.parametrize('options', [
+    dict(mean_inter_arrival=1.0),
+    dict(rate_profile=generate_data.DAILY_PROFILE, mean_items=12),
+    # Many short windows: the high-rate path
+    dict(mean_inter_arrival=1e-4)
+])
+def test_output_does_not_depend_on_worker_count(options):
+    num_customers = 20_000 if 'rate_profile' not in options else 5_000
+    serial = generate_data.generate_data(num_customers, seed=9, output_path=None, workers=1, **options)
+    parallel = generate_data.generate_data(num_customers, seed=9, output_path=None, workers=3, **options)
+    pd.testing.assert_frame_equal(serial, parallel, check_exact=True)
+    assert len(serial) == num_customers
+    assert serial['Arrival Time'].is_monotonic_increasing
+
+def test_streamed_csv_matches_dataframe(tmp_path):
+    path = tmp_path / 'customers.csv'
+    expected = generate_data.generate_data(3_000, seed=5, output_path=None)
+    assert generate_data.generate_data(3_000, seed=5, output_path=str(path), return_df=False) is None
+    pd.testing.assert_frame_equal(pd.read_csv(path), expected)
+
+@pytest.mark.parametrize('mean_inter_arrival', [10.0, 1.0, 1e-3, 1e-5, 1e-9])
+def test_windows_hold_bounded_candidates(mean_inter_arrival):
+    window = generate_data._window_minutes(1 / mean_inter_arrival)
+    assert window / mean_inter_arrival <= 2 * generate_data.WINDOW_TARGET_CANDIDATES
+    # Windows tile the hours, so the rate profile's hour edges stay window edges
+    hours_or_fraction = window / 60 if window >= 60 else 60 / window
+    assert hours_or_fraction == pytest.approx(round(hours_or_fraction))
+
+def test_few_customers_at_a_high_rate_stay_small():
+    df = generate_data.generate_data(100, 1e-5, seed=1, output_path=None)
+    assert len(df) == 100
+    assert df['Service Time'].min() >= generate_data.MIN_SERVICE_TIME
+
+def test_rate_profile_leaves_closed_hours_empty():
+    df = generate_data.generate_data(4_000, rate_profile=generate_data.DAILY_PROFILE, seed=2, output_path=None)
+    hours = (df['Arrival Time'].to_numpy() // 60).astype(int) % 24
+    closed = np.flatnonzero(np.asarray(generate_data.DAILY_PROFILE) == 0)
+    assert not np.isin(hours, closed).any()
@@ -0,0 +1,67 @@
+"""
+Streaming statistics: the quantile sketch stays within its relative accuracy
+(also after merging), running moments match numpy, and a metrics-only run
+reports the same numbers as the full results table.
+"""
+import json
+
+import numpy as np
+import pytest
+
+import generate_data
+import simulation
+from analysis import compute_metrics
+from online_stats import QuantileSketch, RunningMoments, SimulationSummary
+
+@pytest.mark.parametrize('relative_accuracy', [0.01, 0.05])
+@pytest.mark.parametrize('q', [0.5, 0.95, 0.99])
+def test_quantile_sketch_within_relative_accuracy(relative_accuracy, q):
+    rng = np.random.default_rng(8)
+    # Waits: many exact zeros plus a long right tail
+    values = np.where(rng.random(50_000) < 0.3, 0.0, rng.lognormal(0.5, 1.2, 50_000))
+    sketch = QuantileSketch(relative_accuracy)
+    for block in np.array_split(values, 7):
+        part = QuantileSketch(relative_accuracy)
+        part.update_batch(block)
+        sketch.merge(part)
+
+    exact = np.sort(values)[int(q * (len(values) - 1))]
+    assert sketch.count == len(values)
+    assert abs(sketch.quantile(q) - exact) <= relative_accuracy * exact
+
+def test_running_moments_match_numpy():
+    values = np.random.default_rng(2).gamma(2.0, 3.0, 10_001)
+    moments = RunningMoments()
+    for block in np.array_split(values[:-1], 5):
+        part = RunningMoments()
+        part.update_batch(block)
+        moments.merge(part)
+    moments.update(values[-1])
+
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert moments.variance == pytest.approx(values.var(ddof=1), rel=1e-9)
+
+def test_metrics_only_p95_close_to_exact():
+    customers = generate_data.generate_data(20_000, 1.0, 2.5, seed=4, output_path=None)
+    results_df, _ = simulation.run_simulation(customers, 3, engine='fast', output_file=None)
+    summary, _ = simulation.run_simulation(customers, 3, engine='fast', metrics_only=True)
+    waits = np.sort(results_df['Wait Time'].to_numpy())
+    exact = waits[int(0.95 * (len(waits) - 1))]
+    assert abs(summary.to_metrics()['wait_time_p95'] - exact) <= summary.relative_accuracy * exact
+
+def test_summary_matches_full_table_and_survives_json():
+    customers = generate_data.generate_data(5_000, 1.1, 2.5, seed=6, output_path=None)
+    results_df, _ = simulation.run_simulation(customers, 3, engine='fast', output_file=None)
+    summary = SimulationSummary(3)
+    for block in np.array_split(np.arange(len(results_df)), 4):
+        part = SimulationSummary(3)
+        part.update_batch(results_df.iloc[block])
+        summary.merge(part)
+    restored = SimulationSummary.from_dict(json.loads(json.dumps(summary.to_dict())))
+
+    exact = compute_metrics(results_df)
+    approx = restored.to_metrics()
+    for key in ('avg_waiting_time', 'avg_time_in_system', 'total_customers', 'throughput_per_hour'):
+        assert approx[key] == pytest.approx(exact[key], rel=1e-9)
+    np.testing.assert_array_equal(restored.served, np.bincount(results_df['Server ID'], minlength=4)[1:])
@@ -0,0 +1,51 @@
+"""
+Independent replications: the Student-t intervals are computed correctly,
+narrow as replications are added, and are reproducible from the root seed.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import t
+
+import replications
+
+def test_confidence_intervals_match_student_t():
+    df = pd.DataFrame({'Replication': [1, 2, 3, 4], 'Mean Wait': [1.0, 2.0, 4.0, 5.0]})
+    row = replications.confidence_intervals(df, confidence=0.9).iloc[0]
+    std = np.std([1.0, 2.0, 4.0, 5.0], ddof=1)
+    half_width = t.ppf(0.95, 3) * std / 2
+    assert row['Metric'] == 'Mean Wait'
+    assert row['Mean'] == pytest.approx(3.0)
+    assert row['Std Dev'] == pytest.approx(std)
+    assert (row['CI Lower'], row['CI Upper']) == pytest.approx((3.0 - half_width, 3.0 + half_width))
+
+def test_confidence_intervals_need_two_replications():
+    with pytest.raises(ValueError):
+        replications.confidence_intervals(pd.DataFrame({'Replication': [1], 'Mean Wait': [1.0]}))
+    with pytest.raises(ValueError):
+        replications.run_replications(num_replications=1)
+
+def test_more_replications_narrow_the_interval():
+    kwargs = dict(num_customers=300, seed=5, max_workers=2)
+    _, few = replications.run_replications(num_replications=4, **kwargs)
+    _, many = replications.run_replications(num_replications=40, **kwargs)
+    few, many = few.set_index('Metric'), many.set_index('Metric')
+    assert many.loc['Mean Wait', 'Half Width'] < few.loc['Mean Wait', 'Half Width']
+    assert (many['CI Lower'] <= many['Mean']).all() and (many['Mean'] <= many['CI Upper']).all()
+
+def test_replications_are_reproducible_and_independent_of_workers():
+    first, _ = replications.run_replications(num_replications=4, num_customers=200, seed=9, max_workers=1)
+    second, _ = replications.run_replications(num_replications=4, num_customers=200, seed=9, max_workers=3)
+    pd.testing.assert_frame_equal(first, second)
+    assert first['Mean Wait'].nunique() == 4
+    assert list(first.columns[:1]) == ['Replication']
+    assert [c for c in first.columns if c.startswith('Utilization')] == \
+        [f'Utilization Counter {i} (%)' for i in (1, 2, 3)]
+
+def test_antithetic_replications_average_the_mirrored_runs():
+    plain, _ = replications.run_replications(num_replications=3, num_customers=200, seed=9, max_workers=1)
+    paired, _ = replications.run_replications(num_replications=3, num_customers=200, seed=9, max_workers=1,
+                                              antithetic=True)
+    seed_seq = np.random.SeedSequence(9).spawn(3)[0]
+    mirror = replications.run_replication(seed_seq, num_customers=200, antithetic=True)
+    assert paired.loc[0, 'Mean Wait'] == pytest.approx((plain.loc[0, 'Mean Wait'] + mirror['Mean Wait']) / 2)
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+import server
+import simulation
+
+async def _get(path):
+    listener = await asyncio.start_server(server.handle_client, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 30)
+        writer.close()
+    return response.decode()
+
+@pytest.mark.parametrize('query', ['servers=0', 'servers=5000', 'inter_arrival=0', 'inter_arrival=-1',
+                                   'inter_arrival=nan', 'service=0', 'service=inf', 'speed=0', 'fps=0',
+                                   'start=nan', 'servers=three'])
+def test_events_rejects_bad_queries(query):
+    response = asyncio.run(_get(f'/events?{query}'))
+    assert response.startswith('HTTP/1.1 400 Bad Request')
+
+def test_events_streams_to_done():
+    response = asyncio.run(_get('/events?customers=50&speed=1000'))
+    assert response.startswith('HTTP/1.1 200 OK')
+    assert 'event: config' in response and 'event: frame' in response
+    assert response.rstrip().splitlines()[-2] == 'event: done'
+
+def test_engine_stream_matches_batch_run():
+    stream = server.EngineStream(num_customers=300, num_servers=2, seed=3)
+    while not stream.finished:
+        stream.advance(7.5)
+    results_df, _ = simulation.run_simulation(stream.customers, 2, engine='fast', output_file=None)
+    assert stream.completed == 300
+    assert stream.summary()['avg_wait'] == pytest.approx(results_df['Wait Time'].mean())
@@ -0,0 +1,94 @@
+import asyncio
+import math
+
+import pytest
+
+import service
+
+@pytest.mark.parametrize('params', [
+    {'inter_arrival': math.nan},
+    {'service': math.inf},
+    {'servers': math.inf},
+    {'inter_arrival': 'nan'},
+    {'inter_arrival': 1e-12},
+    {'inter_arrival': 0},
+    {'service': -1},
+    {'servers': 0},
+    {'servers': 1_000_000},
+    {'customers': 0},
+    {'customers': 10 ** 12},
+    {'customers': 2.5},
+    {'seed': -1},
+    {'servers': True},
+    {'customers': False},
+    {'servers': 'four'},
+    {'engine': 'warp'},
+    {'routing': 'random'},
+    {'colour': 'blue'},
+    ['servers', 3]
+])
+def test_normalize_scenario_rejects_bad_values(params):
+    with pytest.raises(ValueError):
+        service.normalize_scenario(params)
+
+def test_normalize_scenario_fills_defaults_and_casts_query_strings():
+    scenario = service.normalize_scenario({'servers': '4', 'inter_arrival': '0.5', 'customers': 100.0})
+    assert scenario == {'customers': 100, 'servers': 4, 'inter_arrival': 0.5, 'service': 2.5, 'seed': 42,
+                        'engine': 'fast', 'routing': None}
+    # Equal scenarios, however spelled, share one cache key
+    assert scenario == service.normalize_scenario({'customers': 100, 'servers': 4, 'inter_arrival': 0.5})
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = service.TTLCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(service.time, 'monotonic', lambda: now[0])
+    cache = service.TTLCache(ttl=60)
+    cache.put('a', 1)
+    now[0] += 60
+    assert cache.get('a') == 1
+    now[0] += 1
+    assert cache.get('a') is None
+    assert 'a' not in cache.entries
+
+def test_identical_concurrent_requests_are_computed_once():
+    scenario = service.normalize_scenario({'customers': 200, 'servers': 2})
+
+    async def run():
+        svc = service.SimulationService(workers=1)
+        try:
+            answers = await asyncio.gather(*(svc.simulate(scenario) for _ in range(5)))
+            cached = await svc.simulate(scenario)
+            return answers, cached, svc.status()
+        finally:
+            svc.close()
+
+    answers, cached, status = asyncio.run(run())
+    assert sorted(source for _, source in answers) == ['coalesced'] * 4 + ['computed']
+    assert all(metrics == answers[0][0] for metrics, _ in answers)
+    assert cached == (answers[0][0], 'cache')
+    assert (status['computed'], status['coalesced'], status['cache_hits']) == (1, 4, 1)
+    assert status['in_flight'] == 0
+
+def test_distinct_requests_beyond_max_pending_are_refused():
+    async def run():
+        svc = service.SimulationService(workers=1, max_pending=1)
+        try:
+            first = asyncio.ensure_future(svc.simulate(service.normalize_scenario({'seed': 1})))
+            await asyncio.sleep(0)
+            with pytest.raises(OverflowError):
+                await svc.simulate(service.normalize_scenario({'seed': 2}))
+            await first
+            return svc.status()
+        finally:
+            svc.close()
+
+    status = asyncio.run(run())
+    assert (status['computed'], status['rejected']) == (1, 1)
@@ -0,0 +1,65 @@
+"""
+The fast engine (and the routers' event-free schedules) must reproduce the
+SimPy run exactly: same records in the same order, same lane busy times.
+Lanes also report the customers they served, with or without kept records.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_data
+import simulation
+from routing import LaneGroup
+
+def _customers(num_customers, mean_inter_arrival, seed, mean_items=None):
+    return generate_data.generate_data(num_customers, mean_inter_arrival, 2.5, seed=seed,
+                                       output_path=None, mean_items=mean_items)
+
+def _assert_same_run(simpy_run, fast_run):
+    (simpy_df, simpy_servers), (fast_df, fast_servers) = simpy_run, fast_run
+    pd.testing.assert_frame_equal(simpy_df, fast_df, check_exact=True)
+    assert [s.busy_time for s in simpy_servers] == [s.busy_time for s in fast_servers]
+
+@pytest.mark.parametrize('num_servers', [1, 3, 5])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_fast_engine_matches_simpy(num_servers, seed):
+    # Rounded arrival times tie often, which exercises the tie-breaking order
+    customers = _customers(400, 0.9, seed)
+    _assert_same_run(simulation.run_simulation(customers, num_servers, engine='simpy', output_file=None),
+                     simulation.run_simulation(customers, num_servers, engine='fast', output_file=None))
+
+def test_fast_engine_matches_simpy_with_integer_ties():
+    rng = np.random.default_rng(3)
+    customers = pd.DataFrame({
+        'Customer ID': np.arange(1, 301),
+        'Arrival Time': np.cumsum(rng.integers(0, 3, 300)).astype(float),
+        'Service Time': rng.integers(0, 6, 300).astype(float)
+    })
+    _assert_same_run(simulation.run_simulation(customers, 3, engine='simpy', output_file=None),
+                     simulation.run_simulation(customers, 3, engine='fast', output_file=None))
+
+@pytest.mark.parametrize('routing', ['jsq', 'lwl', 'p2c'])
+@pytest.mark.parametrize('mixed', [False, True])
+def test_routed_fast_engine_matches_simpy(routing, mixed):
+    customers = _customers(1000, 0.25, 5, mean_items=12)
+    if mixed:
+        lanes = [LaneGroup('regular', 6), LaneGroup('express', 2, max_items=10),
+                 LaneGroup('self', 5, shared_queue=True, service_multiplier=1.5)]
+        options = dict(lanes=lanes)
+    else:
+        options = dict(num_servers=12)
+    options.update(routing=routing, routing_seed=7, output_file=None)
+    _assert_same_run(simulation.run_simulation(customers, engine='simpy', **options),
+                     simulation.run_simulation(customers, engine='fast', **options))
+
+def test_lane_customers_served_with_and_without_records():
+    customers = _customers(300, 1.0, 2)
+    results_df, servers = simulation.run_simulation(customers, 3, engine='simpy', output_file=None)
+    for server in servers:
+        served = server.customers_served
+        assert len(served) == server.num_served == (results_df['Server ID'] == server.lane_id).sum()
+        assert all(row['Server ID'] == server.lane_id for row in served)
+
+    summary, servers = simulation.run_simulation(customers, 3, engine='simpy', metrics_only=True)
+    assert [server.customers_served for server in servers] == summary.served.tolist()
+    assert sum(server.customers_served for server in servers) == len(customers)
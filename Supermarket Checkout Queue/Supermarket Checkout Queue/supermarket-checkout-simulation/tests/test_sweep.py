@@ -0,0 +1,62 @@
+"""
+The sweep's result cache: least recently used cells are evicted first once
+the byte limit is exceeded, hits refresh a cell's place, the order survives
+reopening the directory, and a repeated sweep is served from the cache.
+"""
+import json
+import os
+
+import pandas as pd
+
+from sweep import ResultCache, run_sweep
+
+def _row(i):
+    return {'Mean Wait': float(i), 'P95 Wait': float(i)}
+
+# Every test row serialises to the same number of bytes
+CELL_BYTES = len(json.dumps(_row(1)))
+
+def test_cache_round_trips_and_misses(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = ResultCache.key({'num_servers': 3, 'seed': 1})
+    assert key == ResultCache.key({'seed': 1, 'num_servers': 3})
+    assert cache.get(key) is None
+    cache.put(key, _row(7))
+    assert cache.get(key) == _row(7)
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    size = CELL_BYTES
+    cache = ResultCache(str(tmp_path), max_bytes=3 * size)
+    for key in 'abc':
+        cache.put(key, _row(1))
+    # A hit moves 'a' to the back, so 'b' is the oldest when 'd' arrives
+    assert cache.get('a') == _row(1)
+    cache.put('d', _row(1))
+
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    assert cache.total_bytes == 3 * size
+    assert sorted(os.listdir(tmp_path)) == ['a.json', 'c.json', 'd.json']
+
+def test_cache_reopen_keeps_size_and_order(tmp_path):
+    size = CELL_BYTES
+    cache = ResultCache(str(tmp_path), max_bytes=2 * size)
+    cache.put('a', _row(1))
+    cache.put('b', _row(2))
+    # Make 'a' the most recently used on disk, then reopen from a fresh scan
+    os.utime(tmp_path / 'a.json', (2e9, 2e9))
+    os.utime(tmp_path / 'b.json', (1e9, 1e9))
+
+    reopened = ResultCache(str(tmp_path), max_bytes=2 * size)
+    assert reopened.total_bytes == 2 * size
+    reopened.put('c', _row(3))
+    assert reopened.get('b') is None
+    assert reopened.get('a') == _row(1)
+
+def test_repeated_sweep_is_served_from_cache(tmp_path, capsys):
+    kwargs = dict(num_servers=(2, 3), num_customers=200, max_workers=1, cache_dir=str(tmp_path))
+    first = run_sweep(**kwargs)
+    assert '2 to compute' in capsys.readouterr().out
+    second = run_sweep(**kwargs)
+    assert '2 cached, 0 to compute' in capsys.readouterr().out
+    pd.testing.assert_frame_equal(first, second)
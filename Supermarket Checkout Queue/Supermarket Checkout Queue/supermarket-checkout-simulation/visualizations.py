@@ -1,9 +1,11 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
-import seaborn as sns
 import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+from results_io import load_results
+from event_index import QueueStateIndex
 
 # ============================================
 # 🎨 PREMIUM THEME CONFIGURATION
@@ -22,6 +24,11 @@ GRID_COLOR = '#2a2a4a'
 GRADIENT_COLORS = ['#e94560', '#ff6b6b', '#feca57']
 SERVER_COLORS = ['#00d9ff', '#7b2cbf', '#e94560']
 
+# Rendering limits for large runs
+MAX_PLOT_POINTS = 2000   # Buckets for downsampled time series
+KDE_SAMPLE_SIZE = 10000  # Wait times used to fit the density curve
+GANTT_CUSTOMERS = 40     # Customers shown on the service timeline
+
 def apply_dark_theme(ax, fig):
     """Apply consistent dark theme to axes and figure."""
     fig.patch.set_facecolor(DARK_BG)
@@ -34,44 +41,73 @@ def apply_dark_theme(ax, fig):
         spine.set_color(GRID_COLOR)
     ax.grid(True, color=GRID_COLOR, linestyle='--', alpha=0.3)
 
-def generate_visualizations(results_file='simulation_results.csv'):
-    df = pd.read_csv(results_file)
-    
-    # Create outputs directory
-    if not os.path.exists('outputs'):
-        os.makedirs('outputs')
-    
+def lane_colors(num_lanes):
+    """Theme colors for the first three counters, evenly spaced 'cool' colormap beyond that."""
+    if num_lanes <= len(SERVER_COLORS):
+        return SERVER_COLORS[:num_lanes]
+    cmap = plt.get_cmap('cool')
+    return [cmap(i / (num_lanes - 1)) for i in range(num_lanes)]
+
+def minmax_downsample(x, y, num_buckets=MAX_PLOT_POINTS):
+    """
+    Shape-preserving downsampling: splits the series into `num_buckets` equal
+    index ranges and keeps each bucket's minimum and maximum point (in time
+    order), so peaks and troughs survive while the point count stays bounded.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) <= 2 * num_buckets:
+        return x, y
+    edges = np.linspace(0, len(x), num_buckets + 1).astype(int)
+    keep = [0, len(x) - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        segment = y[lo:hi]
+        keep.append(lo + int(np.argmin(segment)))
+        keep.append(lo + int(np.argmax(segment)))
+    keep = np.unique(keep)
+    return x[keep], y[keep]
+
+def _new_figure(figsize):
     plt.rcParams['font.family'] = 'sans-serif'
     plt.rcParams['font.size'] = 11
+    fig, ax = plt.subplots(figsize=figsize)
+    apply_dark_theme(ax, fig)
+    return fig, ax
+
+def _save(fig, name):
+    fig.tight_layout()
+    fig.savefig(os.path.join('outputs', name), facecolor=DARK_BG)
+    plt.close(fig)
+
+def _gradient_hist(ax, counts, bins, cmap_name, col):
+    """Draws a precomputed histogram with per-bar gradient colors."""
+    _, _, patches = ax.hist(bins[:-1], bins=bins, weights=counts, edgecolor='white', linewidth=0.5, alpha=0.9)
+    cm = plt.get_cmap(cmap_name)
+    for c, p in zip(col, patches):
+        plt.setp(p, 'facecolor', cm(c))
 
+def plot_waiting_time(counts, bins, kde_sample, mean_wait, p95_wait):
     # --- 1. Waiting Time Distribution (Premium) ---
-    fig, ax = plt.subplots(figsize=(12, 7))
-    apply_dark_theme(ax, fig)
+    fig, ax = _new_figure((12, 7))
     
     # Histogram with gradient effect
-    n, bins, patches = ax.hist(df['Wait Time'], bins=30, edgecolor='white', linewidth=0.5, alpha=0.9)
-    
-    # Apply gradient to bars
-    cm = plt.cm.get_cmap('magma')
     bin_centers = 0.5 * (bins[:-1] + bins[1:])
     col = bin_centers - min(bin_centers)
     col /= max(col) if max(col) > 0 else 1
-    for c, p in zip(col, patches):
-        plt.setp(p, 'facecolor', cm(c))
+    _gradient_hist(ax, counts, bins, 'magma', col)
     
-    # Add KDE line
+    # Add KDE line (fitted on a fixed-size sample: gaussian_kde is O(n) per point)
     from scipy.stats import gaussian_kde
-    kde = gaussian_kde(df['Wait Time'])
-    x_kde = np.linspace(df['Wait Time'].min(), df['Wait Time'].max(), 200)
-    ax2 = ax.twinx()
-    ax2.plot(x_kde, kde(x_kde), color=ACCENT_3, linewidth=3, label='Density')
-    ax2.set_facecolor('none')
-    ax2.tick_params(colors=TEXT_COLOR)
-    ax2.set_ylabel('Density', color=TEXT_COLOR)
+    if len(np.unique(kde_sample)) > 1:
+        kde = gaussian_kde(kde_sample)
+        x_kde = np.linspace(bins[0], bins[-1], 200)
+        ax2 = ax.twinx()
+        ax2.plot(x_kde, kde(x_kde), color=ACCENT_3, linewidth=3, label='Density')
+        ax2.set_facecolor('none')
+        ax2.tick_params(colors=TEXT_COLOR)
+        ax2.set_ylabel('Density', color=TEXT_COLOR)
     
     # Add mean and 95th percentile lines
-    mean_wait = df['Wait Time'].mean()
-    p95_wait = df['Wait Time'].quantile(0.95)
     ax.axvline(mean_wait, color=ACCENT_3, linestyle='--', linewidth=2.5, label=f'Mean: {mean_wait:.2f} min')
     ax.axvline(p95_wait, color=ACCENT_1, linestyle='--', linewidth=2.5, label=f'95th %: {p95_wait:.2f} min')
     
@@ -79,29 +115,23 @@ def generate_visualizations(results_file='simulation_results.csv'):
     ax.set_xlabel('Waiting Time (minutes)', fontsize=12)
     ax.set_ylabel('Number of Customers', fontsize=12)
     ax.legend(loc='upper right', facecolor=CARD_BG, edgecolor=GRID_COLOR, labelcolor=TEXT_COLOR)
-    
-    plt.tight_layout()
-    plt.savefig('outputs/waiting_time_dist.png', dpi=150, facecolor=DARK_BG)
-    plt.close()
+    _save(fig, 'waiting_time_dist.png')
 
+def plot_counter_utilization(server_ids, utilization):
     # --- 2. Counter Utilization (Premium Card Style) ---
-    simulation_end_time = df['Service End Time'].max()
-    server_stats = df.groupby('Server ID')['Service Time'].sum().reset_index()
-    server_stats['Utilization (%)'] = (server_stats['Service Time'] / simulation_end_time) * 100
+    fig, ax = _new_figure((max(10, 0.4 * len(server_ids)), 7))
+    colors = lane_colors(len(server_ids))
     
-    fig, ax = plt.subplots(figsize=(10, 7))
-    apply_dark_theme(ax, fig)
-    
-    bars = ax.bar(server_stats['Server ID'].astype(str), server_stats['Utilization (%)'], 
-                  color=SERVER_COLORS, edgecolor='white', linewidth=2, width=0.6)
+    bars = ax.bar([str(sid) for sid in server_ids], utilization,
+                  color=colors, edgecolor='white', linewidth=2, width=0.6)
     
-    # Add glow effect
-    for bar, color in zip(bars, SERVER_COLORS):
-        bar.set_alpha(0.9)
-        # Add value labels on top
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height + 1, f'{height:.1f}%',
-                ha='center', va='bottom', fontsize=14, fontweight='bold', color=TEXT_COLOR)
+    # Value labels on top (skipped when there are too many counters to read them)
+    if len(server_ids) <= 20:
+        for bar in bars:
+            bar.set_alpha(0.9)
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 1, f'{height:.1f}%',
+                    ha='center', va='bottom', fontsize=14, fontweight='bold', color=TEXT_COLOR)
     
     # Add threshold line
     ax.axhline(85, color=ACCENT_1, linestyle='--', linewidth=2, alpha=0.7, label='Bottleneck Threshold (85%)')
@@ -112,136 +142,99 @@ def generate_visualizations(results_file='simulation_results.csv'):
     ax.set_xlabel('Counter ID', fontsize=12)
     ax.set_ylabel('Utilization (%)', fontsize=12)
     ax.legend(loc='upper right', facecolor=CARD_BG, edgecolor=GRID_COLOR, labelcolor=TEXT_COLOR)
-    
-    plt.tight_layout()
-    plt.savefig('outputs/counter_utilization.png', dpi=150, facecolor=DARK_BG)
-    plt.close()
+    _save(fig, 'counter_utilization.png')
 
+def plot_throughput(hours, customer_counts):
     # --- 3. Throughput Over Time (Premium Line Chart) ---
-    df['Completion Hour'] = (df['Service End Time'] // 60).astype(int)
-    throughput = df.groupby('Completion Hour').size().reset_index(name='Customer Count')
+    fig, ax = _new_figure((12, 6))
     
-    fig, ax = plt.subplots(figsize=(12, 6))
-    apply_dark_theme(ax, fig)
-    
-    ax.fill_between(throughput['Completion Hour'], throughput['Customer Count'], alpha=0.3, color=ACCENT_3)
-    ax.plot(throughput['Completion Hour'], throughput['Customer Count'], 
-            marker='o', markersize=10, linewidth=3, color=ACCENT_3, markeredgecolor='white', markeredgewidth=2)
+    ax.fill_between(hours, customer_counts, alpha=0.3, color=ACCENT_3)
+    few_points = len(hours) <= 48
+    ax.plot(hours, customer_counts, marker='o' if few_points else None, markersize=10, linewidth=3,
+            color=ACCENT_3, markeredgecolor='white', markeredgewidth=2)
     
-    # Add data labels
-    for x, y in zip(throughput['Completion Hour'], throughput['Customer Count']):
-        ax.annotate(f'{y}', (x, y), textcoords='offset points', xytext=(0, 10),
-                   ha='center', fontsize=10, color=TEXT_COLOR, fontweight='bold')
+    # Add data labels (only while they stay legible)
+    if few_points:
+        for x, y in zip(hours, customer_counts):
+            ax.annotate(f'{y}', (x, y), textcoords='offset points', xytext=(0, 10),
+                       ha='center', fontsize=10, color=TEXT_COLOR, fontweight='bold')
     
     ax.set_title('📈 Throughput Over Time', fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Hour of Simulation', fontsize=12)
     ax.set_ylabel('Customers Served', fontsize=12)
-    
-    plt.tight_layout()
-    plt.savefig('outputs/throughput_over_time.png', dpi=150, facecolor=DARK_BG)
-    plt.close()
+    _save(fig, 'throughput_over_time.png')
 
+def plot_queue_length(times, lengths, peak_time, peak_length):
     # --- 4. Queue Length Over Time (Area Chart) ---
-    arrivals = pd.DataFrame({'time': df['Arrival Time'], 'change': 1})
-    services = pd.DataFrame({'time': df['Service Start Time'], 'change': -1})
-    events = pd.concat([arrivals, services]).sort_values('time')
-    events['Queue Length'] = events['change'].cumsum()
+    fig, ax = _new_figure((14, 6))
     
-    fig, ax = plt.subplots(figsize=(14, 6))
-    apply_dark_theme(ax, fig)
-    
-    ax.fill_between(events['time'], events['Queue Length'], step='post', alpha=0.4, color=ACCENT_4)
-    ax.step(events['time'], events['Queue Length'], where='post', linewidth=2, color=ACCENT_4)
+    ax.fill_between(times, lengths, step='post', alpha=0.4, color=ACCENT_4)
+    ax.step(times, lengths, where='post', linewidth=2, color=ACCENT_4)
     
     # Highlight peak
-    max_queue = events['Queue Length'].max()
-    max_time = events[events['Queue Length'] == max_queue]['time'].iloc[0]
-    ax.scatter([max_time], [max_queue], color=ACCENT_1, s=200, zorder=5, edgecolor='white', linewidth=2)
-    ax.annotate(f'Peak: {max_queue}', (max_time, max_queue), textcoords='offset points', 
+    ax.scatter([peak_time], [peak_length], color=ACCENT_1, s=200, zorder=5, edgecolor='white', linewidth=2)
+    ax.annotate(f'Peak: {peak_length}', (peak_time, peak_length), textcoords='offset points', 
                 xytext=(10, 10), fontsize=12, color=ACCENT_1, fontweight='bold',
                 arrowprops=dict(arrowstyle='->', color=ACCENT_1))
     
     ax.set_title('📊 Queue Length Over Time', fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Time (minutes)', fontsize=12)
     ax.set_ylabel('Customers in Queue', fontsize=12)
-    
-    plt.tight_layout()
-    plt.savefig('outputs/queue_length_over_time.png', dpi=150, facecolor=DARK_BG)
-    plt.close()
+    _save(fig, 'queue_length_over_time.png')
 
+def plot_gantt(customer_ids, starts, durations, lanes, num_lanes):
     # --- 5. Gantt Chart (Premium Timeline) ---
-    subset = df.head(40)  # First 40 for readability
-    
-    fig, ax = plt.subplots(figsize=(16, 8))
-    apply_dark_theme(ax, fig)
-    
-    for i, (idx, row) in enumerate(subset.iterrows()):
-        server_id = int(row['Server ID'])
-        color = SERVER_COLORS[server_id - 1]
-        
-        # Draw bar
-        ax.barh(y=server_id, width=row['Service Time'], left=row['Service Start Time'], 
-                color=color, edgecolor='white', linewidth=0.5, alpha=0.85, height=0.6)
-        
-        # Add customer ID
-        if row['Service Time'] > 1:  # Only label if bar is wide enough
-            ax.text(row['Service Start Time'] + row['Service Time']/2, server_id, 
-                    f"C{int(row['Customer ID'])}", ha='center', va='center', 
+    fig, ax = _new_figure((16, max(8, 0.3 * num_lanes)))
+    colors = lane_colors(num_lanes)
+    
+    # One broken_barh collection per counter instead of one barh per customer
+    for lane_id in range(1, num_lanes + 1):
+        mask = lanes == lane_id
+        if mask.any():
+            ax.broken_barh(list(zip(starts[mask], durations[mask])), (lane_id - 0.3, 0.6),
+                           facecolors=colors[lane_id - 1], edgecolor='white', linewidth=0.5, alpha=0.85)
+    
+    # Add customer IDs (only if bar is wide enough)
+    for customer_id, start, duration, lane_id in zip(customer_ids, starts, durations, lanes):
+        if duration > 1:
+            ax.text(start + duration/2, lane_id, f"C{int(customer_id)}", ha='center', va='center',
                     color='white', fontsize=8, fontweight='bold')
     
     ax.set_xlabel('Time (minutes)', fontsize=12)
     ax.set_ylabel('Counter ID', fontsize=12)
-    ax.set_yticks([1, 2, 3])
-    ax.set_yticklabels(['Counter 1', 'Counter 2', 'Counter 3'])
-    ax.set_title('🗓️ Service Timeline (Gantt Chart - First 40 Customers)', fontsize=16, fontweight='bold', pad=20)
+    ax.set_yticks(range(1, num_lanes + 1))
+    ax.set_yticklabels([f'Counter {i}' for i in range(1, num_lanes + 1)])
+    ax.set_title(f'🗓️ Service Timeline (Gantt Chart - First {len(customer_ids)} Customers)',
+                 fontsize=16, fontweight='bold', pad=20)
     
     # Legend
-    legend_patches = [mpatches.Patch(color=c, label=f'Counter {i+1}') for i, c in enumerate(SERVER_COLORS)]
-    ax.legend(handles=legend_patches, loc='upper right', facecolor=CARD_BG, edgecolor=GRID_COLOR, labelcolor=TEXT_COLOR)
-    
-    plt.tight_layout()
-    plt.savefig('outputs/gantt_chart.png', dpi=150, facecolor=DARK_BG)
-    plt.close()
+    legend_patches = [mpatches.Patch(color=c, label=f'Counter {i+1}') for i, c in enumerate(colors)]
+    ax.legend(handles=legend_patches, loc='upper right', facecolor=CARD_BG, edgecolor=GRID_COLOR,
+              labelcolor=TEXT_COLOR, ncol=max(1, num_lanes // 10))
+    _save(fig, 'gantt_chart.png')
 
+def plot_service_time(counts, bins, mean_service):
     # --- 6. Service Time Histogram (Premium) ---
-    fig, ax = plt.subplots(figsize=(12, 7))
-    apply_dark_theme(ax, fig)
-    
-    n, bins, patches = ax.hist(df['Service Time'], bins=25, edgecolor='white', linewidth=0.5, alpha=0.9)
+    fig, ax = _new_figure((12, 7))
     
     # Apply gradient
-    cm = plt.cm.get_cmap('viridis')
     col = (bins[:-1] - min(bins[:-1])) / (max(bins[:-1]) - min(bins[:-1]) + 0.001)
-    for c, p in zip(col, patches):
-        plt.setp(p, 'facecolor', cm(c))
+    _gradient_hist(ax, counts, bins, 'viridis', col)
     
-    mean_service = df['Service Time'].mean()
     ax.axvline(mean_service, color=ACCENT_1, linestyle='--', linewidth=2.5, label=f'Mean: {mean_service:.2f} min')
     
     ax.set_title('⚡ Service Time Distribution', fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Service Time (minutes)', fontsize=12)
     ax.set_ylabel('Frequency', fontsize=12)
     ax.legend(facecolor=CARD_BG, edgecolor=GRID_COLOR, labelcolor=TEXT_COLOR)
-    
-    plt.tight_layout()
-    plt.savefig('outputs/service_time_dist.png', dpi=150, facecolor=DARK_BG)
-    plt.close()
+    _save(fig, 'service_time_dist.png')
 
+def plot_dashboard(metrics):
     # --- 7. NEW: Dashboard Summary (Combined Metrics) ---
     fig, axes = plt.subplots(2, 3, figsize=(18, 12))
     fig.patch.set_facecolor(DARK_BG)
     fig.suptitle('🛒 SUPERMARKET QUEUE PERFORMANCE DASHBOARD', fontsize=20, fontweight='bold', color=TEXT_COLOR, y=0.98)
     
-    # Metric Cards
-    metrics = [
-        ('Total Customers', f"{len(df)}", '👥'),
-        ('Avg Wait Time', f"{df['Wait Time'].mean():.1f} min", '⏱️'),
-        ('Throughput', f"{(len(df) / (df['Service End Time'].max() / 60)):.1f}/hr", '📈'),
-        ('95th % Wait', f"{df['Wait Time'].quantile(0.95):.1f} min", '⚠️'),
-        ('Avg Utilization', f"{server_stats['Utilization (%)'].mean():.1f}%", '🔄'),
-        ('Peak Queue', f"{int(events['Queue Length'].max())}", '📊')
-    ]
-    
     for ax, (title, value, emoji) in zip(axes.flatten(), metrics):
         apply_dark_theme(ax, fig)
         ax.text(0.5, 0.6, emoji, fontsize=50, ha='center', va='center', transform=ax.transAxes)
@@ -252,9 +245,88 @@ def generate_visualizations(results_file='simulation_results.csv'):
         ax.set_yticks([])
     
     plt.tight_layout(rect=[0, 0, 1, 0.96])
-    plt.savefig('outputs/dashboard_summary.png', dpi=150, facecolor=DARK_BG)
+    plt.savefig('outputs/dashboard_summary.png', facecolor=DARK_BG)
     plt.close()
 
+def _figure_jobs(df):
+    """
+    Reduces the results table to the small, picklable inputs of each figure,
+    so figures can be rendered in worker processes without shipping `df`.
+    """
+    waits = df['Wait Time'].to_numpy()
+    services = df['Service Time'].to_numpy()
+    mean_wait = waits.mean()
+    p95_wait = df['Wait Time'].quantile(0.95)
+    rng = np.random.default_rng(0)
+    kde_sample = waits if len(waits) <= KDE_SAMPLE_SIZE else rng.choice(waits, KDE_SAMPLE_SIZE, replace=False)
+    wait_counts, wait_bins = np.histogram(waits, bins=30)
+    service_counts, service_bins = np.histogram(services, bins=25)
+
+    simulation_end_time = df['Service End Time'].max()
+    server_stats = df.groupby('Server ID')['Service Time'].sum()
+    utilization = (server_stats / simulation_end_time * 100)
+    index = QueueStateIndex.from_results(df)
+
+    completion_hour = (df['Service End Time'].to_numpy() // 60).astype(int)
+    hours, hour_counts = np.unique(completion_hour, return_counts=True)
+
+    peak_time, peak_length = index.queue.peak()
+    plot_times, plot_lengths = minmax_downsample(index.queue.times, index.queue.levels)
+
+    subset = df.head(GANTT_CUSTOMERS)
+    num_lanes = int(df['Server ID'].max())
+
+    dashboard_metrics = [
+        ('Total Customers', f"{len(df)}", '👥'),
+        ('Avg Wait Time', f"{mean_wait:.1f} min", '⏱️'),
+        ('Throughput', f"{(len(df) / (simulation_end_time / 60)):.1f}/hr", '📈'),
+        ('95th % Wait', f"{p95_wait:.1f} min", '⚠️'),
+        ('Avg Utilization', f"{utilization.mean():.1f}%", '🔄'),
+        ('Peak Queue', f"{peak_length}", '📊')
+    ]
+
+    return [
+        (plot_waiting_time, (wait_counts, wait_bins, kde_sample, mean_wait, p95_wait)),
+        (plot_counter_utilization, (utilization.index.to_numpy(), utilization.to_numpy())),
+        (plot_throughput, (hours, hour_counts)),
+        (plot_queue_length, (plot_times, plot_lengths, peak_time, peak_length)),
+        (plot_gantt, (subset['Customer ID'].to_numpy(), subset['Service Start Time'].to_numpy(),
+                      subset['Service Time'].to_numpy(), subset['Server ID'].to_numpy(), num_lanes)),
+        (plot_service_time, (service_counts, service_bins, services.mean())),
+        (plot_dashboard, (dashboard_metrics,))
+    ]
+
+def _render(job):
+    plot, args, dpi = job
+    with plt.rc_context({'savefig.dpi': dpi}):
+        plot(*args)
+
+def _init_worker():
+    # Workers only write PNGs; never try to open a GUI backend
+    plt.switch_backend('Agg')
+
+def generate_visualizations(results_file='simulation_results.npy', parallel=True, max_workers=None, dpi=150):
+    """
+    `results_file` is the results DataFrame itself (in-memory handoff from
+    main.py) or a .npy / .parquet / .csv results file.
+    With `parallel`, the seven independent figures render in worker processes.
+    `dpi` sets the PNG resolution (lower renders faster).
+    """
+    df = load_results(results_file)
+    
+    # Create outputs directory
+    if not os.path.exists('outputs'):
+        os.makedirs('outputs')
+    
+    jobs = [(plot, args, dpi) for plot, args in _figure_jobs(df)]
+    if parallel:
+        with ProcessPoolExecutor(max_workers=max_workers or min(len(jobs), os.cpu_count()),
+                                 initializer=_init_worker) as pool:
+            list(pool.map(_render, jobs))
+    else:
+        for job in jobs:
+            _render(job)
+
     print("✅ All premium visualizations generated in 'outputs/' folder.")
 
 if __name__ == "__main__":